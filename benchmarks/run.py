@@ -0,0 +1,277 @@
+"""Throughput benchmarks of `DownloadService` and `LinkScraper` against the stand-in site.
+
+Every case runs in a fresh process, so its CPU time and peak RSS are its own, and the site runs
+in another process. Results are saved as JSON and can be compared with an earlier run:
+
+    python -m benchmarks.run --workers 1 4 8 --output after.json --compare before.json
+"""
+
+import argparse
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
+
+import httpx
+
+from v2dl.config import ChromeConfig, Config, DownloadConfig, PathConfig
+from v2dl.const import DEFAULT_CONFIG
+from v2dl.pacing import VirtualClock, get_pacing
+
+from .site import SiteConfig, SiteServer, add_site_arguments, site_config_from_args
+
+
+def bench_config(tmp_dir: str, **download) -> Config:
+    """Default config with all files in `tmp_dir` and no speed limit."""
+    data = copy.deepcopy(DEFAULT_CONFIG)
+    data["download"].update(
+        download_dir=os.path.join(tmp_dir, "download"),
+        rate_limit=0,
+        shared_rate_limit=False,
+        page_cache=False,
+        **download,
+    )
+    paths = {key: os.path.join(tmp_dir, value) for key, value in data["paths"].items()}
+    return Config(
+        download=DownloadConfig(**data["download"]),
+        paths=PathConfig(**paths),
+        chrome=ChromeConfig("", os.path.join(tmp_dir, "profile"), data["chrome"]["daemon_port"]),
+    )
+
+
+class BenchBot:
+    """Loads pages over HTTP, with `tabs` threads loading the next pages like the tab pool of
+    the drission bot. Waits of the pacing scheduler run on a virtual clock."""
+
+    def __init__(self, config: Config, tabs: int, logger: logging.Logger):
+        self.tabs = tabs
+        self.client = httpx.Client(trust_env=False)
+        self.pacing = get_pacing(config, logger, VirtualClock())
+        self.executor = ThreadPoolExecutor(max_workers=tabs)
+        self.prefetched: dict[str, Future] = {}
+        self.pages = 0
+        self.bytes = 0
+
+    @property
+    def prefetch_count(self) -> int:
+        return self.tabs - 1
+
+    def prefetch_pages(self, urls: list[str]):
+        for url in urls:
+            if url not in self.prefetched:
+                self.prefetched[url] = self.executor.submit(self.load_page, url)
+
+    def get_page(self, url: str) -> str:
+        future = self.prefetched.pop(url, None)
+        return future.result() if future is not None else self.load_page(url)
+
+    def load_page(self, url: str) -> str:
+        self.pacing.wait_turn()
+        html = self.client.get(url).text
+        self.pages += 1
+        self.bytes += len(html)
+        return html
+
+    def cancel_prefetch(self):
+        for future in self.prefetched.values():
+            future.cancel()
+        self.prefetched.clear()
+
+    def close_driver(self):
+        self.cancel_prefetch()
+        self.executor.shutdown()
+        self.client.close()
+
+
+def bench_download(case: dict, base_url: str, site_config: SiteConfig, tmp_dir: str) -> dict:
+    from v2dl.v2dl import DownloadService
+
+    if case["engine"] == "async":
+        options = {
+            "workers": 1,
+            "max_concurrency": case["workers"],
+            "per_host_limit": case["workers"],
+        }
+    else:
+        options = {"workers": case["workers"]}
+    config = bench_config(tmp_dir, engine=case["engine"], **options)
+    service = DownloadService(config, logging.getLogger("bench"))
+    service.start_workers()
+    per_album = site_config.images_per_page * site_config.album_pages
+    for album in range(case["albums"]):
+        name = f"bench{album}"
+        links = [(f"{base_url}/cdn/{name}/{i}.jpg", f"{name} {i + 1}") for i in range(per_album)]
+        service.add_download_task(name, links)
+    service.wait_completion()
+
+    images = size = 0
+    for root, _, files in os.walk(config.download.download_dir):
+        for name in files:
+            if name.endswith(".jpg"):
+                images += 1
+                size += os.path.getsize(os.path.join(root, name))
+    return {"images": images, "bytes": size}
+
+
+def bench_scrape(case: dict, base_url: str, site_config: SiteConfig, tmp_dir: str) -> dict:
+    from v2dl.v2dl import LinkScraper
+
+    logger = logging.getLogger("bench")
+    config = bench_config(tmp_dir)
+    bot = BenchBot(config, case["workers"], logger)
+    scraper = LinkScraper(bot, True, None, logger)
+    albums = scraper.scrape_link(f"{base_url}/category/bench", 1, True)
+    images = 0
+    for album in range(case["albums"]):
+        images += len(scraper.scrape_link(f"{base_url}/album/bench{album}.html", 1, False))
+    bot.close_driver()
+    return {"images": images, "albums_found": len(albums), "pages": bot.pages, "bytes": bot.bytes}
+
+
+BENCHMARKS = {"download": bench_download, "scrape": bench_scrape}
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def run_case(case: dict, base_url: str, site_config: SiteConfig) -> dict:
+    """Run one case and measure it, called in a fresh process."""
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start, cpu_start = time.perf_counter(), time.process_time()
+        counts = BENCHMARKS[case["target"]](case, base_url, site_config, tmp_dir)
+        seconds = time.perf_counter() - start
+        cpu_seconds = time.process_time() - cpu_start
+
+    result = {**case, **counts, "seconds": round(seconds, 3)}
+    result["images_per_s"] = round(counts["images"] / seconds, 1)
+    result["mb_per_s"] = round(counts["bytes"] / 1024 / 1024 / seconds, 2)
+    if "pages" in counts:
+        result["pages_per_s"] = round(counts["pages"] / seconds, 1)
+    result["cpu_seconds"] = round(cpu_seconds, 3)
+    result["cpu_percent"] = round(cpu_seconds / seconds * 100, 1)
+    peak = peak_rss_mb()
+    result["peak_rss_mb"] = round(peak, 1) if peak is not None else None
+    return result
+
+
+def serve_site(port: int, site_config: SiteConfig, ready):
+    server = SiteServer(port, site_config)
+    ready.put(server.base_url)
+    server.serve_forever()
+
+
+def git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def case_key(result: dict) -> tuple:
+    return result["target"], result.get("engine"), result["workers"]
+
+
+def print_results(results: list[dict], baseline: dict[tuple, dict]):
+    print(
+        f"{'target':<9}{'engine':<8}{'workers':>8}{'images/s':>11}{'MB/s':>9}"
+        f"{'CPU%':>8}{'RSS MB':>9}  change"
+    )
+    for result in results:
+        change = ""
+        if (old := baseline.get(case_key(result))) and old["images_per_s"]:
+            change = f"{(result['images_per_s'] / old['images_per_s'] - 1) * 100:+.1f}%"
+        print(
+            f"{result['target']:<9}{result.get('engine') or '-':<8}{result['workers']:>8}"
+            f"{result['images_per_s']:>11}{result['mb_per_s']:>9}{result['cpu_percent']:>8}"
+            f"{result['peak_rss_mb'] or '-':>9}  {change}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark v2dl against a local stand-in site.")
+    parser.add_argument("--target", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument(
+        "--engines", nargs="+", choices=["thread", "async"], default=["thread", "async"]
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4, 8],
+        help="Download workers, or tabs loading pages for the scrape benchmark",
+    )
+    parser.add_argument("--albums", type=int, default=5, help="Albums per case")
+    parser.add_argument("--output", default=None, help="JSON file of the results")
+    parser.add_argument("--compare", default=None, help="JSON file of an earlier run")
+    add_site_arguments(parser)
+    args = parser.parse_args()
+    site_config = site_config_from_args(args)
+
+    cases = []
+    for target in args.target:
+        for workers in args.workers:
+            if target == "download":
+                cases += [{"target": target, "engine": e, "workers": workers} for e in args.engines]
+            else:
+                cases.append({"target": target, "workers": workers})
+    for case in cases:
+        case["albums"] = args.albums
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    site = context.Process(target=serve_site, args=(0, site_config, ready), daemon=True)
+    site.start()
+    base_url = ready.get(timeout=30)
+
+    results = []
+    try:
+        for case in cases:
+            # a new process per case, the peak RSS of a process never goes down
+            with context.Pool(1) as pool:
+                results.append(pool.apply(run_case, (case, base_url, site_config)))
+    finally:
+        site.terminate()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {case_key(result): result for result in json.load(f)["results"]}
+    print_results(results, baseline)
+
+    output = args.output or time.strftime("bench-%Y%m%d-%H%M%S.json")
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "site": asdict(site_config),
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
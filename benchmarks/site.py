@@ -0,0 +1,198 @@
+"""Local stand-in for the site and its image CDN, serving synthetic pages in the v2ph markup.
+
+Album pages match `XPATH_ALBUM`, `XPATH_ALTS` and the pagination of `LinkParser`, list pages
+match `XPATH_ALBUM_LIST`. Images are valid JPEG frames of a configurable size, served with a
+configurable latency and bandwidth per connection.
+
+    python -m benchmarks.site --port 8800 --image-size 256 --latency 20
+"""
+
+import argparse
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_PATH = re.compile(r"^/(album|category|actor)/([\w.-]+?)(?:\.html)?$")
+IMAGE_PATH = re.compile(r"^/cdn/([\w.-]+)/(\d+)\.jpg$")
+FILLER = "".join(
+    f'<div class="col"><a href="/tag/{i}">tag {i}</a><span class="text-muted">filler</span></div>'
+    for i in range(200)
+)  # navigation and sidebars of a real page, about 20 KB
+
+
+@dataclass
+class SiteConfig:
+    images_per_page: int = 20
+    album_pages: int = 3
+    albums_per_page: int = 24
+    list_pages: int = 10
+    image_size: int = 256  # KiB
+    latency: float = 0.0  # seconds before the first byte of an image
+    page_latency: float = 0.0  # seconds before a page is sent, the load time of the browser
+    bandwidth: int = 0  # KiB/s per connection, 0 is unlimited
+
+
+def jpeg_bytes(size: int) -> bytes:
+    """A buffer with JPEG start and end markers, passes the end marker check of the downloader."""
+    size = max(size, 8)
+    return b"\xff\xd8\xff\xe0" + b"\x00" * (size - 6) + b"\xff\xd9"
+
+
+def pagination(page: int, last_page: int) -> str:
+    items = [
+        f'<li class="page-item"><a class="page-link" href="?page={p}">{p}</a></li>'
+        for p in range(max(1, page - 4), min(last_page, page + 4) + 1)
+    ]
+    items.append(
+        f'<li class="page-item"><a class="page-link" href="?page={last_page}">last</a></li>'
+    )
+    return f'<ul class="pagination">{"".join(items)}</ul>'
+
+
+def album_page(base_url: str, album: str, page: int, config: SiteConfig) -> str:
+    first = (page - 1) * config.images_per_page
+    photos = "".join(
+        f'<div class="album-photo my-2"><img class="lazy" data-src="{base_url}/cdn/{album}/{i}.jpg"'
+        f' alt="{album} {i + 1}"></div>'
+        for i in range(first, first + config.images_per_page)
+    )
+    return (
+        f"<html><head><title>{album}</title></head><body>{FILLER}"
+        f'<div class="photos-list">{photos}</div>{pagination(page, config.album_pages)}'
+        f"{FILLER}</body></html>"
+    )
+
+
+def list_page(kind: str, name: str, page: int, config: SiteConfig) -> str:
+    first = (page - 1) * config.albums_per_page
+    albums = "".join(
+        f'<div class="card"><a class="media-cover" href="/album/{name}-{i}.html">'
+        f'<img src="/cover/{i}.jpg"></a></div>'
+        for i in range(first, first + config.albums_per_page)
+    )
+    return (
+        f"<html><head><title>{kind} {name}</title></head><body>{FILLER}"
+        f'<div class="albums-list">{albums}</div>{pagination(page, config.list_pages)}'
+        f"{FILLER}</body></html>"
+    )
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real CDN
+    server: "SiteServer"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        page = int(parse_qs(url.query).get("page", ["1"])[0])
+        config = self.server.site_config
+        if IMAGE_PATH.match(url.path):
+            self.send_image()
+        elif match := PAGE_PATH.match(url.path):
+            if config.page_latency > 0:
+                time.sleep(config.page_latency)
+            kind, name = match.groups()
+            if kind == "album":
+                html = album_page(self.server.base_url, name, page, config)
+            else:
+                html = list_page(kind, name, page, config)
+            self.send_body(html.encode("utf-8"), "text/html; charset=utf-8")
+        else:
+            self.send_error(404)
+
+    def send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_image(self):
+        config = self.server.site_config
+        if config.latency > 0:
+            time.sleep(config.latency)
+        body = self.server.image
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if config.bandwidth <= 0:
+            self.wfile.write(body)
+            return
+        chunk_size = 16 * 1024
+        seconds_per_chunk = chunk_size / (config.bandwidth * 1024)
+        for start in range(0, len(body), chunk_size):
+            self.wfile.write(body[start : start + chunk_size])
+            time.sleep(seconds_per_chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, site_config: SiteConfig):
+        super().__init__(("127.0.0.1", port), SiteHandler)
+        self.site_config = site_config
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.image = jpeg_bytes(site_config.image_size * 1024)
+
+
+def start_site(site_config: SiteConfig, port: int = 0) -> SiteServer:
+    """Serve the site in a background thread, port 0 picks a free port."""
+    server = SiteServer(port, site_config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    defaults = SiteConfig()
+    parser.add_argument("--images-per-page", type=int, default=defaults.images_per_page)
+    parser.add_argument("--album-pages", type=int, default=defaults.album_pages)
+    parser.add_argument("--albums-per-page", type=int, default=defaults.albums_per_page)
+    parser.add_argument("--list-pages", type=int, default=defaults.list_pages)
+    parser.add_argument(
+        "--image-size", type=int, default=defaults.image_size, help="Image size in KiB"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Milliseconds before an image is sent"
+    )
+    parser.add_argument(
+        "--page-latency", type=float, default=0, help="Milliseconds before a page is sent"
+    )
+    parser.add_argument(
+        "--bandwidth", type=int, default=0, help="KiB/s per image connection, 0 is unlimited"
+    )
+
+
+def site_config_from_args(args: argparse.Namespace) -> SiteConfig:
+    return SiteConfig(
+        images_per_page=args.images_per_page,
+        album_pages=args.album_pages,
+        albums_per_page=args.albums_per_page,
+        list_pages=args.list_pages,
+        image_size=args.image_size,
+        latency=args.latency / 1000,
+        page_latency=args.page_latency / 1000,
+        bandwidth=args.bandwidth,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the stand-in site for benchmarks.")
+    parser.add_argument("--port", type=int, default=8800)
+    add_site_arguments(parser)
+    args = parser.parse_args()
+    server = SiteServer(args.port, site_config_from_args(args))
+    print(f"Serving {server.base_url}/album/demo.html and {server.base_url}/category/demo")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
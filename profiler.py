@@ -1,8 +1,11 @@
 import sys
-import logging  # noqa: F401
+import logging
 from viztracer import VizTracer
 
-import v2dl  # noqa: F401
+from v2dl.config import ConfigManager, parse_arguments
+from v2dl.custom_logger import setup_logging
+from v2dl.v2dl import ScrapeManager
+from v2dl.web_bot import get_bot
 
 
 def run_with_viztracer():
@@ -15,7 +18,7 @@ def run_with_viztracer():
         "drission",
     ]
 
-    args, log_level = v2dl.utils.parse_arguments()
+    args, log_level = parse_arguments()
     config = ConfigManager().load()
     setup_logging(log_level, log_path=config.paths.system_log)
     logger = logging.getLogger(__name__)
@@ -23,7 +26,6 @@ def run_with_viztracer():
     web_bot = get_bot(args.bot_type, config, args.terminate, logger)
     scraper = ScrapeManager(args.url, web_bot, args.dry_run, config, logger)
     scraper.start_scraping()
-    main()
 
 
 tracer = VizTracer(output_file="trace.json")
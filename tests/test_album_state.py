@@ -0,0 +1,114 @@
+import logging
+
+import httpx
+
+from v2dl.album_state import AlbumStateStore
+from v2dl.manifest import AlbumManifest
+from v2dl.v2dl import DownloadService
+
+from .test_async_download import make_config
+
+
+def test_album_is_done_only_when_complete(tmp_path):
+    store = AlbumStateStore(str(tmp_path / "state.sqlite3"))
+    url = "https://www.v2ph.com/album/foo.html"
+    store.set_status(url + "?page=2", "downloading")
+    assert store.get(url).status == "downloading"
+    assert not store.is_downloaded(url)
+
+    store.finish(url, images=10, failed=2)
+    assert store.get(url).status == "partial"
+    assert not store.is_downloaded(url)
+
+    store.finish(url, images=10, failed=0)
+    album = store.get(url)
+    assert (album.status, album.downloaded, album.failed) == ("complete", 10, 0)
+    assert store.is_downloaded(url + "?page=3")
+    store.close()
+
+
+def test_legacy_log_imported_once(tmp_path):
+    log = tmp_path / "downloaded_albums.txt"
+    log.write_text("https://www.v2ph.com/album/a.html\nhttps://www.v2ph.com/album/b.html\n")
+    db_path = str(tmp_path / "state.sqlite3")
+
+    store = AlbumStateStore(db_path, str(log))
+    assert store.count("complete") == 2
+    store.finish("https://www.v2ph.com/album/a.html", images=5, failed=1)
+    store.close()
+
+    # not imported again, so the new state is kept
+    store = AlbumStateStore(db_path, str(log))
+    assert store.import_log(str(log)) == 0
+    assert store.get("https://www.v2ph.com/album/a.html").status == "partial"
+    assert store.is_downloaded("https://www.v2ph.com/album/b.html")
+    store.close()
+
+
+def make_service(tmp_path, store: AlbumStateStore, **download) -> DownloadService:
+    config = make_config(tmp_path, engine="thread", workers=2, **download)
+    return DownloadService(config, logging.getLogger("test"), album_state=store)
+
+
+def fake_downloads(service: DownloadService):
+    def download_album(album_name, image_links):  # images of album b fail
+        failed = sum("/b/" in url for url, _ in image_links)
+        return 0, failed, []
+
+    service.downloader.download_album = download_album
+
+
+def test_albums_with_the_same_name_tracked_by_url(tmp_path):
+    store = AlbumStateStore(str(tmp_path / "state.sqlite3"))
+    service = make_service(tmp_path, store)
+    fake_downloads(service)
+    for album in ("a", "b"):
+        url = f"https://www.v2ph.com/album/{album}.html"
+        links = [(f"https://cdn.v2ph.test/{album}/{i}.jpg", f"same {i}") for i in range(3)]
+        service.add_download_task("same", links, album_url=url)
+        service.album_scraped(url, 3)
+    service.start_workers()
+    service.wait_completion()
+
+    assert store.get("https://www.v2ph.com/album/a.html").status == "complete"
+    album = store.get("https://www.v2ph.com/album/b.html")
+    assert (album.status, album.failed) == ("partial", 3)
+    store.close()
+
+
+def test_truncated_album_stays_partial(tmp_path):
+    store = AlbumStateStore(str(tmp_path / "state.sqlite3"))
+    service = make_service(tmp_path, store)
+    fake_downloads(service)
+    url = "https://www.v2ph.com/album/a.html"
+    service.add_download_task("a", [("https://cdn.v2ph.test/a/0.jpg", "a 1")], album_url=url)
+    service.album_scraped(url, 1, reached_end=False)  # a later page failed to load
+    service.start_workers()
+    service.wait_completion()
+
+    album = store.get(url)
+    assert (album.status, album.failed) == ("partial", 0)
+    assert not store.is_downloaded(url)
+    store.close()
+
+
+def test_rejected_image_makes_album_eligible_for_rescan(tmp_path):
+    store = AlbumStateStore(str(tmp_path / "state.sqlite3"))
+    service = make_service(tmp_path, store, verify_images=False, post_process=["validate"])
+    truncated = b"\xff\xd8\xff\xe0" + bytes(100)  # no end marker, rejected by validate
+    service.transport._client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=truncated))
+    )
+    url = "https://www.v2ph.com/album/a.html"
+    service.add_download_task("a", [("https://cdn.v2ph.test/a/0.jpg", "a 1")], album_url=url)
+    service.album_scraped(url, 1)
+    service.start_workers()
+    service.wait_completion()
+
+    album = store.get(url)
+    assert (album.status, album.failed) == ("partial", 1)
+    assert not store.is_downloaded(url)
+    folder = tmp_path / "download" / "a"
+    assert not (folder / "a 1.jpg").exists()
+    assert not AlbumManifest(folder).is_complete(folder / "a 1.jpg", verify=False)
+    store.close()
@@ -0,0 +1,223 @@
+import asyncio
+import copy
+import logging
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from v2dl.async_download import AsyncDownloadEngine
+from v2dl.config import ChromeConfig, Config, DownloadConfig, PathConfig
+from v2dl.const import DEFAULT_CONFIG
+from v2dl.file_writer import DiskWriter, FileWriter, PartFile, get_disk_writer
+from v2dl.manifest import AlbumManifest
+from v2dl.rate_limiter import get_rate_limiter
+from v2dl.transport import HttpTransport
+from v2dl.utils import ImageDownloader
+
+IMAGE = b"\xff\xd8\xff\xe0" + bytes(16 * 1024) + b"\xff\xd9"
+
+
+def make_config(tmp_path, **download) -> Config:
+    """Default config with all files in `tmp_path`, no speed limit and short retry waits."""
+    data = copy.deepcopy(DEFAULT_CONFIG)
+    data["download"].update(
+        download_dir=str(tmp_path / "download"),
+        rate_limit=0,
+        shared_rate_limit=False,
+        page_cache=False,
+        retry_backoff=0.01,
+    )
+    data["download"].update(download)
+    paths = {key: str(tmp_path / value) for key, value in data["paths"].items()}
+    return Config(
+        download=DownloadConfig(**data["download"]),
+        paths=PathConfig(**paths),
+        chrome=ChromeConfig("", str(tmp_path / "profile"), data["chrome"]["daemon_port"]),
+    )
+
+
+def make_engine(config: Config, handler, disk_writer: DiskWriter | None = None):
+    logger = logging.getLogger("test")
+    transport = HttpTransport(config, logger)
+    transport._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    engine = AsyncDownloadEngine(
+        config,
+        transport,
+        get_rate_limiter(config),
+        disk_writer or get_disk_writer(config),
+        None,
+        None,
+        logger,
+    )
+    engine.start()
+    return engine
+
+
+class SlowFile(FileWriter):
+    def _write_buffer(self, buffer, length, release):
+        time.sleep(0.2)
+        super()._write_buffer(buffer, length, release)
+
+
+class SlowDiskWriter(DiskWriter):
+    def open(self, path, expected_size=None, offset=0):
+        return SlowFile(self, path, expected_size, offset)
+
+
+def test_slow_disk_does_not_block_the_loop(tmp_path):
+    config = make_config(tmp_path, write_buffer_size=4)
+    disk_writer = SlowDiskWriter(4 * 1024, 2, preallocate=False, background=False)
+    engine = make_engine(config, lambda request: httpx.Response(200, content=IMAGE), disk_writer)
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.run_coroutine_threadsafe(tick(), engine.loop)
+    try:
+        start = time.monotonic()
+        size, failed, _ = engine.submit("album", [("https://cdn.test/1.jpg", "album 1")]).result()
+        seconds = time.monotonic() - start
+    finally:
+        ticker.cancel()
+        engine.close()
+
+    assert (size, failed) == (len(IMAGE), 0)
+    assert seconds >= 0.8  # four buffers written slowly
+    assert ticks >= seconds * 30  # the other tasks kept running meanwhile
+
+
+def test_concurrent_downloads_respect_per_host_limit(tmp_path):
+    in_flight: dict[str, int] = {"a.test": 0, "b.test": 0}
+    peak = {"a.test": 0, "b.test": 0, "total": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        peak["total"] = max(peak["total"], sum(in_flight.values()))
+        await asyncio.sleep(0.05)
+        in_flight[host] -= 1
+        return httpx.Response(200, content=IMAGE)
+
+    engine = make_engine(make_config(tmp_path, max_concurrency=8, per_host_limit=2), handler)
+    links = [
+        (f"https://{host}/{i}.jpg", f"album {host} {i}") for host in in_flight for i in range(6)
+    ]
+    try:
+        size, failed, _ = engine.submit("album", links).result()
+    finally:
+        engine.close()
+
+    assert (size, failed) == (12 * len(IMAGE), 0)
+    assert peak["a.test"] == peak["b.test"] == 2
+    assert peak["total"] == 4  # both hosts at once
+    assert len(list((tmp_path / "download" / "album").glob("*.jpg"))) == 12
+
+
+def test_retry_then_breaker_pauses_host(tmp_path):
+    requests: dict[str, list[float]] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.setdefault(str(request.url), []).append(time.monotonic())
+        if request.url.host == "down.test" or len(requests[str(request.url)]) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, content=IMAGE)
+
+    config = make_config(
+        tmp_path, max_retries=2, breaker_threshold=2, breaker_cooldown=0.3, retry_backoff=0
+    )
+    engine = make_engine(config, handler)
+    links = [("https://flaky.test/1.jpg", "album 1"), ("https://down.test/2.jpg", "album 2")]
+    try:
+        size, failed, _ = engine.submit("album", links).result()
+    finally:
+        engine.close()
+
+    assert (size, failed) == (len(IMAGE), 1)
+    assert len(requests["https://flaky.test/1.jpg"]) == 2  # retried once
+    down = requests["https://down.test/2.jpg"]
+    assert len(down) == 3
+    assert down[2] - down[1] >= 0.3  # the second failure opened the circuit
+    assert engine.breaker.hosts["down.test"].recovering
+
+
+def interrupted_part(config: Config, save_path: Path, content: bytes, written: int) -> PartFile:
+    """Leave a part file of `content` as a download interrupted after `written` bytes would."""
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    part = PartFile(save_path)
+    full = httpx.Response(
+        200,
+        headers={"Content-Length": str(len(content)), "ETag": '"v1"'},
+        request=httpx.Request("GET", "https://cdn.test/1.jpg"),
+    )
+    with part.open(get_disk_writer(config), part.begin(full)) as file:
+        file.write(content[:written])
+    return part
+
+
+def test_resume_through_async_path(tmp_path):
+    config = make_config(tmp_path)
+    save_path = tmp_path / "download" / "album" / "album 1.jpg"
+    part = interrupted_part(config, save_path, IMAGE, 5000)
+
+    ranges = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ranges.append(request.headers.get("Range"))
+        content_range = f"bytes 5000-{len(IMAGE) - 1}/{len(IMAGE)}"
+        headers = {"Content-Range": content_range, "ETag": '"v1"'}
+        return httpx.Response(206, headers=headers, content=IMAGE[5000:])
+
+    engine = make_engine(config, handler)
+    try:
+        size, failed, _ = engine.submit("album", [("https://cdn.test/1.jpg", "album 1")]).result()
+    finally:
+        engine.close()
+
+    assert failed == 0 and ranges == ["bytes=5000-"]
+    assert save_path.read_bytes() == IMAGE
+    assert not part.part_path.exists()
+    entry = AlbumManifest(save_path.parent).entries[save_path.name]
+    assert (entry.size, entry.hash) == (len(IMAGE), None)  # not read back without the store
+
+
+@pytest.mark.parametrize("engine", ["async", "thread"])
+def test_refused_range_downloads_again_at_once(tmp_path, engine):
+    config = make_config(tmp_path)
+    save_path = tmp_path / "download" / "album" / "album 1.jpg"
+    interrupted_part(config, save_path, IMAGE + bytes(4096), 20000)  # the file got smaller since
+
+    ranges = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ranges.append(request.headers.get("Range"))
+        if "Range" in request.headers:
+            return httpx.Response(416, headers={"Content-Range": f"bytes */{len(IMAGE)}"})
+        return httpx.Response(200, content=IMAGE)
+
+    links = [("https://cdn.test/1.jpg", "album 1")]
+    if engine == "async":
+        downloader = make_engine(config, handler)
+        try:
+            size, failed, _ = downloader.submit("album", links).result()
+        finally:
+            downloader.close()
+    else:
+        logger = logging.getLogger("test")
+        transport = HttpTransport(config, logger)
+        transport._client = httpx.Client(transport=httpx.MockTransport(handler))
+        downloader = ImageDownloader(
+            config, transport, get_rate_limiter(config), get_disk_writer(config), None, None, logger
+        )
+        size, failed, _ = downloader.download_album("album", links)
+
+    assert (size, failed) == (len(IMAGE), 0)
+    assert ranges == ["bytes=20000-", None]  # no retry delay, no second run needed
+    assert save_path.read_bytes() == IMAGE
@@ -0,0 +1,17 @@
+from v2dl.v2dl import read_input_urls
+
+
+def test_input_urls_are_normalized_and_deduplicated(tmp_path):
+    input_file = tmp_path / "urls.txt"
+    input_file.write_text(
+        "# nightly\n"
+        "https://www.v2ph.com/actor/Foo?page=2\n"
+        "\n"
+        "https://www.v2ph.com/album/bar.html\n"
+        "  https://www.v2ph.com/actor/Foo  \n"
+        "https://www.v2ph.com/album/bar.html?page=3\n"
+    )
+    assert read_input_urls(str(input_file)) == [
+        "https://www.v2ph.com/actor/Foo",
+        "https://www.v2ph.com/album/bar.html",
+    ]
@@ -0,0 +1,33 @@
+import logging
+
+import httpx
+
+from benchmarks.site import SiteConfig, start_site
+from v2dl.file_writer import check_image_end
+from v2dl.link_parser import LinkParser
+
+
+def test_stand_in_site_matches_the_parser(tmp_path):
+    server = start_site(SiteConfig(images_per_page=5, album_pages=4, image_size=4))
+    logger = logging.getLogger("test")
+    try:
+        with httpx.Client(trust_env=False) as client:
+            album = LinkParser.extract_links(
+                client.get(f"{server.base_url}/album/demo.html?page=2").text, logger
+            )
+            albums = LinkParser.extract_links(
+                client.get(f"{server.base_url}/category/demo").text, logger
+            )
+            image = client.get(album.image_urls[0]).content
+    finally:
+        server.shutdown()
+
+    assert len(album.image_urls) == len(album.alts) == 5
+    assert album.alts[0] == "demo 6"
+    assert album.max_page == 4
+    assert len(albums.album_links) == 24
+    assert albums.max_page == 5  # only the pages near the current one are linked
+
+    image_path = tmp_path / "image.jpg"
+    image_path.write_bytes(image)
+    assert len(image) == 4096 and check_image_end(image_path)
@@ -0,0 +1,119 @@
+import contextlib
+import logging
+import os
+import platform
+import signal
+import socket
+import sys
+import time
+
+import pytest
+
+from v2dl.browser_daemon import BrowserDaemon, BrowserLock
+from v2dl.config import ChromeConfig
+
+from .test_async_download import make_config
+
+
+def test_lock_is_exclusive(tmp_path):
+    lock_path = str(tmp_path / "browser.lock")
+    first, second = BrowserLock(lock_path), BrowserLock(lock_path)
+    assert first.acquire(blocking=False)
+    assert not second.acquire(blocking=False)
+    second.close()
+    first.release()
+    second = BrowserLock(lock_path)
+    assert second.acquire(blocking=False)
+    second.release()
+
+
+FAKE_CHROME = """#!{python}
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+port = int(next(arg for arg in sys.argv if arg.startswith("--remote-debugging-port=")).split("=")[1])
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/json/version" else 404)
+        self.end_headers()
+        self.wfile.write(b"{{}}")
+
+    def log_message(self, *args):
+        pass
+
+
+HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A daemon whose browser is a small HTTP server answering the CDP version endpoint."""
+    chrome = tmp_path / "chrome"
+    chrome.write_text(FAKE_CHROME.format(python=sys.executable))
+    chrome.chmod(0o755)
+    config = make_config(tmp_path)
+    config.chrome = ChromeConfig(str(chrome), str(tmp_path / "profile"), free_port())
+    daemon = BrowserDaemon(config, logging.getLogger("test"))
+    yield daemon
+    state = daemon._read_state()
+    if state:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(state["pid"], signal.SIGKILL)
+
+
+def exited(pid: int, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(ChildProcessError):
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="posix fake browser")
+def test_start_reuse_and_stop(daemon):
+    assert daemon.start(timeout=10)
+    pid = daemon._read_state()["pid"]
+    assert daemon.status()["running"]
+
+    assert daemon.start()  # reused, no second browser
+    assert daemon._read_state()["pid"] == pid
+
+    assert daemon.stop()
+    assert exited(pid)
+    assert not daemon.is_running()
+    assert not os.path.exists(daemon.state_path)
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="posix fake browser")
+def test_stop_refused_while_in_use(daemon):
+    assert daemon.start(timeout=10)
+    lock = BrowserLock(daemon.lock_path)
+    assert lock.acquire(blocking=False)  # a run is attached
+
+    assert not daemon.stop()
+    assert daemon.is_running() and daemon.status()["in_use"]
+
+    pid = daemon._read_state()["pid"]
+    assert daemon.stop(force=True)
+    assert exited(pid)
+    lock.release()
+
+
+def test_stale_state_does_not_signal_its_pid(daemon):
+    # the browser is gone and its pid now belongs to another process, here the test itself
+    daemon._write_state({"pid": os.getpid(), "port": daemon.port})
+    assert not daemon.stop()
+    assert not os.path.exists(daemon.state_path)
+
+    assert not daemon.stop()  # nothing left to stop
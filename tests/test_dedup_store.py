@@ -0,0 +1,57 @@
+import errno
+import logging
+import os
+
+from v2dl.dedup_store import ContentStore, hash_file
+
+DATA = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 8 + b"\xff\xd9"
+
+
+def make_store(tmp_path, link_mode: str = "hardlink") -> ContentStore:
+    return ContentStore(tmp_path / ".v2dl_store", link_mode, logging.getLogger("test"))
+
+
+def test_add_deduplicates_and_link_places_known_urls(tmp_path):
+    store = make_store(tmp_path)
+    first = tmp_path / "a" / "1.jpg"
+    second = tmp_path / "b" / "1.jpg"
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(DATA)
+
+    digest = store.add("https://cdn.test/a/1.jpg", first)
+    assert store.add("https://cdn.test/b/1.jpg", second) == digest == hash_file(first)
+    object_path = store.object_path(digest)
+    assert os.path.samefile(first, object_path) and os.path.samefile(second, object_path)
+
+    third = tmp_path / "c" / "1.jpg"
+    third.parent.mkdir()
+    assert store.link("https://cdn.test/a/1.jpg", third)  # no download needed
+    assert os.path.samefile(third, object_path)
+    assert not store.link("https://cdn.test/unknown.jpg", tmp_path / "c" / "2.jpg")
+    assert not (tmp_path / "c" / "2.jpg").exists()
+
+    object_path.unlink()  # pruned by hand, download again
+    assert not store.link("https://cdn.test/a/1.jpg", tmp_path / "c" / "3.jpg")
+    store.close()
+
+
+def test_link_falls_back_to_copy_across_devices(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    first = tmp_path / "a" / "1.jpg"
+    first.parent.mkdir()
+    first.write_bytes(DATA)
+    digest = store.add("https://cdn.test/a/1.jpg", first)
+
+    def cross_device_link(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    other = tmp_path / "b" / "1.jpg"
+    other.parent.mkdir()
+    assert store.link("https://cdn.test/a/1.jpg", other)
+
+    assert other.read_bytes() == DATA
+    assert not os.path.samefile(other, store.object_path(digest))
+    assert not other.with_name("1.jpg.link").exists()
+    store.close()
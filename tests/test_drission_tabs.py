@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+from v2dl.web_bot.drission_bot import DriTab, DrissionBot
+
+from .test_async_download import make_config
+from .test_pacing import make_pacing
+
+
+class FakePage:
+    """Just enough of a DrissionPage tab for the tab pool."""
+
+    def __init__(self):
+        self.set = SimpleNamespace(scroll=SimpleNamespace(smooth=lambda on_off: None))
+        self.states = SimpleNamespace(is_alive=True)
+        self.opened: list[FakePage] = []
+        self.closed = False
+
+    def new_tab(self):
+        tab = FakePage()
+        self.opened.append(tab)
+        return tab
+
+    def close(self):
+        self.closed = True
+
+
+def make_bot(tmp_path, tabs: int) -> DrissionBot:
+    """A bot with a fake browser, the constructor would start Chrome."""
+    bot = DrissionBot.__new__(DrissionBot)
+    bot.config = make_config(tmp_path, scrape_tabs=tabs, http_fast_path=False)
+    bot.logger = logging.getLogger("test")
+    bot.pacing = make_pacing()
+    bot.http_pages = None
+    bot.page = FakePage()
+    bot.tab = DriTab(bot.page, bot.config, bot.logger, bot.pacing)
+    bot.tab_count = tabs
+    bot.tab_pool = None
+    bot.executor = None
+    bot.prefetched = {}
+    return bot
+
+
+def test_pages_are_loaded_in_parallel_tabs(tmp_path):
+    bot = make_bot(tmp_path, tabs=3)
+    in_use: set[int] = set()
+    peak = 0
+    lock = threading.Lock()
+
+    def load_page(tab, url):
+        nonlocal peak
+        with lock:
+            assert id(tab) not in in_use  # each tab is used by one thread at a time
+            in_use.add(id(tab))
+            peak = max(peak, len(in_use))
+        time.sleep(0.05)
+        with lock:
+            in_use.remove(id(tab))
+        return f"<html>{url}</html>"
+
+    bot.load_page = load_page
+    urls = [f"https://www.v2ph.com/album/a.html?page={i}" for i in range(1, 7)]
+    bot.prefetch_pages(urls[1:3])
+    pages = [bot.get_page(url) for url in urls]
+
+    assert pages == [f"<html>{url}</html>" for url in urls]
+    assert peak == 3
+    assert bot.tab_pool.qsize() == 3 and len(bot.page.opened) == 2  # all tabs returned
+    bot.executor.shutdown()
+
+
+def test_broken_tab_is_replaced(tmp_path):
+    bot = make_bot(tmp_path, tabs=2)
+    bot._get_executor()
+    first_extra = bot.page.opened[0]
+
+    def load_page(tab, url):
+        if tab.page is first_extra:
+            first_extra.states.is_alive = False  # the tab crashed while loading
+            return "Failed to retrieve URL"
+        return "<html></html>"
+
+    bot.load_page = load_page
+    results = [bot._load_in_pool(f"https://www.v2ph.com/album/a.html?page={i}") for i in range(4)]
+
+    assert "Failed to retrieve URL" in results
+    assert first_extra.closed
+    assert len(bot.page.opened) == 2  # a new tab took its place
+    tabs = [bot.tab_pool.get() for _ in range(bot.tab_pool.qsize())]
+    assert len(tabs) == 2 and all(tab.page is not first_extra for tab in tabs)
+    bot.executor.shutdown()
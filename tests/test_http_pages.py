@@ -0,0 +1,36 @@
+import logging
+
+import httpx
+
+from v2dl.web_bot.http_pages import HttpPageFetcher
+
+ALBUM = '<div class="album-photo my-2"><img data-src="https://cdn/1.jpg" alt="a 1"></div>'
+LOGIN = "<h1>用戶登錄</h1>"
+
+
+def make_fetcher(pages: dict[str, str]) -> HttpPageFetcher:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Cookie"] == "session=abc"
+        return httpx.Response(200, text=pages[request.url.path])
+
+    fetcher = HttpPageFetcher(interval=0, logger=logging.getLogger())
+    fetcher.client = httpx.Client(transport=httpx.MockTransport(handler))
+    fetcher.set_cookies([{"name": "session", "value": "abc", "domain": "v2ph.test"}], "UA")
+    return fetcher
+
+
+def test_needs_browser_cookies_first():
+    fetcher = HttpPageFetcher(interval=0, logger=logging.getLogger())
+    assert fetcher.fetch("https://v2ph.test/album/a") is None
+
+
+def test_fetch_album_page():
+    fetcher = make_fetcher({"/album/a": ALBUM})
+    assert fetcher.fetch("https://v2ph.test/album/a") == ALBUM
+
+
+def test_login_page_falls_back_and_disables():
+    fetcher = make_fetcher({"/album/a": LOGIN})
+    for _ in range(HttpPageFetcher.MAX_FALLBACKS):
+        assert fetcher.fetch("https://v2ph.test/album/a") is None
+    assert not fetcher.usable
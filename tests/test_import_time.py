@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+# cold start budget of the CLI module, measured with `python -X importtime`
+IMPORT_BUDGET_MS = 250
+HEAVY_MODULES = ["selenium", "DrissionPage", "httpx", "httpcore", "lxml", "PIL"]
+
+
+def import_time(module: str) -> tuple[float, set[str]]:
+    """Return the cumulative import time in ms of the module and all modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0.0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        imported.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            cumulative = int(cumulative_us) / 1000
+    return cumulative, imported
+
+
+def test_cli_import_within_budget():
+    # best of a few runs, the first may compile the bytecode
+    elapsed, imported = min(import_time("v2dl.v2dl") for _ in range(3))
+    assert not imported & set(HEAVY_MODULES), "heavy modules imported at startup"
+    assert elapsed < IMPORT_BUDGET_MS, f"import took {elapsed:.0f}ms"
+
+
+def test_only_selected_backend_is_imported():
+    _, imported = import_time("v2dl.web_bot.drission_bot")
+    assert "DrissionPage" in imported
+    assert "selenium" not in imported
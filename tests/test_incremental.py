@@ -0,0 +1,104 @@
+import logging
+
+from v2dl.album_state import AlbumStateStore
+from v2dl.const import BASE_URL
+from v2dl import v2dl
+from v2dl.v2dl import LinkScraper, ScrapeManager, ScrapeResult, stop_at_known_albums
+
+from .test_async_download import make_config
+from .test_pacing import make_pacing
+
+
+class CategoryBot:
+    """Serves a category of 60 pages with 3 albums each, newest first."""
+
+    prefetch_count = 0
+
+    def __init__(self, failed_page: int | None = None):
+        self.pacing = make_pacing()
+        self.pages_loaded = 0
+        self.failed_page = failed_page
+
+    def get_page(self, url: str) -> str:
+        self.pages_loaded += 1
+        page = int(url.rsplit("page=", 1)[1])
+        if page == self.failed_page:
+            return "Failed to load"
+        albums = "".join(
+            f'<a class="media-cover" href="/album/{i}.html"></a>'
+            for i in range(page * 3 - 3, page * 3)
+        )
+        pages = "".join(
+            f'<li class="page-item"><a class="page-link" href="?page={p}">{p}</a></li>'
+            for p in range(1, 61)
+        )
+        return f"<html><body>{albums}{pages}</body></html>"
+
+    def prefetch_pages(self, urls):
+        pass
+
+    def cancel_prefetch(self):
+        pass
+
+    def close_driver(self):
+        pass
+
+
+def test_incremental_sync_stops_at_known_albums(tmp_path):
+    store = AlbumStateStore(str(tmp_path / "state.sqlite3"))
+    for i in range(2, 180):
+        store.finish(f"{BASE_URL}/album/{i}.html", images=1, failed=0)
+    store.set_status(f"{BASE_URL}/album/5.html", "partial")  # breaks the run of known albums
+
+    bot = CategoryBot()
+    scraper = LinkScraper(bot, True, None, logging.getLogger("test"))
+    albums = scraper.scrape_link(
+        f"{BASE_URL}/category/foo",
+        1,
+        True,
+        should_stop=stop_at_known_albums(store.is_downloaded, 4),
+    )
+    # new albums 0, 1 and 5, then 6 to 9 in a row are known
+    assert bot.pages_loaded == 4
+    assert len(albums) == 12
+
+    bot = CategoryBot()
+    LinkScraper(bot, True, None, logging.getLogger("test")).scrape_link(
+        f"{BASE_URL}/category/foo", 1, True
+    )
+    assert bot.pages_loaded == 60
+    store.close()
+
+
+def test_failed_page_ends_scrape_early():
+    scraper = LinkScraper(CategoryBot(failed_page=30), True, None, logging.getLogger("test"))
+    albums = scraper.scrape_link(f"{BASE_URL}/category/foo", 1, True)
+    assert len(albums) == 87
+    assert not scraper.reached_end  # not a full sweep
+
+    scraper.web_bot = CategoryBot()
+    scraper.scrape_link(f"{BASE_URL}/category/foo", 1, True)
+    assert scraper.reached_end
+
+
+def test_full_sweep_time_per_list(tmp_path):
+    store = AlbumStateStore(str(tmp_path / "state.sqlite3"))
+    assert store.last_full_sweep(f"{BASE_URL}/category/foo") is None
+    store.set_full_sweep(f"{BASE_URL}/category/foo?page=1", 1000.0)
+    assert store.last_full_sweep(f"{BASE_URL}/category/foo") == 1000.0
+    store.close()
+
+
+def test_dry_run_builds_no_download_service(tmp_path, monkeypatch):
+    def no_service(*args, **kwargs):
+        raise AssertionError("a dry run must not start download workers")
+
+    monkeypatch.setattr(v2dl, "DownloadService", no_service)
+    url = f"{BASE_URL}/category/foo"
+    manager = ScrapeManager(
+        url, CategoryBot(), True, make_config(tmp_path), logging.getLogger("test")
+    )
+    result = ScrapeResult(url)
+    manager.scrape_url(url, result)
+    manager.close()
+    assert (result.status, result.albums) == ("dry run", 180)
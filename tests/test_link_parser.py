@@ -0,0 +1,41 @@
+import logging
+
+from lxml import html
+
+from v2dl.const import XPATH_ALBUM, XPATH_ALBUM_LIST, XPATH_ALTS
+from v2dl.link_parser import LinkParser
+
+ALBUM_PAGE = """<html><body>
+<div class="album-photo my-2"><img data-src="https://cdn/1.jpg" alt="Album 1"></div>
+<div class="album-photo my-2"><img data-src="https://cdn/2.jpg"><br></div>
+<div class="album-photo"><img data-src="https://cdn/ad.jpg" alt="ad"></div>
+<div class="album-photo my-2"><p><img data-src="https://cdn/nested.jpg" alt="nested"></p></div>
+<a class="media-cover" href="/album/a.html">a</a>
+<a class="media-cover big" href="/album/b.html">b</a>
+<ul>
+<li class="page-item"><a class="page-link" href="?page=2">2</a></li>
+<li class="page-item"><a class="page-link" href="?page=12">12</a></li>
+<li class="page-item"><a class="page-link" href="?page=40">last</a></li>
+<li class="page-item active"><a class="page-link" href="?page=30">30</a></li>
+</ul>
+</body></html>
+"""
+
+
+def test_single_pass_matches_xpath():
+    links = LinkParser.extract_links(ALBUM_PAGE, logging.getLogger(__name__))
+    tree = LinkParser.parse_html(ALBUM_PAGE, logging.getLogger(__name__))
+
+    assert links.image_urls == tree.xpath(XPATH_ALBUM) == ["https://cdn/1.jpg", "https://cdn/2.jpg"]
+    assert links.alts == tree.xpath(XPATH_ALTS) == ["Album 1"]
+    assert links.album_links == tree.xpath(XPATH_ALBUM_LIST) == ["/album/a.html"]
+    assert links.max_page == LinkParser.get_max_page(tree) == 12
+
+
+def test_pages_without_links():
+    logger = logging.getLogger(__name__)
+    assert LinkParser.extract_links("Failed to load", logger) is None
+
+    links = LinkParser.extract_links("<html><body><p>empty</p></body></html>", logger)
+    assert (links.image_urls, links.album_links, links.max_page) == ([], [], 1)
+    assert LinkParser.get_max_page(html.fromstring("<p>empty</p>")) == 1
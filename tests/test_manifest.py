@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from v2dl.manifest import AlbumManifest
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 32 + b"\xff\xd9"
+
+
+def test_skip_decisions_from_manifest_and_listing(tmp_path, monkeypatch):
+    manifest = AlbumManifest(tmp_path)
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        (tmp_path / name).write_bytes(JPEG)
+        manifest.record(tmp_path / name, url=f"https://cdn/{name}", digest="d" + name)
+    manifest.record_failed(tmp_path / "c.jpg")
+    (tmp_path / "b.jpg").unlink()
+
+    def no_stat(self, *args, **kwargs):
+        raise AssertionError(f"stat called for {self}")
+
+    reloaded = AlbumManifest(tmp_path)
+    monkeypatch.setattr(Path, "stat", no_stat)
+    assert reloaded.is_complete(tmp_path / "a.jpg", verify=True)
+    assert not reloaded.is_complete(tmp_path / "b.jpg", verify=True)  # deleted
+    assert reloaded.entries["a.jpg"].url == "https://cdn/a.jpg"
+    assert reloaded.entries["a.jpg"].hash == "da.jpg"
+    assert reloaded.entries["c.jpg"].status == "failed"
+
+
+def test_adopts_files_of_older_versions(tmp_path):
+    (tmp_path / "old.jpg").write_bytes(JPEG)
+    (tmp_path / "cut.jpg").write_bytes(JPEG[:-2])
+    manifest = AlbumManifest(tmp_path)
+    assert manifest.is_complete(tmp_path / "old.jpg", verify=True)
+    assert not manifest.is_complete(tmp_path / "cut.jpg", verify=True)
+    assert manifest.entries["old.jpg"].size == len(JPEG)
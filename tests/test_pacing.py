@@ -0,0 +1,74 @@
+import logging
+import time
+
+from v2dl.pacing import AdaptivePolicy, FixedPolicy, Pacer, PacingScheduler, VirtualClock
+from v2dl.v2dl import LinkScraper
+
+PAUSES = {"page": [5, 10], "page_batch": [15, 15], "retry": [5, 10]}
+
+
+def make_pacing(policy=None, budget=0, clock=None) -> PacingScheduler:
+    return PacingScheduler(PAUSES, policy or FixedPolicy(), 3, budget, 3, clock or VirtualClock())
+
+
+def test_pacer_spaces_page_loads_in_virtual_time():
+    clock = VirtualClock()
+    pacer = Pacer(3, clock)
+    for _ in range(4):
+        pacer.wait()
+    assert clock.now() == 9
+
+
+def test_pause_within_range_and_budget():
+    pacing = make_pacing(budget=10)
+    assert 5 <= pacing.pause("page") <= 10
+    assert pacing.pause("page") == 5  # over budget, only the lower bound
+    assert pacing.clock.now() == sum(pacing.spent.values())
+
+
+def test_adaptive_policy_backs_off_and_recovers():
+    policy = AdaptivePolicy(target_latency=2, max_factor=4)
+    policy.record(0.5, error=True)
+    policy.record(0.5, error=True)
+    policy.record(0.5, error=True)
+    assert policy.factor() == 4
+    policy.record(3, error=False)
+    assert policy.factor() == 4
+    for _ in range(10):
+        policy.record(0.5, error=False)
+    assert policy.factor() == 1
+
+
+class ListPageBot:
+    """Serves album list pages with 7 pages of pagination."""
+
+    prefetch_count = 0
+
+    def __init__(self, pacing: PacingScheduler):
+        self.pacing = pacing
+
+    def get_page(self, url: str) -> str:
+        self.pacing.wait_turn()
+        pages = "".join(
+            f'<li class="page-item"><a class="page-link" href="?page={p}">{p}</a></li>'
+            for p in range(1, 8)
+        )
+        return f'<html><body><a class="media-cover" href="/album/{url[-1]}.html"></a>{pages}</body></html>'
+
+    def prefetch_pages(self, urls):
+        pass
+
+    def cancel_prefetch(self):
+        pass
+
+
+def test_scraper_runs_in_virtual_time():
+    pacing = make_pacing()
+    scraper = LinkScraper(ListPageBot(pacing), True, None, logging.getLogger("test"))
+    start = time.monotonic()
+    albums = scraper.scrape_link("https://www.v2ph.com/actor/foo", 1, True)
+    assert len(albums) == 7
+    assert time.monotonic() - start < 1
+    # pages 3s apart with a 15s pause after page 3 and 6: 0, 3, 6, 21, 24, 27, 42
+    assert pacing.spent["page_batch"] == 30
+    assert pacing.clock.now() == 42
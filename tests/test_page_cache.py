@@ -0,0 +1,65 @@
+import logging
+import os
+import time
+
+from v2dl.page_cache import CachedBot, PageCache
+from v2dl.pacing import FixedPolicy, PacingScheduler, VirtualClock
+from v2dl.v2dl import LinkScraper
+
+from .test_pacing import ListPageBot, make_pacing
+
+LOGGER = logging.getLogger("test")
+TTLS = {"album": 86400, "list": 3600}
+ALBUM_PAGE = (
+    '<html><body><div class="album-photo my-2"><img data-src="x" alt="y"></div></body></html>'
+)
+
+
+class CountingBot(ListPageBot):
+    def __init__(self, pacing: PacingScheduler):
+        super().__init__(pacing)
+        self.loaded: list[str] = []
+
+    def get_page(self, url: str) -> str:
+        self.loaded.append(url)
+        return super().get_page(url)
+
+
+def test_ttl_by_page_type_and_normalised_keys(tmp_path):
+    cache = PageCache(str(tmp_path), TTLS, LOGGER)
+    album = "https://www.v2ph.com/album/foo?page=1"
+    assert cache.put(album, ALBUM_PAGE)
+    assert cache.put(
+        "https://www.v2ph.com/actor/bar?page=2", ALBUM_PAGE.replace('alt="y"', 'alt="z"')
+    )
+    assert not cache.put("https://www.v2ph.com/album/login", "<html>Just a moment...</html>")
+    assert cache.get("HTTPS://WWW.V2PH.COM/album/foo#top") == ALBUM_PAGE
+
+    two_hours_ago = time.time() - 7200
+    for path in (cache.path(album), cache.path("https://www.v2ph.com/actor/bar?page=2")):
+        os.utime(path, (two_hours_ago, two_hours_ago))
+    assert cache.get(album) == ALBUM_PAGE  # album pages stay fresh for a day
+    assert cache.get("https://www.v2ph.com/actor/bar?page=2") is None
+    assert cache.get("https://www.v2ph.com/actor/bar?page=2", ignore_ttl=True) is not None
+
+
+def test_rerun_and_offline_skip_the_browser(tmp_path):
+    cache = PageCache(str(tmp_path), TTLS, LOGGER)
+    bot = CountingBot(make_pacing())
+    url = "https://www.v2ph.com/actor/foo"
+
+    first = LinkScraper(CachedBot(bot, cache, LOGGER), True, None, LOGGER).scrape_link(url, 1, True)
+    assert len(bot.loaded) == 7
+
+    bot.pacing = make_pacing()
+    rerun = LinkScraper(CachedBot(bot, cache, LOGGER), True, None, LOGGER).scrape_link(url, 1, True)
+    assert rerun == first
+    assert len(bot.loaded) == 7
+    assert bot.pacing.clock.now() == 0  # cached pages are not paced
+
+    offline_bot = CachedBot(
+        None, cache, LOGGER, PacingScheduler({}, FixedPolicy(), 3, clock=VirtualClock())
+    )
+    offline = LinkScraper(offline_bot, True, None, LOGGER).scrape_link(url, 1, True)
+    assert offline == first
+    assert LinkScraper(offline_bot, True, None, LOGGER).scrape_link(url + "x", 1, True) == []
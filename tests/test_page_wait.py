@@ -0,0 +1,41 @@
+import logging
+import time
+from types import SimpleNamespace
+
+from v2dl.web_bot.base import BaseScroll
+
+from .test_pacing import make_pacing
+
+
+class FakeScroll(BaseScroll):
+    """Replays the DOM states returned by the content script."""
+
+    def __init__(self, states, quiet_time=0.5, timeout=1.0):
+        download = SimpleNamespace(dom_quiet_time=quiet_time, dom_wait_timeout=timeout)
+        config = SimpleNamespace(download=download)
+        super().__init__(config, logging.getLogger("test"), make_pacing())
+        self.states = iter(states)
+        self.calls = 0
+
+    def run_js(self, script, *args):
+        self.calls += 1
+        return next(self.states, self.last)
+
+    @property
+    def last(self):
+        return [0, 0.0, "loading"]
+
+
+def test_returns_once_content_settles():
+    scroll = FakeScroll([[0, 0.0, "loading"], [12, 0.1, "interactive"], [12, 0.6, "complete"]])
+    assert scroll.wait_for_content(poll_interval=0.001)
+    assert scroll.calls == 3
+
+
+def test_times_out_without_content():
+    scroll = FakeScroll([], timeout=30)
+    start = time.monotonic()
+    assert not scroll.wait_for_content(poll_interval=0.1)
+    assert time.monotonic() - start < 1  # waited on the virtual clock of the pacing
+    assert 30 <= scroll.pacing.now() < 30.2
+    assert scroll.calls == 300
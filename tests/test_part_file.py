@@ -0,0 +1,85 @@
+import os
+
+import httpx
+import pytest
+
+from v2dl.file_writer import DiskWriter, IncompleteDownloadError, PartFile
+
+URL = "https://cdn.v2ph.test/1.webp"
+DATA = bytes(range(256)) * 40
+
+
+def response(status: int, headers: dict[str, str]) -> httpx.Response:
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", URL))
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fallocate"), reason="no preallocation")
+def test_resume_preallocated_part_after_crash(tmp_path):
+    path = tmp_path / "1.webp"
+    disk_writer = DiskWriter(1024, 2, preallocate=True, background=False)
+
+    part = PartFile(path)
+    offset = part.begin(response(200, {"Content-Length": str(len(DATA)), "ETag": '"a"'}))
+    file = part.open(disk_writer, offset)
+    file.write(DATA[:3000])
+    file.flush()
+    file.file.close()  # killed mid-stream, the file keeps its preallocated length
+    assert part.part_path.stat().st_size == len(DATA)
+
+    part = PartFile(path)
+    assert part.offset == 0  # nothing is known to be written
+    offset = part.begin(response(200, {"Content-Length": str(len(DATA)), "ETag": '"a"'}))
+    with pytest.raises(httpx.ReadError):
+        with part.open(disk_writer, offset) as file:
+            file.write(DATA[:4000])
+            raise httpx.ReadError("connection lost")
+
+    part = PartFile(path)
+    assert part.offset == 4000
+    assert part.request_headers()["Range"] == "bytes=4000-"
+    content_range = f"bytes 4000-{len(DATA) - 1}/{len(DATA)}"
+    offset = part.begin(response(206, {"Content-Range": content_range, "ETag": '"a"'}))
+    with part.open(disk_writer, offset) as file:
+        file.write(DATA[4000:])
+    part.commit(file.size)
+
+    assert path.read_bytes() == DATA
+    assert not part.part_path.exists() and not part.meta_path.exists()
+
+
+def test_commit_replaces_the_old_file_only_when_complete(tmp_path):
+    path = tmp_path / "1.webp"
+    path.write_bytes(b"old")
+    disk_writer = DiskWriter(1024, 2, preallocate=False, background=False)
+
+    part = PartFile(path)
+    offset = part.begin(response(200, {"Content-Length": str(len(DATA))}))
+    with part.open(disk_writer, offset) as file:
+        file.write(DATA[:3000])
+    with pytest.raises(IncompleteDownloadError):
+        part.commit(file.size)
+    assert path.read_bytes() == b"old"  # readers never see a half written file
+    assert part.part_path.exists()  # kept to be resumed
+
+    part = PartFile(path)
+    offset = part.begin(response(206, {"Content-Range": f"bytes 3000-{len(DATA) - 1}/{len(DATA)}"}))
+    with part.open(disk_writer, offset) as file:
+        file.write(DATA[3000:])
+    part.commit(file.size)
+    assert path.read_bytes() == DATA
+
+
+def test_verify_rejects_truncated_image(tmp_path):
+    path = tmp_path / "1.jpg"
+    truncated = b"\xff\xd8\xff\xe0" + bytes(1000)  # the JPEG end marker is missing
+    disk_writer = DiskWriter(1024, 2, preallocate=False, background=False)
+
+    part = PartFile(path)
+    offset = part.begin(response(200, {"Content-Length": str(len(truncated))}))
+    with part.open(disk_writer, offset) as file:
+        file.write(truncated)
+    with pytest.raises(IncompleteDownloadError, match="Truncated"):
+        part.commit(file.size, verify=True)
+
+    assert not path.exists()
+    assert not part.part_path.exists() and not part.meta_path.exists()  # downloaded again
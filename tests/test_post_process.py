@@ -0,0 +1,36 @@
+from v2dl.manifest import AlbumManifest
+from v2dl.post_process import run_steps, sniff_format
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+
+def test_sniff_format(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(PNG)
+    assert sniff_format(path) == ".png"
+    path.write_bytes(b"not an image")
+    assert sniff_format(path) is None
+
+
+def test_fix_extension(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(PNG)
+    result = run_steps(str(path), ["sniff"], {})
+    assert result.error is None
+    assert result.path == str(tmp_path / "image.png")
+    assert not path.exists()
+
+
+def test_unknown_format_is_an_error(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"<html>blocked</html>")
+    assert run_steps(str(path), ["sniff"], {}).error is not None
+
+
+def test_manifest_follows_renamed_file(tmp_path):
+    manifest = AlbumManifest(tmp_path)
+    (tmp_path / "image.png").write_bytes(PNG)
+    manifest.record(tmp_path / "image.jpg", len(PNG), stored_as="image.png")
+
+    reloaded = AlbumManifest(tmp_path)
+    assert reloaded.is_complete(tmp_path / "image.jpg", verify=True)
@@ -0,0 +1,62 @@
+import asyncio
+import platform
+import threading
+
+import pytest
+
+from v2dl.rate_limiter import SharedTokenBucket, TokenBucket
+
+
+def test_burst_then_wait():
+    bucket = TokenBucket(rate=1000, burst=500)
+    assert bucket.reserve(500) == 0
+    assert bucket.reserve(1000) == pytest.approx(1.0, abs=0.05)
+
+
+def test_unlimited_rate():
+    bucket = TokenBucket(rate=0, burst=0)
+    assert bucket.reserve(10**9) == 0
+
+
+def test_shared_bucket_between_instances(tmp_path):
+    state_path = str(tmp_path / "rate_limit.state")
+    first = SharedTokenBucket(rate=1000, burst=1000, state_path=state_path)
+    second = SharedTokenBucket(rate=1000, burst=1000, state_path=state_path)
+    try:
+        assert first.reserve(1000) == 0
+        # the tokens were taken by the other limiter
+        assert second.reserve(1000) == pytest.approx(1.0, abs=0.05)
+    finally:
+        first.close()
+        second.close()
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="flock")
+def test_shared_bucket_waits_for_the_file_lock_off_the_event_loop(tmp_path):
+    import fcntl
+
+    state_path = str(tmp_path / "rate_limit.state")
+    bucket = SharedTokenBucket(rate=1000, burst=1000, state_path=state_path)
+    other = open(state_path, "rb")  # another process holding the lock
+    fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+    threading.Timer(0.3, fcntl.flock, (other.fileno(), fcntl.LOCK_UN)).start()
+
+    async def run() -> int:
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        await bucket.acquire_async(100)
+        ticker.cancel()
+        return ticks
+
+    try:
+        assert asyncio.run(run()) > 10  # the loop kept running while the lock was held
+    finally:
+        bucket.close()
+        other.close()
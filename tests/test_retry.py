@@ -0,0 +1,35 @@
+import httpx
+
+from v2dl.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+def status_error(status: int, headers: dict | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://cdn.example.com/a.jpg")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def test_retryable_errors():
+    assert RetryPolicy.is_retryable(status_error(503))
+    assert RetryPolicy.is_retryable(httpx.ConnectError("refused"))
+    assert not RetryPolicy.is_retryable(status_error(404))
+
+
+def test_retry_after_overrides_backoff():
+    policy = RetryPolicy(max_retries=3, backoff=0.001, backoff_max=60)
+    assert policy.delay(0, status_error(429, {"Retry-After": "5"})) == 5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_breaker_opens_then_recovers_gradually():
+    breaker = CircuitBreaker(threshold=2, window=10, cooldown=0, max_cooldown=0)
+    assert breaker.reserve("cdn") == 0
+    assert not breaker.record("cdn", False)
+    assert breaker.record("cdn", False)
+
+    # recovering, one request per gap
+    assert breaker.reserve("cdn") == 0
+    assert breaker.reserve("cdn") > 0.9
+    breaker.record("cdn", True)
+    assert breaker.hosts["cdn"].gap == CircuitBreaker.RECOVERY_GAP / 2
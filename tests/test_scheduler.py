@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from v2dl.scheduler import DownloadScheduler
+
+
+def drain(scheduler: DownloadScheduler) -> list[str]:
+    scheduler.close()
+    order = []
+    while (task := scheduler.get()) is not None:
+        order.append(task[1][0][0])
+        scheduler.task_done()
+    return order
+
+
+def images(prefix: str, count: int) -> list[tuple[str, str]]:
+    return [(f"{prefix}{i}", f"{prefix} {i}") for i in range(count)]
+
+
+def test_fifo_finishes_albums_in_order():
+    scheduler = DownloadScheduler("fifo")
+    scheduler.put("a", images("a", 2))
+    scheduler.put("b", images("b", 2))
+    assert drain(scheduler) == ["a0", "a1", "b0", "b1"]
+
+
+def test_round_robin_alternates_albums():
+    scheduler = DownloadScheduler("round_robin")
+    scheduler.put("a", images("a", 3))
+    scheduler.put("b", images("b", 1))
+    assert drain(scheduler) == ["a0", "b0", "a1", "a2"]
+
+
+def test_smallest_album_first():
+    scheduler = DownloadScheduler("smallest_first")
+    scheduler.put("big", images("big", 3))
+    scheduler.put("small", images("small", 1))
+    assert drain(scheduler) == ["small0", "big0", "big1", "big2"]
+
+
+def test_priority_goes_before_policy():
+    scheduler = DownloadScheduler("fifo")
+    scheduler.put("list", images("list", 2))
+    scheduler.put("album", images("album", 1), priority=1)
+    assert drain(scheduler) == ["album0", "list0", "list1"]
+
+
+def test_join_waits_for_task_done():
+    scheduler = DownloadScheduler()
+    scheduler.put("a", images("a", 1))
+    joined = threading.Event()
+    thread = threading.Thread(target=lambda: (scheduler.join(), joined.set()))
+    thread.start()
+
+    assert scheduler.get() is not None
+    assert not joined.wait(0.05)
+    scheduler.task_done()
+    thread.join(1)
+    assert joined.is_set()
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        DownloadScheduler("random")
+
+
+def test_put_blocks_while_full():
+    scheduler = DownloadScheduler(max_images=2)
+    scheduler.put("a", images("a", 2))
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (scheduler.put("b", images("b", 1)), done.set()))
+    thread.start()
+
+    assert not done.wait(0.05)
+    scheduler.get()
+    thread.join(1)
+    assert done.is_set()
+    assert scheduler.get_stats().producer_blocked == 1
+
+
+def test_byte_bound_follows_downloaded_sizes():
+    scheduler = DownloadScheduler(max_bytes=1000, image_size=100)
+    scheduler.put("a", images("a", 5))
+    assert not scheduler._is_full(5)
+    for _ in range(100):
+        scheduler.task_done(size=1000)
+    assert scheduler._is_full(1)
+
+
+def test_album_url_follows_each_image():
+    scheduler = DownloadScheduler("fifo")
+    scheduler.put("same name", images("a", 1), album_url="https://v2ph.test/album/a.html")
+    scheduler.put("same name", images("b", 1), album_url="https://v2ph.test/album/b.html")
+    scheduler.close()
+    assert [scheduler.get()[2], scheduler.get()[2]] == [
+        "https://v2ph.test/album/a.html",
+        "https://v2ph.test/album/b.html",
+    ]
+
+
+def test_albums_with_the_same_name_take_turns():
+    scheduler = DownloadScheduler("round_robin")
+    scheduler.put("same name", images("a", 2), album_url="https://v2ph.test/album/a.html")
+    scheduler.put("same name", images("b", 2), album_url="https://v2ph.test/album/b.html")
+    scheduler.put("same name", images("a", 3)[2:], album_url="https://v2ph.test/album/a.html")
+    assert drain(scheduler) == ["a0", "b0", "a1", "b1", "a2"]
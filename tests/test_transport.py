@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import time
+
+from benchmarks.site import SiteConfig, start_site
+from v2dl.transport import DNSCache, HttpTransport
+
+from .test_async_download import make_config
+
+
+def test_clients_reuse_connections_and_dns(tmp_path):
+    server = start_site(SiteConfig(image_size=4))
+    transport = HttpTransport(make_config(tmp_path, http2=False), logging.getLogger("test"))
+    urls = [f"{server.base_url}/cdn/demo/{i}.jpg" for i in range(5)]
+
+    async def download_async():
+        try:
+            for url in urls:
+                (await transport.async_client.get(url)).raise_for_status()
+        finally:
+            await transport.aclose()
+
+    try:
+        for url in urls:
+            transport.client.get(url).raise_for_status()
+        asyncio.run(download_async())
+    finally:
+        transport.close()
+        server.shutdown()
+
+    stats = transport.pool_stats()
+    assert (stats["requests"], stats["connections"]) == (10, 2)  # one per client
+    assert stats["reused_requests"] == 8
+    assert stats["http_versions"] == {"HTTP/1.1": 10}
+    assert (stats["dns_lookups"], stats["dns_cache_hits"]) == (1, 1)  # shared by both clients
+
+
+def test_dns_cache_expires():
+    cache = DNSCache(ttl=0.05)
+    assert cache.resolve("127.0.0.1", 80) == "127.0.0.1"
+    assert cache.resolve("127.0.0.1", 80) == "127.0.0.1"
+    assert (cache.lookups, cache.hits) == (1, 1)
+
+    time.sleep(0.06)
+    assert cache.get("127.0.0.1", 80) is None
+    cache.resolve("127.0.0.1", 80)
+    assert (cache.lookups, cache.hits) == (2, 1)
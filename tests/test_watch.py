@@ -0,0 +1,86 @@
+import logging
+import time
+
+from v2dl.watch import SubscriptionStore, WatchDaemon, WatchScheduler
+
+HOUR = 3600
+
+
+def test_schedule_is_spread_and_persisted(tmp_path):
+    db_path = str(tmp_path / "watch.sqlite3")
+    scheduler = WatchScheduler(SubscriptionStore(db_path), jitter=0.1, spacing=300)
+    for i in range(20):
+        assert scheduler.subscribe(f"https://www.v2ph.com/actor/{i}", 24 * HOUR, now=0)
+    assert not scheduler.subscribe("https://www.v2ph.com/actor/0?page=2", 12 * HOUR, now=0)
+
+    subscriptions = scheduler.store.all()
+    assert len(subscriptions) == 20
+    assert all(0 <= s.next_poll <= 24 * HOUR for s in subscriptions)
+    assert subscriptions[-1].next_poll - subscriptions[0].next_poll > 6 * HOUR
+
+    # after a restart everything is overdue, the polls are spaced out
+    scheduler = WatchScheduler(SubscriptionStore(db_path), jitter=0.1, spacing=300)
+    now = 48 * HOUR
+    first, _ = scheduler.next_due(now)
+    next_poll = scheduler.finish(first, "done", now)
+    assert 0.9 * first.interval <= next_poll - now <= 1.1 * first.interval
+    assert scheduler.next_due(now + 10) == (None, 290)
+    second, _ = scheduler.next_due(now + 300)
+    assert second.url != first.url
+    assert scheduler.finish(second, "failed", now + 300) - now - 300 <= 0.275 * second.interval
+
+
+class FakeBot:
+    def __init__(self, events: list):
+        self.events = events
+        self.attached = True
+
+    def detach_browser(self):
+        self.attached = False
+        self.events.append("detach")
+
+    def reattach_browser(self):
+        self.attached = True
+
+
+class FakeManager:
+    def __init__(self, daemon_ref: list):
+        self.results = []
+        self.events: list[str] = []
+        self.polled: list[tuple[str, str]] = []
+        self.closed = False
+        self.daemon_ref = daemon_ref
+        self.web_bot = FakeBot(self.events)
+
+    def scrape_url(self, url, result):
+        assert self.web_bot.attached
+        self.events.append(url)
+        self.polled.append((url, result))
+        if url.endswith("bad"):
+            raise ValueError("broken page")
+        result.status = "done"
+        if len(self.polled) == 3:
+            self.daemon_ref[0].stop()
+
+    def close(self):
+        self.closed = True
+
+
+def test_daemon_polls_with_one_manager(tmp_path):
+    scheduler = WatchScheduler(SubscriptionStore(str(tmp_path / "watch.sqlite3")), 0.1, 0)
+    for i, url in enumerate(("https://www.v2ph.com/actor/a", "https://www.v2ph.com/actor/bad")):
+        scheduler.store.add(url, 24 * HOUR, next_poll=i * 0.5)
+    scheduler.store.add("https://www.v2ph.com/actor/c", 24 * HOUR, next_poll=time.time() + 0.3)
+
+    daemon_ref: list = []
+    daemon = WatchDaemon(scheduler, logging.getLogger("test"))
+    daemon_ref.append(daemon)
+    manager = FakeManager(daemon_ref)
+    assert daemon.run(manager) == 3
+    assert manager.closed
+    assert [result.status for _, result in manager.polled] == ["done", "failed", "done"]
+    assert manager.results == []  # nothing piles up in the manager
+    # the browser is left to other runs while waiting for the next poll
+    assert [event.rsplit("/", 1)[-1] for event in manager.events] == ["a", "bad", "detach", "c"]
+    statuses = {s.url.rsplit("/", 1)[1]: s.last_status for s in scheduler.store.all()}
+    assert statuses == {"a": "done", "bad": "failed", "c": "done"}
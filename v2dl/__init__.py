@@ -1,8 +1,6 @@
 # v2dl/__init__.py
 from .config import Config, ConfigManager
 from .custom_logger import setup_logging
-from .v2dl import ScrapeManager, ScrapeError, FileProcessingError, DownloadError
-from .web_bot import get_bot
 
 __all__ = [
     "Config",
@@ -15,4 +13,21 @@ __all__ = [
     "get_bot",
 ]
 
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+# loaded on first access to keep the startup of the CLI fast
+_LAZY_ATTRS = {
+    "ScrapeManager": ".v2dl",
+    "ScrapeError": ".v2dl",
+    "FileProcessingError": ".v2dl",
+    "DownloadError": ".v2dl",
+    "get_bot": ".web_bot",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
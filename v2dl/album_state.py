@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from .config import Config
+from .link_parser import LinkParser
+
+STATUSES = ("scraped", "downloading", "complete", "partial")
+
+
+@dataclass
+class AlbumState:
+    url: str
+    status: str
+    images: int
+    downloaded: int
+    failed: int
+    created_at: float
+    updated_at: float
+
+
+class AlbumStateStore:
+    """Download state of every album in SQLite, replaces the text log of downloaded albums.
+
+    - scraped: image links found but nothing queued, e.g. in a dry run.
+    - downloading: images queued for download.
+    - complete: all images downloaded, the album is skipped from now on.
+    - partial: done, but some images failed and the album is tried again next time.
+
+    The database runs in WAL mode, so several v2dl processes can use it at the same time. Album
+    URLs are stored without their page number. The time of the last full sweep of each album list
+    is kept for incremental syncs.
+    """
+
+    def __init__(self, db_path: str, legacy_log: str | None = None):
+        """
+        Args:
+            db_path (str): Database file.
+            legacy_log (str): Text log of downloaded albums, imported once as complete albums.
+        """
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS albums ("
+                "url TEXT PRIMARY KEY, status TEXT NOT NULL, images INTEGER DEFAULT 0, "
+                "downloaded INTEGER DEFAULT 0, failed INTEGER DEFAULT 0, "
+                "created_at REAL, updated_at REAL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS albums_status ON albums (status)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS album_lists (url TEXT PRIMARY KEY, full_sweep_at REAL)"
+            )
+        if legacy_log is not None:
+            self.import_log(legacy_log)
+
+    def close(self):
+        self.db.close()
+
+    def is_downloaded(self, album_url: str) -> bool:
+        album = self.get(album_url)
+        return album is not None and album.status == "complete"
+
+    def get(self, album_url: str) -> AlbumState | None:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT * FROM albums WHERE url = ?", (LinkParser.remove_page_num(album_url),)
+            ).fetchone()
+        return AlbumState(*row) if row else None
+
+    def set_status(self, album_url: str, status: str, images: int | None = None):
+        """Set the status of an album, `images` is the number of images found."""
+        self._upsert(album_url, status, images=images)
+
+    def finish(self, album_url: str, images: int, failed: int, truncated: bool = False):
+        """Mark an album done after its downloads, complete only if no image failed.
+
+        A truncated album, whose scrape stopped before the last page, is always partial.
+        """
+        status = "complete" if failed == 0 and not truncated else "partial"
+        self._upsert(album_url, status, images=images, downloaded=images - failed, failed=failed)
+
+    def count(self, status: str) -> int:
+        with self.lock:
+            row = self.db.execute("SELECT COUNT(*) FROM albums WHERE status = ?", (status,))
+            return row.fetchone()[0]
+
+    def last_full_sweep(self, list_url: str) -> float | None:
+        """Return when every page of an album list was last scraped, `None` if never."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT full_sweep_at FROM album_lists WHERE url = ?",
+                (LinkParser.remove_page_num(list_url),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_full_sweep(self, list_url: str, sweep_time: float | None = None):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO album_lists VALUES (?, ?)",
+                (LinkParser.remove_page_num(list_url), sweep_time or time.time()),
+            )
+
+    def import_log(self, log_path: str) -> int:
+        """Import the text log of older versions once, return the number of albums imported."""
+        with self.lock:
+            done = self.db.execute("SELECT value FROM meta WHERE key = 'imported_log'").fetchone()
+        if done or not os.path.exists(log_path):
+            return 0
+
+        with open(log_path, encoding="utf-8") as f:
+            urls = {LinkParser.remove_page_num(line.strip()) for line in f if line.strip()}
+        now = time.time()
+        with self.lock, self.db:
+            cursor = self.db.executemany(
+                "INSERT OR IGNORE INTO albums (url, status, created_at, updated_at) "
+                "VALUES (?, 'complete', ?, ?)",
+                [(url, now, now) for url in urls],
+            )
+            self.db.execute("INSERT INTO meta VALUES ('imported_log', ?)", (log_path,))
+        return cursor.rowcount
+
+    def _upsert(self, album_url: str, status: str, **counts: int | None):
+        if status not in STATUSES:
+            raise ValueError(f"Unknown album status: {status}")
+        counts = {key: value for key, value in counts.items() if value is not None}
+        columns = ["url", "status", "created_at", "updated_at", *counts]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in ["status", *counts])
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(
+                f"INSERT INTO albums ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (url) DO UPDATE SET {updates}, updated_at = excluded.updated_at",
+                (LinkParser.remove_page_num(album_url), status, now, now, *counts.values()),
+            )
+
+
+def get_album_state(config: Config) -> AlbumStateStore:
+    return AlbumStateStore(config.paths.download_state, config.paths.download_log)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+from .config import Config
+from .dedup_store import ContentStore
+from .file_writer import DiskWriter, FileWriter, PartFile
+from .post_process import PostProcessor
+from .rate_limiter import TokenBucket
+from .transport import HttpTransport
+from .utils import BaseDownloader
+
+
+class AsyncDownloadEngine(BaseDownloader):
+    """Download images concurrently on an asyncio event loop running in a background thread.
+
+    Accepts the same `(album_name, [(url, alt), ...])` tasks as `DownloadService`, keeps up to
+    `max_concurrency` image transfers in flight and at most `per_host_limit` of them per host.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        transport: HttpTransport,
+        limiter: TokenBucket,
+        disk_writer: DiskWriter,
+        store: ContentStore | None,
+        post_processor: PostProcessor | None,
+        logger: logging.Logger,
+    ):
+        super().__init__(config, transport, limiter, disk_writer, store, post_processor, logger)
+        self.max_concurrency = config.download.max_concurrency
+        self.per_host_limit = config.download.per_host_limit
+
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.client: httpx.AsyncClient
+        self.slots: asyncio.Semaphore
+        self.host_slots: defaultdict[str, asyncio.Semaphore]
+
+    def start(self):
+        """Start the event loop thread and create the HTTP client inside it."""
+        self.loop_thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self.loop).result()
+
+    def close(self):
+        """Close the HTTP client and stop the event loop thread."""
+        asyncio.run_coroutine_threadsafe(self.transport.aclose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
+
+    def submit(self, album_name: str, image_links: list[tuple[str, str]]) -> Future:
+        """Schedule a download task from any thread, return a `concurrent.futures.Future`."""
+        return asyncio.run_coroutine_threadsafe(
+            self.download_album(album_name, image_links), self.loop
+        )
+
+    async def _setup(self):
+        self.client = self.transport.async_client
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        self.host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+
+    async def download_album(
+        self, album_name: str, image_links: list[tuple[str, str]]
+    ) -> tuple[int, int, list[Future]]:
+        """Async version of `ImageDownloader.download_album`, download all images concurrently."""
+        # file system and store bookkeeping run in threads to keep the event loop responsive
+        manifest, pending, processing = await asyncio.to_thread(
+            self.prepare_album, album_name, image_links
+        )
+
+        async def download_and_finish(url: str, file_path: Path) -> tuple[int, Future | None]:
+            if await self.download_image(url, file_path):
+                return await asyncio.to_thread(self.finish_image, url, file_path, manifest)
+            await asyncio.to_thread(manifest.record_failed, file_path, url)
+            return -1, None
+
+        transfers = [download_and_finish(url, file_path) for url, file_path in pending]
+        results = await asyncio.gather(*transfers)
+        processing += [future for _, future in results if future is not None]
+        size = sum(size for size, _ in results if size > 0)
+        return size, sum(size < 0 for size, _ in results), processing
+
+    async def download_image(self, url: str, save_path: Path) -> bool:
+        """
+        Error control subfunction for download files, retry temporary errors with backoff.
+
+        Return `True` for successful download, else `False`.
+        """
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            while (wait := self.breaker.reserve(host)) > 0:
+                await asyncio.sleep(wait)
+            try:
+                # Acquire the per-host slot first so a busy host does not hold global slots
+                async with self.host_slots[host], self.slots:
+                    await self.download(url, save_path)
+            except Exception as err:
+                delay = self.retry_delay(url, err, attempt)
+                if delay is None:
+                    return False
+                await asyncio.sleep(delay)  # the slots are free while waiting
+                attempt += 1
+                continue
+
+            self.breaker.record(host, True)
+            self.logger.info(f"Downloaded: '{save_path}'")
+            return True
+
+    async def download(self, url: str, save_path: Path) -> None:
+        part = await asyncio.to_thread(PartFile, save_path)
+        if not await self.download_part(url, part):
+            # the server refused the range, the part file does not match its file anymore
+            self.logger.info(f"Cannot resume '{save_path}', downloading it again")
+            await asyncio.to_thread(part.discard)
+            await self.download_part(url, await asyncio.to_thread(PartFile, save_path))
+
+    async def download_part(self, url: str, part: PartFile) -> bool:
+        """Async version of `ImageDownloader.download_part`."""
+        # file work runs in threads so a slow disk does not stall the other transfers, each hop
+        # to a thread costs a GIL handoff, so the steps of one moment are done in one hop
+        async with self.client.stream("GET", url, headers=part.request_headers()) as response:
+            if part.is_complete(response):
+                await asyncio.to_thread(part.commit, part.offset, self.verify)
+                return True
+            if response.status_code == 416 and part.offset:
+                return False
+            response.raise_for_status()
+
+            offset, file = await asyncio.to_thread(self.open_part, part, response)
+            if offset:
+                self.logger.info(f"Resuming '{part.path}' from {offset} bytes")
+            try:
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    await file.write_async(chunk)
+                    await self.limiter.acquire_async(len(chunk))
+            except BaseException:
+                await asyncio.to_thread(file.close)
+                raise
+        await asyncio.to_thread(self.commit_part, part, file)
+        return True
+
+    def open_part(self, part: PartFile, response: httpx.Response) -> tuple[int, FileWriter]:
+        offset = part.begin(response)
+        return offset, part.open(self.disk_writer, offset)
+
+    def commit_part(self, part: PartFile, file: FileWriter):
+        file.close()
+        part.commit(file.size, self.verify)
@@ -0,0 +1,233 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import signal
+import subprocess
+import time
+
+import httpx
+
+from .config import Config, ConfigManager
+from .custom_logger import setup_logging
+
+if platform.system() == "Windows":
+    import msvcrt
+else:
+    import fcntl
+
+
+class BrowserLock:
+    """Exclusive lock on the daemon browser held for a whole run, so runs never share a tab."""
+
+    def __init__(self, lock_path: str):
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.lock_file = os.fdopen(fd, "r+b", buffering=0)
+
+    def acquire(self, blocking: bool = True) -> bool:
+        try:
+            if platform.system() == "Windows":
+                self.lock_file.seek(0)
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                msvcrt.locking(self.lock_file.fileno(), mode, 1)
+            else:
+                mode = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                fcntl.flock(self.lock_file.fileno(), mode)
+            return True
+        except OSError:
+            return False
+
+    def release(self):
+        """Unlock and close, only call after a successful `acquire`."""
+        if self.lock_file.closed:
+            return
+        if platform.system() == "Windows":
+            self.lock_file.seek(0)
+            msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+        self.lock_file.close()
+
+    def close(self):
+        """Close without unlocking, unlocking a lock held by another process fails on Windows."""
+        self.lock_file.close()
+
+
+class BrowserDaemon:
+    """A long-lived Chrome with a remote debugging port that v2dl runs attach to over CDP.
+
+    The browser uses the normal Chrome profile, so the login survives between runs. Its process
+    id and port are kept in `paths.browser_state`.
+    """
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.state_path = config.paths.browser_state
+        self.lock_path = config.paths.browser_lock
+        self.port = config.chrome.daemon_port
+
+    @property
+    def address(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 30) -> bool:
+        if self.is_running():
+            self.logger.info(f"Browser is already running at {self.address}")
+            return True
+
+        profile_path = self.config.chrome.profile_path
+        os.makedirs(profile_path, exist_ok=True)
+        command = [
+            self.config.chrome.exec_path,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={profile_path}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled",
+        ]
+        options: dict = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+        if platform.system() == "Windows":
+            options["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options["start_new_session"] = True  # keep running after this command exits
+        process = subprocess.Popen(command, **options)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_running():
+                self._write_state({"pid": process.pid, "port": self.port})
+                self.logger.info(f"Browser started at {self.address} (pid {process.pid})")
+                return True
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+        self.logger.error("Failed to start the browser")
+        return False
+
+    def stop(self, force: bool = False) -> bool:
+        """Stop the daemon browser, refuse while a run holds the lock unless `force` is set."""
+        state = self._read_state()
+        if not state:
+            self.logger.info("Browser is not running")
+            return False
+        # the state may be left over from a browser that exited and its pid reused since, only
+        # signal the pid while it is alive and the browser still answers on the recorded port
+        if not _pid_alive(state["pid"]) or not self._responds(state["port"]):
+            self.logger.info("Browser is not running, removing its stale state")
+            os.remove(self.state_path)
+            return False
+
+        lock = BrowserLock(self.lock_path)
+        locked = lock.acquire(blocking=False)
+        if not locked:
+            lock.close()
+            if not force:
+                self.logger.warning("Browser is used by a v2dl run, use --force to stop it anyway")
+                return False
+        try:
+            if platform.system() == "Windows":
+                subprocess.run(["taskkill", "/PID", str(state["pid"]), "/T", "/F"], check=False)
+            else:
+                os.kill(state["pid"], signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        finally:
+            if locked:
+                lock.release()
+        os.remove(self.state_path)
+        self.logger.info("Browser stopped")
+        return True
+
+    def status(self) -> dict:
+        state = self._read_state()
+        running = self.is_running()
+        in_use = False
+        if running:
+            lock = BrowserLock(self.lock_path)
+            if lock.acquire(blocking=False):
+                lock.release()
+            else:
+                in_use = True
+                lock.close()
+        return {"running": running, "address": self.address, "in_use": in_use, **state}
+
+    def is_running(self) -> bool:
+        return self._responds(self.port)
+
+    def _responds(self, port: int) -> bool:
+        try:
+            response = httpx.get(
+                f"http://127.0.0.1:{port}/json/version", timeout=0.5, trust_env=False
+            )
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state: dict):
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+
+def _pid_alive(pid: int) -> bool:
+    if platform.system() == "Windows":
+        return True  # os.kill(pid, 0) would terminate it, taskkill fails on a missing pid
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # owned by another user
+    return True
+
+
+def attach_browser(config: Config, logger: logging.Logger) -> tuple[str, BrowserLock] | None:
+    """Return the address of the running daemon browser and its lock, or `None` if not running.
+
+    Blocks while another run is using the browser.
+    """
+    daemon = BrowserDaemon(config, logger)
+    if not daemon.is_running():
+        return None
+    lock = BrowserLock(daemon.lock_path)
+    if not lock.acquire(blocking=False):
+        logger.info("Browser is used by another v2dl run, waiting")
+        lock.acquire()
+    logger.info(f"Attached to browser at {daemon.address}")
+    return daemon.address, lock
+
+
+def browser_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="v2dl browser", description="Manage the v2dl browser.")
+    parser.add_argument("action", choices=["start", "stop", "status"])
+    parser.add_argument(
+        "--force", action="store_true", help="stop the browser even while a run is using it"
+    )
+    args = parser.parse_args(argv)
+
+    config = ConfigManager().load()
+    setup_logging(logging.INFO, log_path=config.paths.system_log)
+    logger = logging.getLogger(__name__)
+    daemon = BrowserDaemon(config, logger)
+
+    if args.action == "start":
+        return 0 if daemon.start() else 1
+    if args.action == "stop":
+        return 0 if daemon.stop(args.force) else 1
+
+    status = daemon.status()
+    if status["running"]:
+        in_use = "in use" if status["in_use"] else "idle"
+        print(f"Browser is running at {status['address']} ({in_use})")
+    else:
+        print("Browser is not running")
+    return 0 if status["running"] else 1
@@ -18,20 +18,81 @@ class DownloadConfig:
     max_scroll_length: int
     min_scroll_step: int
     max_scroll_step: int
+    scrape_tabs: int
+    page_interval: float
+    page_wait: str
+    dom_quiet_time: float
+    dom_wait_timeout: float
+    pacing_policy: str
+    pacing_budget: float
+    pacing_latency: float
+    pacing_max_factor: float
+    page_batch_size: int
+    incremental_stop: int
+    full_sweep_days: float
+    watch_interval: float
+    watch_jitter: float
+    watch_spacing: float
+    pauses: dict[str, list[float]]
+    http_fast_path: bool
+    http_page_interval: float
+    page_cache: bool
+    page_cache_ttl: dict[str, float]
     rate_limit: int
+    rate_burst: int
+    shared_rate_limit: bool
     download_dir: str
+    engine: str
+    workers: int
+    schedule_policy: str
+    queue_max_images: int
+    queue_max_size: int
+    image_size_estimate: int
+    max_concurrency: int
+    per_host_limit: int
+    pool_size: int
+    keepalive_expiry: float
+    http2: bool
+    dns_ttl: float
+    chunk_size: int
+    write_buffer_size: int
+    preallocate: bool
+    writer_thread: bool
+    writer_queue_size: int
+    verify_images: bool
+    fsync: bool
+    dedup: bool
+    dedup_link: str
+    max_retries: int
+    retry_backoff: float
+    retry_backoff_max: float
+    breaker_threshold: int
+    breaker_window: float
+    breaker_cooldown: float
+    breaker_cooldown_max: float
+    post_process: list[str]
+    post_process_workers: int
+    transcode_format: str
+    transcode_quality: int
 
 
 @dataclass
 class PathConfig:
     download_log: str
+    download_state: str
     system_log: str
+    rate_limit_state: str
+    browser_state: str
+    browser_lock: str
+    page_cache: str
+    watch_state: str
 
 
 @dataclass
 class ChromeConfig:
     exec_path: str
     profile_path: str
+    daemon_port: int
 
 
 @dataclass
@@ -81,6 +142,7 @@ class ConfigManager:
             chrome=ChromeConfig(
                 exec_path=ConfigManager._get_chrome_exec_path(config_data),
                 profile_path=config_data["chrome"]["profile_path"],
+                daemon_port=config_data["chrome"]["daemon_port"],
             ),
         )
 
@@ -128,7 +190,16 @@ class ConfigManager:
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Web scraper for albums and images.")
-    parser.add_argument("url", help="URL to scrape")
+    parser.add_argument("url", nargs="?", help="URL to scrape")
+    parser.add_argument(
+        "-i",
+        "--input",
+        default=None,
+        help="File with URLs to scrape, one per line, '-' to read from stdin",
+    )
+    parser.add_argument(
+        "--summary", default=None, help="Write the status of every URL to this file"
+    )
     parser.add_argument(
         "--bot",
         dest="bot_type",
@@ -145,8 +216,18 @@ def parse_arguments():
         "--log-level", default=None, type=int, choices=range(1, 6), help="Set log level (1~5)"
     )
     parser.add_argument("--dry-run", action="store_true", help="Dry run without downloading")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Stop scraping album lists at albums already downloaded",
+    )
+    parser.add_argument(
+        "--offline", action="store_true", help="Scrape pages from the page cache only"
+    )
     parser.add_argument("--terminate", action="store_true", help="Terminate chrome after scraping")
     args = parser.parse_args()
+    if (args.url is None) == (args.input is None):
+        parser.error("either a URL or --input is required")
 
     if args.quiet:
         log_level = logging.ERROR
@@ -5,15 +5,83 @@ DEFAULT_CONFIG = {
         "max_scroll_length": 1000,
         "min_scroll_step": 50,
         "max_scroll_step": 250,
+        "scrape_tabs": 1,
+        "page_interval": 3,
+        "page_wait": "scroll",
+        "dom_quiet_time": 1,
+        "dom_wait_timeout": 15,
+        "pacing_policy": "fixed",
+        "pacing_budget": 0,
+        "pacing_latency": 10,
+        "pacing_max_factor": 4,
+        "page_batch_size": 3,
+        "incremental_stop": 10,
+        "full_sweep_days": 7,
+        "watch_interval": 24,
+        "watch_jitter": 0.1,
+        "watch_spacing": 300,
+        "pauses": {
+            "page": [5, 10],
+            "page_batch": [15, 15],
+            "retry": [5, 10],
+            "redirect": [10, 30],
+            "scroll_break": [3, 7],
+            "scroll_idle": [1, 3],
+        },
+        "http_fast_path": False,
+        "http_page_interval": 1,
+        "page_cache": True,
+        "page_cache_ttl": {"album": 86400, "list": 3600},
         "rate_limit": 400,
+        "rate_burst": 512,
+        "shared_rate_limit": True,
         "download_dir": "v2dl",
+        "engine": "thread",
+        "workers": 1,
+        "schedule_policy": "round_robin",
+        "queue_max_images": 1000,
+        "queue_max_size": 512,
+        "image_size_estimate": 512,
+        "max_concurrency": 8,
+        "per_host_limit": 4,
+        "pool_size": 16,
+        "keepalive_expiry": 30,
+        "http2": True,
+        "dns_ttl": 300,
+        "chunk_size": 64,
+        "write_buffer_size": 1024,
+        "preallocate": True,
+        "writer_thread": False,
+        "writer_queue_size": 8,
+        "verify_images": True,
+        "fsync": False,
+        "dedup": False,
+        "dedup_link": "hardlink",
+        "max_retries": 3,
+        "retry_backoff": 1,
+        "retry_backoff_max": 60,
+        "breaker_threshold": 5,
+        "breaker_window": 30,
+        "breaker_cooldown": 30,
+        "breaker_cooldown_max": 300,
+        "post_process": [],
+        "post_process_workers": 0,
+        "transcode_format": "webp",
+        "transcode_quality": 90,
     },
     "paths": {
         "download_log": "downloaded_albums.txt",
+        "download_state": "download_state.sqlite3",
         "system_log": "v2dl.log",
+        "rate_limit_state": "rate_limit.state",
+        "browser_state": "browser.json",
+        "browser_lock": "browser.lock",
+        "page_cache": "page_cache",
+        "watch_state": "watch.sqlite3",
     },
     "chrome": {
         "profile_path": "v2dl_chrome_profile",
+        "daemon_port": 9333,
         "exec_path": {
             "Linux": "/usr/bin/google-chrome",
             "Darwin": "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
@@ -34,11 +102,26 @@ WORKFLOW_URL_ACTOR = (
 XPATH_ALTS = '//div[@class="album-photo my-2"]/img/@alt'
 XPATH_ALBUM = '//div[@class="album-photo my-2"]/img/@data-src'
 XPATH_ALBUM_LIST = '//a[@class="media-cover"]/@href'
+XPATH_PAGINATION = (
+    '//li[@class="page-item"]/a[@class="page-link" and string-length(text()) <= 2]/@href'
+)
+
+# Pages shown instead of the requested one, only the browser can get past them
+CHALLENGE_MARKERS = (
+    "Just a moment...",
+    "請稍候...",
+    "Checking your",
+    "cf-turnstile",
+    "Attention Required! | Cloudflare",
+    "用戶登錄",
+)
+# Markup found on album and album list pages
+CONTENT_MARKERS = ('class="album-photo my-2"', 'class="media-cover"')
 
 # For selenium webdriver
 SELENIUM_AGENT = "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.6723.59 Safari/537.36"
 
-# For requests to download from the v2ph cdn, somehow the fake_useragent is not working.
+# For httpx to download from the v2ph cdn, somehow the fake_useragent is not working.
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.6723.59 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
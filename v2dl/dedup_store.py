@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+from .config import Config
+
+if platform.system() == "Linux":
+    import fcntl
+
+    FICLONE = 0x40049409  # ioctl request cloning a file on btrfs/xfs
+
+
+class ContentStore:
+    """Content-addressed image store shared by all album folders.
+
+    Objects are kept under `objects/` by their BLAKE2 digest and album folders get hardlinks,
+    reflinks or copies of them. An index from CDN URL to digest lets a known image be placed into
+    a new album without any network transfer.
+    """
+
+    def __init__(self, root: Path, link_mode: str, logger: logging.Logger):
+        """
+        Args:
+            root (Path): Store directory, must be on the same file system as the albums.
+            link_mode (str): How album files refer to objects, "hardlink", "reflink" or "copy".
+            logger (logging.Logger): Logger.
+        """
+        if link_mode not in {"hardlink", "reflink", "copy"}:
+            raise ValueError(f"Unsupported dedup link mode: {link_mode}")
+        self.objects = root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.link_mode = link_mode
+        self.logger = logger
+
+        self.db = sqlite3.connect(root / "index.sqlite3", timeout=30, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, digest TEXT)")
+        self.db.commit()
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.db.close()
+
+    def lookup(self, url: str) -> str | None:
+        with self.lock:
+            row = self.db.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def link(self, url: str, file_path: Path) -> bool:
+        """Place the stored image of `url` at `file_path`, return `False` if it is unknown."""
+        digest = self.lookup(url)
+        if digest is None or not self.object_path(digest).exists():
+            return False
+        self._place(self.object_path(digest), file_path)
+        return True
+
+    def add(self, url: str, file_path: Path) -> str:
+        """Store a downloaded file, an already stored duplicate replaces it with a link."""
+        digest = hash_file(file_path)
+        object_path = self.object_path(digest)
+        if object_path.exists():
+            self._place(object_path, file_path)
+            self.logger.debug(f"Duplicate of stored image {digest}: '{file_path}'")
+        else:
+            object_path.parent.mkdir(exist_ok=True)
+            self._place(file_path, object_path)
+
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, digest))
+            self.db.commit()
+        return digest
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _place(self, src: Path, dst: Path):
+        """Atomically make `dst` refer to the content of `src`."""
+        tmp = dst.with_name(dst.name + ".link")
+        tmp.unlink(missing_ok=True)
+        try:
+            if self.link_mode == "hardlink":
+                os.link(src, tmp)
+            elif self.link_mode == "reflink":
+                reflink(src, tmp)
+            else:
+                shutil.copyfile(src, tmp)
+        except OSError:  # cross-device link or unsupported file system
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+
+def reflink(src: Path, dst: Path):
+    """Clone a file sharing its data blocks (copy-on-write)."""
+    if platform.system() != "Linux":
+        raise OSError("Reflinks are only supported on Linux")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink(missing_ok=True)
+            raise
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_content_store(config: Config, logger: logging.Logger) -> ContentStore | None:
+    if not config.download.dedup:
+        return None
+    root = Path(config.download.download_dir) / ".v2dl_store"
+    return ContentStore(root, config.download.dedup_link, logger)
@@ -0,0 +1,355 @@
+import asyncio
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from queue import Queue
+from typing import Callable
+
+import httpx
+
+from .config import Config
+
+
+class IncompleteDownloadError(Exception):
+    pass
+
+
+class DiskWriter:
+    """Write download streams to disk through large reusable buffers.
+
+    Incoming chunks are copied into a preallocated buffer and written with one syscall per buffer.
+    When `background` is set, full buffers are written by a dedicated thread behind a bounded queue
+    so network reads do not wait on slow disks.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int,
+        queue_size: int,
+        preallocate: bool,
+        background: bool,
+        fsync: bool = False,
+    ):
+        """
+        Args:
+            buffer_size (int): Size of each write buffer in bytes.
+            queue_size (int): Maximum number of full buffers waiting for the writer thread.
+            preallocate (bool): Reserve disk space from the expected size before writing.
+            background (bool): Write buffers in a dedicated thread.
+            fsync (bool): Flush files to disk before closing, so a committed file survives a crash.
+        """
+        self.buffer_size = buffer_size
+        self.preallocate = preallocate and hasattr(os, "posix_fallocate")
+        self.fsync = fsync
+        self.max_free_buffers = queue_size + 2
+        self.free_buffers: list[bytearray] = []
+        self.lock = threading.Lock()
+
+        self.jobs: Queue[Callable[[], None] | None] | None = None
+        self.thread: threading.Thread | None = None
+        if background:
+            self.jobs = Queue(maxsize=queue_size)
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def open(self, path: Path, expected_size: int | None = None, offset: int = 0) -> "FileWriter":
+        """Open `path` for writing at `offset`, `expected_size` is used to preallocate the file."""
+        return FileWriter(self, path, expected_size, offset)
+
+    def close(self):
+        """Finish pending writes and stop the writer thread."""
+        if self.jobs is not None and self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+
+    def submit(self, job: Callable[[], None]):
+        """Queue a job for the writer thread, block while the queue is full."""
+        assert self.jobs is not None
+        self.jobs.put(job)
+
+    def get_buffer(self) -> bytearray:
+        with self.lock:
+            if self.free_buffers:
+                return self.free_buffers.pop()
+        return bytearray(self.buffer_size)
+
+    def release_buffer(self, buffer: bytearray):
+        with self.lock:
+            if len(self.free_buffers) < self.max_free_buffers:
+                self.free_buffers.append(buffer)
+
+    def _run(self):
+        assert self.jobs is not None
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            job()
+
+
+class FileWriter:
+    """A file being written by `DiskWriter`, use as a context manager."""
+
+    def __init__(self, disk_writer: DiskWriter, path: Path, expected_size: int | None, offset: int):
+        self.disk_writer = disk_writer
+        self.background = disk_writer.jobs is not None
+        self.file = open(path, "r+b" if offset else "wb", buffering=0)
+        self.file.seek(offset)
+        self.size = offset
+        self.error: OSError | None = None
+        self.on_close: Callable[[int], None] | None = None
+
+        self.buffer = disk_writer.get_buffer()
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+
+        self.preallocated = False
+        if expected_size and disk_writer.preallocate:
+            try:
+                os.posix_fallocate(self.file.fileno(), 0, expected_size)
+                self.preallocated = True
+            except OSError:
+                pass  # not supported by this file system
+
+    def __enter__(self) -> "FileWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, data: bytes | memoryview):
+        """Copy data into the buffer, write the buffer out when it is full."""
+        data = memoryview(data)
+        self.size += len(data)
+        while data:
+            length = min(len(data), len(self.buffer) - self.filled)
+            self.view[self.filled : self.filled + length] = data[:length]
+            self.filled += length
+            data = data[length:]
+            if self.filled == len(self.buffer):
+                self.flush()
+
+    async def write_async(self, data: bytes | memoryview):
+        """`write` for an event loop, full buffers are handed to the disk in a thread."""
+        data = memoryview(data)
+        self.size += len(data)
+        while data:
+            length = min(len(data), len(self.buffer) - self.filled)
+            self.view[self.filled : self.filled + length] = data[:length]
+            self.filled += length
+            data = data[length:]
+            if self.filled == len(self.buffer):
+                await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        if not self.filled:
+            return
+        if self.background:
+            buffer, length = self.buffer, self.filled
+            self.disk_writer.submit(lambda: self._write_buffer(buffer, length, release=True))
+            self.view.release()
+            self.buffer = self.disk_writer.get_buffer()
+            self.view = memoryview(self.buffer)
+        else:
+            self._write_buffer(self.buffer, self.filled, release=False)
+        self.filled = 0
+
+    def close(self):
+        """Write remaining data and close the file, raise the first write error if any."""
+        if self.file.closed:
+            return
+        self.flush()
+        self.view.release()
+        self.disk_writer.release_buffer(self.buffer)
+
+        if self.background:
+            closed = threading.Event()
+
+            def close_file():
+                self._close_file()
+                closed.set()
+
+            self.disk_writer.submit(close_file)
+            closed.wait()
+        else:
+            self._close_file()
+
+        if self.error is not None:
+            raise self.error
+        if self.on_close is not None:
+            self.on_close(self.size)
+
+    def _write_buffer(self, buffer: bytearray, length: int, release: bool):
+        try:
+            if self.error is None:
+                view = memoryview(buffer)[:length]
+                while view:  # raw file writes may be partial
+                    view = view[self.file.write(view) :]
+        except OSError as e:
+            self.error = e
+        finally:
+            if release:
+                self.disk_writer.release_buffer(buffer)
+
+    def _close_file(self):
+        try:
+            if self.preallocated:  # drop the space reserved beyond the written data
+                os.ftruncate(self.file.fileno(), self.size)
+            if self.disk_writer.fsync:
+                os.fsync(self.file.fileno())
+            self.file.close()
+        except OSError as e:
+            self.error = self.error or e
+
+
+class PartFile:
+    """Partial download kept as `<name>.part`, resumed with a Range request.
+
+    The validators of the first response are stored in `<name>.part.json` so a resumed response
+    is only appended if it still belongs to the same file. The metadata also keeps the number of
+    bytes written: a preallocated part file has its full length until it is closed, so after a
+    crash its size says nothing about the data in it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.part_path = path.with_name(path.name + ".part")
+        self.meta_path = path.with_name(path.name + ".part.json")
+        self.offset = 0
+        self.length: int | None = None
+        self.meta: dict = {}
+
+        if self.part_path.exists() and self.meta_path.exists():
+            try:
+                self.meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+                size = self.part_path.stat().st_size
+                self.offset = min(size, self.meta.get("offset", 0))
+            except (OSError, ValueError):
+                self.meta = {}
+
+    def request_headers(self) -> dict[str, str]:
+        # Range offsets are counted in bytes of the unencoded file
+        headers = {"Accept-Encoding": "identity"}
+        if self.offset:
+            headers["Range"] = f"bytes={self.offset}-"
+            validator = self.meta.get("etag") or self.meta.get("last_modified")
+            if validator:  # the server sends the whole file if it changed
+                headers["If-Range"] = validator
+        return headers
+
+    def is_complete(self, response: httpx.Response) -> bool:
+        """Whether the server refused the range because the part file already has every byte."""
+        return (
+            response.status_code == 416
+            and self.offset > 0
+            and self.offset == self.meta.get("length")
+        )
+
+    def begin(self, response: httpx.Response) -> int:
+        """Check the response against the part file, return the offset to write the body at."""
+        if response.status_code == 206 and self.offset:
+            start, total = parse_content_range(response.headers.get("Content-Range", ""))
+            etag = response.headers.get("ETag")
+            if (
+                start != self.offset
+                or total != self.meta.get("length")
+                or (etag and self.meta.get("etag") and etag != self.meta["etag"])
+            ):
+                self.discard()
+                raise IncompleteDownloadError(f"Partial file changed on server: '{self.path}'")
+            self.length = total
+            return self.offset
+
+        # A full response, start over
+        self.offset = 0
+        self.length = get_content_length(response)
+        self.meta = {
+            "url": str(response.url),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "length": self.length,
+            "offset": 0,
+        }
+        self.save_meta()
+        return 0
+
+    def open(self, disk_writer: DiskWriter, offset: int) -> FileWriter:
+        """Open the part file for writing at `offset`, the written size is saved when it closes."""
+        if self.meta.get("offset") != offset:
+            self.meta["offset"] = offset
+            self.save_meta()
+        file = disk_writer.open(self.part_path, self.length, offset)
+        file.on_close = self.written
+        return file
+
+    def written(self, size: int):
+        """Save the size of a closed part file, unless it is complete and about to be renamed."""
+        if size != self.length:
+            self.meta["offset"] = size
+            self.save_meta()
+
+    def save_meta(self):
+        self.meta_path.write_text(json.dumps(self.meta), encoding="utf-8")
+
+    def commit(self, size: int, verify: bool = False):
+        """Rename the part file to its final name once every byte is written and verified."""
+        length = self.length if self.length is not None else self.meta.get("length")
+        if length is not None and size != length:
+            raise IncompleteDownloadError(
+                f"Incomplete download, got {size} of {length} bytes: '{self.path}'"
+            )
+        if size == 0 or (verify and not check_image_end(self.part_path)):
+            self.discard()
+            raise IncompleteDownloadError(f"Truncated or empty image: '{self.path}'")
+        os.replace(self.part_path, self.path)
+        self.meta_path.unlink(missing_ok=True)
+
+    def discard(self):
+        self.part_path.unlink(missing_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+
+
+def check_image_end(path: Path) -> bool:
+    """Check the end marker of JPEG, PNG and GIF files, other formats are assumed complete."""
+    with open(path, "rb") as f:
+        head = f.read(8)
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 64, 0))
+        tail = f.read()
+
+    if head.startswith(b"\xff\xd8"):  # JPEG, some encoders pad zeros after the EOI marker
+        return tail.rstrip(b"\x00").endswith(b"\xff\xd9")
+    if head.startswith(b"\x89PNG"):
+        return tail.endswith(b"IEND\xaeB`\x82")
+    if head.startswith(b"GIF8"):
+        return tail.endswith(b";")
+    return True
+
+
+def parse_content_range(content_range: str) -> tuple[int | None, int | None]:
+    """Parse `bytes start-end/total` into `(start, total)`."""
+    match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", content_range)
+    if not match:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), int(total) if total.isdigit() else None
+
+
+def get_content_length(response: httpx.Response) -> int | None:
+    """Return the size of the decoded body if the server tells it."""
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        return None  # Content-Length is the size of the encoded body
+    content_length = response.headers.get("Content-Length", "")
+    return int(content_length) if content_length.isdigit() else None
+
+
+def get_disk_writer(config: Config) -> DiskWriter:
+    return DiskWriter(
+        buffer_size=config.download.write_buffer_size * 1024,
+        queue_size=config.download.writer_queue_size,
+        preallocate=config.download.preallocate,
+        background=config.download.writer_thread,
+        fsync=config.download.fsync,
+    )
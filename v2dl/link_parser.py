@@ -0,0 +1,156 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+from .const import XPATH_PAGINATION
+
+if TYPE_CHECKING:  # lxml is imported when the first page is parsed
+    from lxml import etree, html
+
+PAGE_NUMBER = re.compile(r"page=(\d+)")
+
+
+@dataclass(slots=True)
+class PageLinks:
+    """Everything the scraper needs from a page."""
+
+    image_urls: list[str] = field(default_factory=list)
+    alts: list[str] = field(default_factory=list)
+    album_links: list[str] = field(default_factory=list)
+    max_page: int = 1
+
+
+def collect_links(tree: "etree._Element") -> PageLinks:
+    """Collect the links of a parsed page in one walk over its `img` and `a` elements.
+
+    Matches the same nodes as `XPATH_ALBUM`, `XPATH_ALTS`, `XPATH_ALBUM_LIST` and
+    `XPATH_PAGINATION`, which would walk the whole tree once each.
+    """
+    links = PageLinks()
+    for element in tree.iter("img", "a"):
+        parent = element.getparent()
+        if element.tag == "img":
+            if parent.tag != "div" or parent.get("class") != "album-photo my-2":
+                continue
+            if (src := element.get("data-src")) is not None:
+                links.image_urls.append(src)
+            if (alt := element.get("alt")) is not None:
+                links.alts.append(alt)
+            continue
+
+        href = element.get("href")
+        css_class = element.get("class")
+        if href is None:
+            continue
+        if css_class == "media-cover":
+            links.album_links.append(href)
+        elif css_class == "page-link" and parent.tag == "li" and parent.get("class") == "page-item":
+            if len(element.text or "") <= 2:  # skip links like "next" or "last"
+                match = PAGE_NUMBER.search(href)
+                links.max_page = max(links.max_page, int(match.group(1)) if match else 1)
+    return links
+
+
+@lru_cache(maxsize=None)
+def compiled_xpath(expression: str) -> "etree.XPath":
+    from lxml import etree
+
+    return etree.XPath(expression)
+
+
+class LinkParser:
+    """Tool class parses URL"""
+
+    @staticmethod
+    def parse_input_url(url):
+        parsed_url = urlparse(url)
+        path_parts: list[str] = parsed_url.path.split("/")
+        query_params = parse_qs(parsed_url.query)
+        start_page: int = int(query_params.get("page", [1])[0])  # default page=1
+        return path_parts, start_page
+
+    @staticmethod
+    def parse_html(html_content: str, logger: logging.Logger) -> "html.HtmlElement | None":
+        if "Failed" in html_content:
+            return None
+
+        from lxml import html
+
+        try:
+            return html.fromstring(html_content)
+        except Exception as e:
+            logger.error(f"Error parsing HTML content: {e}")
+            return None
+
+    @staticmethod
+    def extract_links(html_content: str, logger: logging.Logger) -> PageLinks | None:
+        """Collect image URLs, alts, album links and the page count of a page in one pass."""
+        if "Failed" in html_content:
+            return None
+
+        from lxml import etree
+
+        try:
+            parser = etree.HTMLParser(remove_comments=True)
+            return collect_links(etree.fromstring(html_content, parser))
+        except Exception as e:
+            logger.error(f"Error parsing HTML content: {e}")
+            return None
+
+    @staticmethod
+    def get_max_page(tree: "html.HtmlElement") -> int:
+        """Parse pagination count"""
+        page_links = compiled_xpath(XPATH_PAGINATION)(tree)
+
+        if not page_links:
+            return 1
+
+        page_numbers = []
+        for link in page_links:
+            match = PAGE_NUMBER.search(link)
+            if match:
+                page_number = int(match.group(1))
+            else:
+                page_number = 1
+            page_numbers.append(page_number)
+
+        return max(page_numbers)
+
+    @staticmethod
+    def add_page_num(url: str, page: int) -> str:
+        parsed_url = urlparse(url)  # 解析 URL
+        query_params = parse_qs(parsed_url.query)  # 解析查詢參數
+        query_params["page"] = [str(page)]  # 修改頁碼
+
+        new_query = urlencode(query_params, doseq=True)  # 組合成字串
+        new_url = parsed_url._replace(query=new_query)  # 替換頁碼
+
+        # Example
+        # url = "https://example.com/search?q=test&sort=asc", page = 3
+        # parsed_url: ParseResult(scheme='https', netloc='example.com', path='/search', params='', query='q=test&sort=asc', fragment='')
+        # query_params: {'q': ['test'], 'sort': ['asc'], 'page': ['3']}
+        # new_query: 'q=test&sort=asc&page=3'
+        # new_url: ParseResult(scheme='https', netloc='example.com', path='/search', params='', query='q=test&sort=asc&page=3', fragment='')
+        # urlunparse: 'https://example.com/search?q=test&sort=asc&page=3'
+        return urlunparse(new_url)
+
+    @staticmethod
+    def remove_page_num(url: str) -> str:
+        """remove ?page=d or &page=d from URL"""
+        # Parse the URL
+        parsed_url = urlparse(url)
+        query_params = parse_qs(parsed_url.query)
+
+        # Remove the 'page' parameter if it exists
+        if "page" in query_params:
+            del query_params["page"]
+
+        # Rebuild the query string without 'page'
+        new_query = urlencode(query_params, doseq=True)
+
+        # Rebuild the full URL
+        new_url = urlunparse(parsed_url._replace(query=new_query))
+        return new_url
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .file_writer import check_image_end
+
+
+@dataclass
+class ManifestEntry:
+    file: str
+    size: int
+    url: str | None = None
+    hash: str | None = None
+    status: str = "complete"
+    stored_as: str | None = None
+
+
+class AlbumManifest:
+    """Downloaded files of an album folder, appended to `.v2dl_manifest.jsonl`.
+
+    Each record holds the file name, size, source URL, BLAKE2 hash (with the content store only)
+    and status, the last record of a file wins. The folder is listed once with `os.scandir` when the manifest is loaded and the
+    listing is updated as files are recorded, so skip decisions for recorded files need no file
+    system access at all. Files renamed after download, e.g. to their real extension, are recorded
+    under their original name with the name they are stored as.
+    """
+
+    FILENAME = ".v2dl_manifest.jsonl"
+    locks: dict[Path, threading.Lock] = {}
+    locks_guard = threading.Lock()
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.path = folder / self.FILENAME
+        self.entries: dict[str, ManifestEntry] = {}
+        with AlbumManifest.locks_guard:
+            self.lock = AlbumManifest.locks.setdefault(self.path, threading.Lock())
+
+        try:
+            with os.scandir(folder) as it:
+                self.listing = {entry.name for entry in it}
+        except FileNotFoundError:
+            self.listing = set()
+
+        if self.FILENAME in self.listing:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = ManifestEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        continue  # a line cut by a crash
+                    self.entries[entry.file] = entry
+
+    def is_complete(self, file_path: Path, verify: bool) -> bool:
+        """Check a file against its record, files from older versions are verified and adopted."""
+        entry = self.entries.get(file_path.name)
+        if entry is not None and entry.status == "complete":
+            return (entry.stored_as or entry.file) in self.listing
+
+        if file_path.name not in self.listing:
+            return False
+        size = file_path.stat().st_size
+        if size == 0 or (verify and not check_image_end(file_path)):
+            return False
+        self.record(file_path, size)
+        return True
+
+    def record(
+        self,
+        file_path: Path,
+        size: int | None = None,
+        stored_as: str | None = None,
+        url: str | None = None,
+        digest: str | None = None,
+    ):
+        """Record a committed file, `stored_as` is its name after renaming.
+
+        The URL of an earlier record is kept, its hash only if the size is unchanged.
+        """
+        if size is None:
+            size = file_path.stat().st_size
+        previous = self.entries.get(file_path.name)
+        if previous is not None:
+            url = url or previous.url
+            if digest is None and previous.size == size:
+                digest = previous.hash
+        if stored_as == file_path.name:
+            stored_as = None
+        self._append(ManifestEntry(file_path.name, size, url, digest, "complete", stored_as))
+        self.listing.add(stored_as or file_path.name)
+
+    def record_failed(self, file_path: Path, url: str | None = None):
+        """Record a file that failed to download or was removed, it is downloaded next time."""
+        previous = self.entries.get(file_path.name)
+        if previous is not None:
+            url = url or previous.url
+            self.listing.discard(previous.stored_as or previous.file)
+        self._append(ManifestEntry(file_path.name, 0, url, None, "failed"))
+
+    def _append(self, entry: ManifestEntry):
+        self.entries[entry.file] = entry
+        record = {key: value for key, value in asdict(entry).items() if value is not None}
+        if record["status"] == "complete":
+            del record["status"]
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+        self.listing.add(self.FILENAME)
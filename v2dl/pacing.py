@@ -0,0 +1,197 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from .config import Config
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """Clock for tests and benchmarks, sleeping moves the time forward without waiting.
+
+    Sleeps of all threads add up, so the virtual time of concurrent waits is an upper bound.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+        self.lock = threading.Lock()
+
+    def now(self) -> float:
+        with self.lock:
+            return self.time
+
+    def sleep(self, seconds: float):
+        with self.lock:
+            self.time += max(seconds, 0.0)
+
+
+class Pacer:
+    """Keep page loads of all threads at least `interval` seconds apart."""
+
+    def __init__(self, interval: float, clock: SystemClock | VirtualClock | None = None):
+        self.interval = interval
+        self.clock = clock or SystemClock()
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = self.clock.now()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            self.clock.sleep(start - now)
+
+
+class FixedPolicy:
+    """Wait a random time within the configured range."""
+
+    def factor(self) -> float:
+        return 1.0
+
+    def record(self, latency: float, error: bool):
+        pass
+
+
+class AdaptivePolicy(FixedPolicy):
+    """Stretch the waits while the server returns errors or answers slowly.
+
+    An error doubles the factor and a response slower than `target_latency` raises it by a quarter,
+    up to `max_factor`. Fast responses bring it back towards 1.
+    """
+
+    def __init__(self, target_latency: float, max_factor: float):
+        self.target_latency = target_latency
+        self.max_factor = max(max_factor, 1.0)
+        self.current = 1.0
+        self.lock = threading.Lock()
+
+    def factor(self) -> float:
+        with self.lock:
+            return self.current
+
+    def record(self, latency: float, error: bool):
+        with self.lock:
+            if error:
+                self.current *= 2
+            elif latency > self.target_latency:
+                self.current *= 1.25
+            else:
+                self.current *= 0.8
+            self.current = min(max(self.current, 1.0), self.max_factor)
+
+
+class PacingScheduler:
+    """All waits of the scraper, so throughput is tuned in the config instead of the code.
+
+    Each kind of pause has a `[min, max]` range in seconds:
+
+    - page: after a page is scrolled through.
+    - page_batch: after every `page_batch_size` pages of one URL.
+    - retry: after a failed page load.
+    - redirect: before loading a page again when the browser did not reach it.
+    - scroll_break: after a run of scroll actions.
+    - scroll_idle: the idle action among the scroll actions.
+
+    The policy scales the ranges. With a budget, the pauses of a run add up to at most `budget`
+    seconds, after that only the lower bounds are waited. `wait_turn` spaces the page loads of all
+    tabs by `interval`. The clock is injectable, with a `VirtualClock` the whole scraper runs
+    without waiting.
+    """
+
+    POLICIES = {"fixed", "adaptive"}
+
+    def __init__(
+        self,
+        pauses: dict[str, list[float]],
+        policy: FixedPolicy,
+        interval: float,
+        budget: float = 0,
+        page_batch_size: int = 3,
+        clock: SystemClock | VirtualClock | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        """
+        Args:
+            pauses (dict): Range of seconds of each kind of pause.
+            policy (FixedPolicy): Scales the pauses.
+            interval (float): Minimum seconds between the starts of page loads.
+            budget (float): Seconds of pauses in a run, non-positive means unlimited.
+            page_batch_size (int): Pages between two `page_batch` pauses.
+            clock (SystemClock | VirtualClock): Clock to wait on.
+            logger (logging.Logger): Logger.
+        """
+        self.pauses = pauses
+        self.policy = policy
+        self.budget = budget
+        self.page_batch_size = page_batch_size
+        self.clock = clock or SystemClock()
+        self.pacer = Pacer(interval, self.clock)
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.spent: Counter[str] = Counter()
+        self.lock = threading.Lock()
+
+    def wait_turn(self):
+        """Block until the next page load may start."""
+        self.pacer.wait()
+
+    def pause(self, kind: str) -> float:
+        """Wait for a pause of the given kind and return the seconds waited."""
+        low, high = self.pauses[kind]
+        factor = self.policy.factor()
+        seconds = random.uniform(low, high) * factor
+        with self.lock:
+            if self.budget > 0 and sum(self.spent.values()) + seconds > self.budget:
+                seconds = low * factor
+            self.spent[kind] += seconds
+        self.logger.debug(f"Pausing {seconds:.2f}s ({kind})")
+        self.clock.sleep(seconds)
+        return seconds
+
+    def record(self, latency: float, error: bool = False):
+        """Report the load time of a page, or a server error, to the policy."""
+        self.policy.record(latency, error)
+
+    def now(self) -> float:
+        return self.clock.now()
+
+    def log_stats(self):
+        if not self.spent:
+            return
+        total = sum(self.spent.values())
+        details = ", ".join(f"{kind} {seconds:.0f}s" for kind, seconds in self.spent.items())
+        self.logger.info(f"Paused {total:.0f}s in total: {details}")
+
+
+def get_pacing(
+    config: Config,
+    logger: logging.Logger,
+    clock: SystemClock | VirtualClock | None = None,
+) -> PacingScheduler:
+    policy_name = config.download.pacing_policy
+    if policy_name not in PacingScheduler.POLICIES:
+        raise ValueError(f"Unsupported pacing policy: {policy_name}")
+    if policy_name == "adaptive":
+        policy = AdaptivePolicy(config.download.pacing_latency, config.download.pacing_max_factor)
+    else:
+        policy = FixedPolicy()
+    return PacingScheduler(
+        config.download.pauses,
+        policy,
+        config.download.page_interval,
+        config.download.pacing_budget,
+        config.download.page_batch_size,
+        clock,
+        logger,
+    )
@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import logging
+import os
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from .config import Config
+from .const import CHALLENGE_MARKERS, CONTENT_MARKERS
+from .pacing import PacingScheduler, VirtualClock, get_pacing
+
+
+class PageCache:
+    """Gzip compressed HTML of album and list pages on disk, one file per page.
+
+    Pages are keyed by their normalised URL and expire after the TTL of their type, album pages
+    rarely change while list pages get new albums. Only pages with album content are stored, never
+    error, challenge or login pages.
+    """
+
+    def __init__(self, cache_dir: str, ttls: dict[str, float], logger: logging.Logger):
+        """
+        Args:
+            cache_dir (str): Directory of the cached pages.
+            ttls (dict): Seconds a page of each type ("album", "list") stays fresh.
+            logger (logging.Logger): Logger.
+        """
+        self.cache_dir = cache_dir
+        self.ttls = ttls
+        self.logger = logger
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Lowercase scheme and host, sort the query and drop the fragment and `page=1`."""
+        parsed = urlparse(url)
+        query = sorted(
+            (key, value) for key, value in parse_qsl(parsed.query) if (key, value) != ("page", "1")
+        )
+        return urlunparse(
+            (
+                parsed.scheme.lower(),
+                parsed.netloc.lower(),
+                parsed.path.rstrip("/") or "/",
+                "",
+                urlencode(query),
+                "",
+            )
+        )
+
+    @staticmethod
+    def page_type(url: str) -> str:
+        return "album" if "album" in urlparse(url).path.split("/") else "list"
+
+    def path(self, url: str) -> str:
+        key = hashlib.sha1(self.normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + ".html.gz")
+
+    def is_fresh(self, url: str) -> bool:
+        try:
+            age = time.time() - os.stat(self.path(url)).st_mtime
+        except OSError:
+            return False
+        return age <= self.ttls[self.page_type(url)]
+
+    def get(self, url: str, ignore_ttl: bool = False) -> str | None:
+        """Return the cached page, or `None` if it is not cached or expired."""
+        path = self.path(url)
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            if not ignore_ttl and age > self.ttls[self.page_type(url)]:
+                self.misses += 1
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                html = f.read()
+        except (OSError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.logger.debug(f"Page cache hit ({age:.0f}s old): {url}")
+        return html
+
+    def put(self, url: str, html: str) -> bool:
+        """Store a page if it has album content, return whether it was stored."""
+        if any(marker in html for marker in CHALLENGE_MARKERS) or not any(
+            marker in html for marker in CONTENT_MARKERS
+        ):
+            return False
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(gzip.compress(html.encode("utf-8"), compresslevel=6))
+        os.replace(temp_path, path)
+        return True
+
+    def prune(self) -> int:
+        """Remove pages older than the longest TTL, return the number removed."""
+        oldest = time.time() - max(self.ttls.values())
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_mtime < oldest:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+
+class CachedBot:
+    """Web bot with the page cache in front of `get_page`, other attributes come from the bot.
+
+    Without a bot, i.e. offline, pages come only from the cache regardless of their age and
+    missing pages are reported as failed. Pages from the cache are not paced.
+    """
+
+    def __init__(
+        self,
+        bot,
+        cache: PageCache,
+        logger: logging.Logger,
+        pacing: PacingScheduler | None = None,
+    ):
+        self.bot = bot
+        self.cache = cache
+        self.logger = logger
+        self.offline = bot is None
+        self.pacing: PacingScheduler = bot.pacing if bot is not None else pacing
+        self.last_page_cached = False
+
+    def __getattr__(self, name: str):
+        if self.bot is None:
+            raise AttributeError(name)
+        return getattr(self.bot, name)
+
+    @property
+    def prefetch_count(self) -> int:
+        return 0 if self.offline else self.bot.prefetch_count
+
+    def prefetch_pages(self, urls: list[str]):
+        if not self.offline:
+            self.bot.prefetch_pages([url for url in urls if not self.cache.is_fresh(url)])
+
+    def get_page(self, url: str) -> str:
+        html = self.cache.get(url, ignore_ttl=self.offline)
+        self.last_page_cached = html is not None
+        if html is not None:
+            return html
+        if self.offline:
+            self.logger.error(f"Page is not in the page cache: {url}")
+            return f"Failed to load '{url}' offline"
+
+        html = self.bot.get_page(url)
+        self.cache.put(url, html)
+        return html
+
+    def cancel_prefetch(self):
+        if not self.offline:
+            self.bot.cancel_prefetch()
+
+    def close_driver(self):
+        self.logger.info(f"Page cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        if not self.offline:
+            self.cache.prune()
+            self.bot.close_driver()
+
+
+def get_page_cache(config: Config, logger: logging.Logger) -> PageCache:
+    return PageCache(config.paths.page_cache, config.download.page_cache_ttl, logger)
+
+
+def get_cached_bot(bot, config: Config, logger: logging.Logger, offline: bool = False) -> CachedBot:
+    """Put the page cache in front of a bot, offline the bot is not used and may be `None`."""
+    cache = get_page_cache(config, logger)
+    if offline:
+        # nothing is loaded from the site, so there is nothing to wait for
+        return CachedBot(None, cache, logger, get_pacing(config, logger, VirtualClock()))
+    return CachedBot(bot, cache, logger)
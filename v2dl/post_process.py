@@ -0,0 +1,222 @@
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from .config import Config
+from .file_writer import check_image_end
+from .manifest import AlbumManifest
+
+# Pillow is optional, only transcoding requires it. It is imported by the steps that use it.
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+
+@dataclass
+class ProcessResult:
+    path: str
+    size: int
+    error: str | None = None
+
+
+class PostProcessError(Exception):
+    pass
+
+
+def sniff_format(path: Path) -> str | None:
+    """Return the file extension matching the magic bytes of an image."""
+    with open(path, "rb") as f:
+        head = f.read(16)
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:12] in {b"ftypavif", b"ftypavis"}:
+        return ".avif"
+    if head.startswith(b"BM"):
+        return ".bmp"
+    return None
+
+
+def fix_extension(path: Path, options: dict) -> Path:
+    """Rename the file to the extension of its real format."""
+    suffix = sniff_format(path)
+    if suffix is None:
+        raise PostProcessError(f"Unknown image format: '{path}'")
+    if path.suffix.lower() == suffix:
+        return path
+    new_path = path.with_suffix(suffix)
+    os.replace(path, new_path)
+    return new_path
+
+
+def validate_image(path: Path, options: dict) -> Path:
+    """Decode the whole image with Pillow, or check its end marker without Pillow."""
+    if not HAS_PILLOW:
+        if not check_image_end(path):
+            raise PostProcessError(f"Truncated image: '{path}'")
+        return path
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            image.load()
+    except Exception as e:
+        raise PostProcessError(f"Cannot decode image '{path}': {e}") from e
+    return path
+
+
+def transcode(path: Path, options: dict) -> Path:
+    """Convert the image to `transcode_format` with `transcode_quality`."""
+    if not HAS_PILLOW:
+        raise PostProcessError("Transcoding requires Pillow")
+    from PIL import Image
+
+    suffix = "." + options["transcode_format"].lower().lstrip(".")
+    if path.suffix.lower() == suffix:
+        return path
+
+    new_path = path.with_suffix(suffix)
+    tmp_path = new_path.with_name(new_path.name + ".part")
+    with Image.open(path) as image:
+        if suffix in {".jpg", ".jpeg"} and image.mode not in {"RGB", "L"}:
+            image = image.convert("RGB")
+        image.save(
+            tmp_path,
+            format=Image.registered_extensions()[suffix],
+            quality=options["transcode_quality"],
+        )
+    os.replace(tmp_path, new_path)
+    path.unlink()
+    return new_path
+
+
+# Steps run in the worker processes, must be picklable module level functions
+STEPS: dict[str, Callable[[Path, dict], Path]] = {
+    "sniff": fix_extension,
+    "validate": validate_image,
+    "transcode": transcode,
+}
+
+
+def run_steps(path: str, steps: list[str], options: dict) -> ProcessResult:
+    """Run the steps on one file in a worker process."""
+    file_path = Path(path)
+    try:
+        for step in steps:
+            file_path = STEPS[step](file_path, options)
+        return ProcessResult(str(file_path), file_path.stat().st_size)
+    except (PostProcessError, OSError) as e:
+        return ProcessResult(str(file_path), 0, str(e))
+
+
+class PostProcessor:
+    """Run CPU bound steps on downloaded images in a process pool, off the download threads.
+
+    Available steps are the keys of `STEPS`. A renamed file is recorded in the album manifest
+    under its original name, so it is still skipped next time, and an invalid image is removed so
+    it is downloaded again.
+    """
+
+    def __init__(self, steps: list[str], options: dict, max_workers: int, logger: logging.Logger):
+        """
+        Args:
+            steps (list): Names of steps to run in order.
+            options (dict): Options passed to every step.
+            max_workers (int): Number of worker processes, non-positive means the CPU count.
+            logger (logging.Logger): Logger.
+        """
+        unknown = [step for step in steps if step not in STEPS]
+        if unknown:
+            raise ValueError(f"Unsupported post process steps: {unknown}")
+        if "transcode" in steps and not HAS_PILLOW:
+            logger.warning("Pillow is not installed, transcoding is disabled")
+            steps = [step for step in steps if step != "transcode"]
+
+        self.steps = steps
+        self.options = options
+        self.logger = logger
+        # forked workers would inherit the locks and threads of the download workers, a lock
+        # held at fork time never gets released in the child
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers if max_workers > 0 else None,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+        self.lock = threading.Lock()
+        self.files = 0
+        self.failed = 0
+        self.bytes = 0
+        self.start_time: float | None = None
+
+    def submit(self, file_path: Path, manifest: AlbumManifest) -> Future:
+        """Queue a committed file, the manifest is updated when the steps are done."""
+        original_name = file_path.name
+        with self.lock:
+            if self.start_time is None:
+                self.start_time = time.time()
+        future = self.executor.submit(run_steps, str(file_path), self.steps, self.options)
+        future.add_done_callback(lambda f: self._finish(f, original_name, manifest))
+        return future
+
+    def close(self):
+        """Wait for queued files and stop the worker processes."""
+        self.executor.shutdown(wait=True)
+        self.log_stats()
+
+    def _finish(self, future: Future, original_name: str, manifest: AlbumManifest):
+        try:
+            result: ProcessResult = future.result()
+        except Exception as e:  # the worker process died
+            result = ProcessResult("", 0, str(e))
+
+        with self.lock:
+            self.files += 1
+            self.bytes += result.size
+
+        if result.error is not None:
+            with self.lock:
+                self.failed += 1
+            self.logger.error(f"Post process failed: {result.error}")
+            if result.path:  # download it again next time
+                Path(result.path).unlink(missing_ok=True)
+            manifest.record_failed(manifest.folder / original_name)
+            return
+
+        path = Path(result.path)
+        if path.name != original_name:
+            self.logger.info(f"Post processed '{original_name}' to '{path.name}'")
+        entry = manifest.entries.get(original_name)
+        if path.name != original_name or entry is None or entry.size != result.size:
+            manifest.record(manifest.folder / original_name, result.size, stored_as=path.name)
+
+    def log_stats(self):
+        if not self.files or self.start_time is None:
+            return
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        self.logger.info(
+            f"Post process: {self.files} files ({self.failed} failed), "
+            f"{self.bytes / 1024 / 1024:.1f} MiB in {elapsed:.1f}s, "
+            f"{self.files / elapsed:.1f} files/s"
+        )
+
+
+def get_post_processor(config: Config, logger: logging.Logger) -> PostProcessor | None:
+    if not config.download.post_process:
+        return None
+    options = {
+        "transcode_format": config.download.transcode_format,
+        "transcode_quality": config.download.transcode_quality,
+    }
+    return PostProcessor(
+        config.download.post_process, options, config.download.post_process_workers, logger
+    )
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import platform
+import struct
+import threading
+import time
+
+from .config import Config
+
+if platform.system() == "Windows":
+    import msvcrt
+else:
+    import fcntl
+
+
+class TokenBucket:
+    """Token bucket limiting the total download speed of all threads in this process.
+
+    Tokens are bytes. A reservation may take the bucket below zero, the caller then sleeps until
+    the debt is refilled, so concurrent callers are served in the order they reserve.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        """
+        Args:
+            rate (float): Refill rate in bytes per second, non-positive means unlimited.
+            burst (float): Bucket capacity in bytes.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = time.time()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: int) -> float:
+        """Take `amount` tokens and return how many seconds the caller should wait."""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self.tokens, self.last_refill = self._take(self.tokens, self.last_refill, amount)
+            return max(-self.tokens / self.rate, 0.0)
+
+    def acquire(self, amount: int):
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, amount: int):
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def close(self):
+        pass
+
+    def _take(self, tokens: float, last_refill: float, amount: int) -> tuple[float, float]:
+        now = time.time()
+        tokens = min(self.burst, tokens + max(now - last_refill, 0.0) * self.rate)
+        return tokens - amount, now
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose state is kept in a locked file, shared by all v2dl processes on a host."""
+
+    STATE_FORMAT = "dd"  # tokens, last refill timestamp
+
+    def __init__(self, rate: float, burst: float, state_path: str):
+        super().__init__(rate, burst)
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        fd = os.open(state_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.state_file = os.fdopen(fd, "r+b", buffering=0)
+
+    def reserve(self, amount: int) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._lock_file()
+            try:
+                tokens, last_refill = self._read_state()
+                tokens, last_refill = self._take(tokens, last_refill, amount)
+                self._write_state(tokens, last_refill)
+            finally:
+                self._unlock_file()
+            return max(-tokens / self.rate, 0.0)
+
+    async def acquire_async(self, amount: int):
+        # the file lock may be held by another process, wait for it outside the event loop
+        delay = await asyncio.to_thread(self.reserve, amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def close(self):
+        self.state_file.close()
+
+    def _read_state(self) -> tuple[float, float]:
+        self.state_file.seek(0)
+        data = self.state_file.read(struct.calcsize(self.STATE_FORMAT))
+        if len(data) < struct.calcsize(self.STATE_FORMAT):  # new or corrupted state file
+            return self.burst, time.time()
+        return struct.unpack(self.STATE_FORMAT, data)
+
+    def _write_state(self, tokens: float, last_refill: float):
+        self.state_file.seek(0)
+        self.state_file.write(struct.pack(self.STATE_FORMAT, tokens, last_refill))
+
+    def _lock_file(self):
+        if platform.system() == "Windows":
+            self.state_file.seek(0)
+            msvcrt.locking(self.state_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(self.state_file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(self):
+        if platform.system() == "Windows":
+            self.state_file.seek(0)
+            msvcrt.locking(self.state_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self.state_file.fileno(), fcntl.LOCK_UN)
+
+
+def get_rate_limiter(config: Config) -> TokenBucket:
+    """Create the download speed limiter, `rate_limit` and `rate_burst` are in KiB."""
+    rate = config.download.rate_limit * 1024
+    burst = config.download.rate_burst * 1024
+    if config.download.shared_rate_limit:
+        return SharedTokenBucket(rate, burst, config.paths.rate_limit_state)
+    return TokenBucket(rate, burst)
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from .config import Config
+from .file_writer import IncompleteDownloadError
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Jittered exponential backoff, honoring `Retry-After` of 429 and 503 responses."""
+
+    def __init__(self, max_retries: int, backoff: float, backoff_max: float):
+        """
+        Args:
+            max_retries (int): Retries after the first attempt.
+            backoff (float): Base delay in seconds, doubled by every attempt.
+            backoff_max (float): Upper bound of a delay in seconds.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """Network errors, server errors and cut transfers are retried, client errors are not."""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRY_STATUS
+        return isinstance(error, (httpx.TransportError, IncompleteDownloadError))
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retry number `attempt` (counted from 0)."""
+        # full jitter spreads the retries of all workers
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(error.response.headers.get("Retry-After", ""))
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+
+def parse_retry_after(value: str) -> float | None:
+    """Parse `Retry-After` given in seconds or as an HTTP date."""
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class HostState:
+    failures: deque[float] = field(default_factory=deque)
+    open_until: float = 0.0
+    cooldown: float = 0.0
+    recovering: bool = False
+    gap: float = 0.0
+    next_slot: float = 0.0
+
+
+class CircuitBreaker:
+    """Pause all requests to a host when its errors spike, then resume gradually.
+
+    The circuit opens when `threshold` failures happen within `window` seconds. After the
+    cooldown, requests are let through one every `RECOVERY_GAP` seconds and the gap halves with
+    each success until normal operation. A failure while recovering opens the circuit again with
+    a doubled cooldown.
+    """
+
+    RECOVERY_GAP = 1.0
+    MIN_GAP = 0.05
+
+    def __init__(self, threshold: int, window: float, cooldown: float, max_cooldown: float):
+        self.threshold = threshold
+        self.window = window
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.hosts: dict[str, HostState] = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        """Return 0 if a request may be sent now, else the seconds to wait before asking again."""
+        if self.threshold <= 0:
+            return 0.0
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                return 0.0
+            now = time.monotonic()
+            if now < state.open_until:
+                return state.open_until - now
+            if not state.recovering:
+                return 0.0
+            if now < state.next_slot:
+                return state.next_slot - now
+            state.next_slot = now + state.gap
+            return 0.0
+
+    def record(self, host: str, success: bool) -> bool:
+        """Record the result of a request, return `True` if this failure opened the circuit."""
+        if self.threshold <= 0:
+            return False
+        with self.lock:
+            state = self.hosts.setdefault(host, HostState())
+            now = time.monotonic()
+            if success:
+                if state.recovering:
+                    state.gap /= 2
+                    if state.gap < self.MIN_GAP:
+                        state.recovering = False
+                        state.cooldown = 0.0
+                return False
+
+            if state.recovering:
+                if now < state.open_until:  # a request sent before the circuit opened
+                    return False
+                self._open(state, now, min(state.cooldown * 2, self.max_cooldown))
+                return True
+            state.failures.append(now)
+            while state.failures and state.failures[0] < now - self.window:
+                state.failures.popleft()
+            if len(state.failures) >= self.threshold:
+                self._open(state, now, self.base_cooldown)
+                return True
+            return False
+
+    def _open(self, state: HostState, now: float, cooldown: float):
+        state.cooldown = cooldown
+        state.open_until = now + cooldown
+        state.failures.clear()
+        state.recovering = True
+        state.gap = self.RECOVERY_GAP
+        state.next_slot = state.open_until
+
+
+def get_retry_policy(config: Config) -> RetryPolicy:
+    return RetryPolicy(
+        config.download.max_retries,
+        config.download.retry_backoff,
+        config.download.retry_backoff_max,
+    )
+
+
+def get_circuit_breaker(config: Config) -> CircuitBreaker:
+    return CircuitBreaker(
+        config.download.breaker_threshold,
+        config.download.breaker_window,
+        config.download.breaker_cooldown,
+        config.download.breaker_cooldown_max,
+    )
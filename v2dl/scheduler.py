@@ -0,0 +1,190 @@
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class AlbumTasks:
+    key: str  # album URL, the name if it is unknown
+    album_url: str | None
+    priority: int
+    arrival: int
+    images: deque[tuple[str, str, str, float]] = field(default_factory=deque)
+    last_served: int = -1
+
+
+@dataclass
+class QueueStats:
+    depth: int = 0
+    estimated_bytes: int = 0
+    peak_depth: int = 0
+    image_wait_total: float = 0.0
+    image_wait_max: float = 0.0
+    images_served: int = 0
+    producer_wait_total: float = 0.0
+    producer_blocked: int = 0
+
+    @property
+    def image_wait_avg(self) -> float:
+        return self.image_wait_total / self.images_served if self.images_served else 0.0
+
+
+class DownloadScheduler:
+    """Thread-safe download queue with job priorities and fairness between albums.
+
+    Tasks are split per image so several workers can share one album. Albums with a higher priority
+    always go first, among albums of the same priority the next image is chosen by the policy:
+
+    - fifo: finish albums in arrival order.
+    - round_robin: albums take turns.
+    - smallest_first: album with the fewest queued images first, so albums complete early.
+
+    The queue is bounded by the number of images and their estimated size, `put` blocks the
+    scraper while downloads fall behind. The size estimate is the running average of downloaded
+    images reported to `task_done`.
+    """
+
+    POLICIES = {"fifo", "round_robin", "smallest_first"}
+
+    def __init__(
+        self,
+        policy: str = "round_robin",
+        max_images: int = 0,
+        max_bytes: int = 0,
+        image_size: int = 512 * 1024,
+    ):
+        """
+        Args:
+            policy (str): Scheduling policy among albums of the same priority.
+            max_images (int): Maximum queued images, non-positive means unbounded.
+            max_bytes (int): Maximum estimated bytes of queued images, non-positive means unbounded.
+            image_size (int): Initial estimate of the image size in bytes.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unsupported scheduling policy: {policy}")
+        self.policy = policy
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.image_size = float(image_size)
+
+        self.albums: dict[str, AlbumTasks] = {}  # by album URL
+        self.counter = itertools.count()
+        self.queued = 0
+        self.unfinished = 0
+        self.closed = False
+        self.stats = QueueStats()
+
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.all_done = threading.Condition(self.lock)
+
+    def put(
+        self,
+        album_name: str,
+        image_links: list[tuple[str, str]],
+        priority: int = 0,
+        album_url: str | None = None,
+    ):
+        """Queue the images of an album, a higher priority is served first.
+
+        Blocks while the queue is full, an empty queue always accepts the images. Albums are told
+        apart by `album_url`, which is handed back with each image, album names are not unique.
+        """
+        if not image_links:
+            return
+        with self.lock:
+            if self._is_full(len(image_links)):
+                start = time.monotonic()
+                while self._is_full(len(image_links)):
+                    self.not_full.wait()
+                self.stats.producer_wait_total += time.monotonic() - start
+                self.stats.producer_blocked += 1
+
+            key = album_url or album_name
+            album = self.albums.get(key)
+            if album is None:
+                album = AlbumTasks(key, album_url, priority, next(self.counter))
+                self.albums[key] = album
+            album.priority = max(album.priority, priority)
+            now = time.monotonic()
+            album.images.extend((url, alt, album_name, now) for url, alt in image_links)
+            self.queued += len(image_links)
+            self.unfinished += len(image_links)
+            self.stats.peak_depth = max(self.stats.peak_depth, self.queued)
+            self.not_empty.notify(len(image_links))
+
+    def get(self) -> tuple[str, list[tuple[str, str]], str | None] | None:
+        """Block until an image is available, return `None` once the scheduler is closed.
+
+        Returns the album name, the image as a one item list and the album URL.
+        """
+        with self.lock:
+            while not self.albums and not self.closed:
+                self.not_empty.wait()
+            if not self.albums:
+                return None
+
+            album = min(self.albums.values(), key=self._sort_key)
+            url, alt, album_name, queued_at = album.images.popleft()
+            album.last_served = next(self.counter)
+            if not album.images:
+                del self.albums[album.key]
+            self.queued -= 1
+
+            wait = time.monotonic() - queued_at
+            self.stats.images_served += 1
+            self.stats.image_wait_total += wait
+            self.stats.image_wait_max = max(self.stats.image_wait_max, wait)
+            self.not_full.notify_all()
+            return album_name, [(url, alt)], album.album_url
+
+    def task_done(self, size: int = 0):
+        """Mark an image done, `size` is the number of bytes downloaded for it."""
+        with self.lock:
+            if size > 0:  # moving average of recent images
+                self.image_size += (size - self.image_size) * 0.05
+                self.not_full.notify_all()
+            self.unfinished -= 1
+            if self.unfinished <= 0:
+                self.all_done.notify_all()
+
+    def join(self):
+        """Block until every queued image is done."""
+        with self.lock:
+            while self.unfinished > 0:
+                self.all_done.wait()
+
+    def close(self):
+        """Wake up all waiting threads, `get` returns `None` when the queue is empty."""
+        with self.lock:
+            self.closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+    def qsize(self) -> int:
+        with self.lock:
+            return self.queued
+
+    def get_stats(self) -> QueueStats:
+        """Return a snapshot of the queue depth and wait times."""
+        with self.lock:
+            self.stats.depth = self.queued
+            self.stats.estimated_bytes = int(self.queued * self.image_size)
+            return QueueStats(**vars(self.stats))
+
+    def _is_full(self, count: int) -> bool:
+        if self.closed or self.queued == 0:
+            return False
+        if self.max_images > 0 and self.queued + count > self.max_images:
+            return True
+        return self.max_bytes > 0 and (self.queued + count) * self.image_size > self.max_bytes
+
+    def _sort_key(self, album: AlbumTasks) -> tuple[int, int, int]:
+        if self.policy == "round_robin":
+            return -album.priority, album.last_served, album.arrival
+        if self.policy == "smallest_first":
+            return -album.priority, len(album.images), album.arrival
+        return -album.priority, album.arrival, 0
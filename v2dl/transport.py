@@ -0,0 +1,257 @@
+import asyncio
+import importlib.util
+import logging
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+import httpcore
+import httpx
+
+from .config import Config
+from .const import HEADERS
+
+# Connection management headers are handled by the connection pool, and HTTP/2 forbids them
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+class DNSCache:
+    """Thread-safe TTL cache of resolved host addresses."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: dict[tuple[str, int], tuple[str, float]] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    def get(self, host: str, port: int) -> str | None:
+        with self.lock:
+            entry = self.entries.get((host, port))
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+        return None
+
+    def resolve(self, host: str, port: int) -> str:
+        """Return the cached address of host, resolve it with the system resolver on a miss."""
+        address = self.get(host, port)
+        if address is not None:
+            return address
+
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        with self.lock:
+            self.lookups += 1
+            self.entries[(host, port)] = (address, time.monotonic() + self.ttl)
+        return address
+
+
+class CachingNetworkBackend(httpcore.NetworkBackend):
+    """Network backend connecting to cached DNS results, TLS still verifies the original host."""
+
+    def __init__(self, dns_cache: DNSCache, stats: "TransportStats"):
+        self.backend = httpcore.SyncBackend()
+        self.dns_cache = dns_cache
+        self.stats = stats
+
+    def connect_tcp(
+        self, host: str, port: int, *args: Any, **kwargs: Any
+    ) -> httpcore.NetworkStream:
+        self.stats.record_connection(host)
+        return self.backend.connect_tcp(self.dns_cache.resolve(host, port), port, *args, **kwargs)
+
+    def connect_unix_socket(self, *args: Any, **kwargs: Any) -> httpcore.NetworkStream:
+        return self.backend.connect_unix_socket(*args, **kwargs)
+
+    def sleep(self, seconds: float) -> None:
+        self.backend.sleep(seconds)
+
+
+class AsyncCachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Async version of `CachingNetworkBackend`, resolves in a thread to keep the loop running."""
+
+    def __init__(self, dns_cache: DNSCache, stats: "TransportStats"):
+        self.backend = httpcore.AnyIOBackend()
+        self.dns_cache = dns_cache
+        self.stats = stats
+
+    async def connect_tcp(
+        self, host: str, port: int, *args: Any, **kwargs: Any
+    ) -> httpcore.AsyncNetworkStream:
+        self.stats.record_connection(host)
+        address = self.dns_cache.get(host, port)
+        if address is None:
+            address = await asyncio.to_thread(self.dns_cache.resolve, host, port)
+        return await self.backend.connect_tcp(address, port, *args, **kwargs)
+
+    async def connect_unix_socket(self, *args: Any, **kwargs: Any) -> httpcore.AsyncNetworkStream:
+        return await self.backend.connect_unix_socket(*args, **kwargs)
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """`httpx.HTTPTransport` whose connection pool uses `CachingNetworkBackend`."""
+
+    def __init__(self, limits: httpx.Limits, http2: bool, network_backend: CachingNetworkBackend):
+        # pylint: disable=super-init-not-called
+        # httpx has no option for the network backend, build the pool it would build ourselves
+        self._pool = httpcore.ConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+
+class AsyncPooledTransport(httpx.AsyncHTTPTransport):
+    """`httpx.AsyncHTTPTransport` whose connection pool uses `AsyncCachingNetworkBackend`."""
+
+    def __init__(
+        self, limits: httpx.Limits, http2: bool, network_backend: AsyncCachingNetworkBackend
+    ):
+        # pylint: disable=super-init-not-called
+        # httpx has no option for the network backend, build the pool it would build ourselves
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+
+class TransportStats:
+    """Counters of requests and new connections per host."""
+
+    def __init__(self):
+        self.requests: Counter[str] = Counter()
+        self.connections: Counter[str] = Counter()
+        self.http_versions: Counter[str] = Counter()
+        self.lock = threading.Lock()
+
+    def record_connection(self, host: str):
+        with self.lock:
+            self.connections[host] += 1
+
+    def record_response(self, response: httpx.Response):
+        with self.lock:
+            self.requests[response.request.url.host] += 1
+            self.http_versions[response.http_version] += 1
+
+
+class HttpTransport:
+    """Connection-pooled HTTP clients shared by all download workers.
+
+    Both clients keep connections alive per host, negotiate HTTP/2 when the server offers it, reuse
+    cached DNS results and send `const.HEADERS` with every request.
+    """
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.logger = logger
+        self.limits = httpx.Limits(
+            max_connections=config.download.pool_size,
+            max_keepalive_connections=config.download.pool_size,
+            keepalive_expiry=config.download.keepalive_expiry,
+        )
+        self.http2 = config.download.http2
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requires the 'h2' package, falling back to HTTP/1.1")
+            self.http2 = False
+        self.headers = {k: v for k, v in HEADERS.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+        self.dns_cache = DNSCache(config.download.dns_ttl)
+        self.stats = TransportStats()
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self.lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared synchronous client, safe to use from multiple threads."""
+        with self.lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    headers=self.headers,
+                    follow_redirects=True,
+                    transport=PooledTransport(
+                        self.limits,
+                        self.http2,
+                        CachingNetworkBackend(self.dns_cache, self.stats),
+                    ),
+                    event_hooks={"response": [self.stats.record_response]},
+                )
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The shared asynchronous client, must only be used from one event loop."""
+        with self.lock:
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    headers=self.headers,
+                    follow_redirects=True,
+                    transport=AsyncPooledTransport(
+                        self.limits,
+                        self.http2,
+                        AsyncCachingNetworkBackend(self.dns_cache, self.stats),
+                    ),
+                    event_hooks={"response": [self._async_record_response]},
+                )
+            return self._async_client
+
+    async def _async_record_response(self, response: httpx.Response):
+        self.stats.record_response(response)
+
+    def close(self):
+        """Close the synchronous client. The async client is closed by `aclose` in its loop."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Summarize requests, connections, protocol and DNS cache usage."""
+        with self.stats.lock:
+            total_requests = sum(self.stats.requests.values())
+            total_connections = sum(self.stats.connections.values())
+            return {
+                "requests": total_requests,
+                "connections": total_connections,
+                "reused_requests": max(total_requests - total_connections, 0),
+                "http_versions": dict(self.stats.http_versions),
+                "per_host": {
+                    host: {"requests": count, "connections": self.stats.connections[host]}
+                    for host, count in self.stats.requests.items()
+                },
+                "dns_lookups": self.dns_cache.lookups,
+                "dns_cache_hits": self.dns_cache.hits,
+            }
+
+    def log_stats(self):
+        stats = self.pool_stats()
+        if not stats["requests"]:
+            return
+        versions = ", ".join(f"{k}: {v}" for k, v in stats["http_versions"].items())
+        self.logger.info(
+            f"Transport: {stats['requests']} requests over {stats['connections']} connections "
+            f"({versions}), DNS lookups: {stats['dns_lookups']}, "
+            f"DNS cache hits: {stats['dns_cache_hits']}"
+        )
@@ -1,170 +1,241 @@
 import logging
 import re
-import requests
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from pathlib import Path
 
-from lxml import html
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-
-from .const import HEADERS
-
-
-class LinkParser:
-    """Tool class parses URL"""
-
-    @staticmethod
-    def parse_input_url(url):
-        parsed_url = urlparse(url)
-        path_parts: list[str] = parsed_url.path.split("/")
-        query_params = parse_qs(parsed_url.query)
-        start_page: int = int(query_params.get("page", [1])[0])  # default page=1
-        return path_parts, start_page
-
-    @staticmethod
-    def parse_html(html_content: str, logger: logging.Logger) -> html.HtmlElement | None:
-        if "Failed" in html_content:
-            return None
-
-        try:
-            return html.fromstring(html_content)
-        except Exception as e:
-            logger.error(f"Error parsing HTML content: {e}")
+import httpx
+from urllib.parse import urlparse
+
+from .config import Config
+from .dedup_store import ContentStore
+from .file_writer import DiskWriter, PartFile
+from .link_parser import LinkParser  # re-exported, moved out to keep startup light
+from .manifest import AlbumManifest
+from .post_process import PostProcessor
+from .rate_limiter import TokenBucket
+from .retry import get_circuit_breaker, get_retry_policy
+from .transport import HttpTransport
+
+__all__ = ["BaseDownloader", "ImageDownloader", "LinkParser", "get_image_path"]
+
+
+class BaseDownloader:
+    """Resources shared by all download workers and the album bookkeeping of every engine."""
+
+    MAX_CACHED_MANIFESTS = 64
+
+    def __init__(
+        self,
+        config: Config,
+        transport: HttpTransport,
+        limiter: TokenBucket,
+        disk_writer: DiskWriter,
+        store: ContentStore | None,
+        post_processor: PostProcessor | None,
+        logger: logging.Logger,
+    ):
+        self.config = config
+        self.transport = transport
+        self.limiter = limiter
+        self.disk_writer = disk_writer
+        self.store = store
+        self.post_processor = post_processor
+        self.logger = logger
+        self.chunk_size = config.download.chunk_size * 1024
+        self.verify = config.download.verify_images
+        self.retry = get_retry_policy(config)
+        self.breaker = get_circuit_breaker(config)
+
+        # tasks arrive one image at a time, keep the manifests of recently used albums loaded
+        self.manifests: OrderedDict[Path, AlbumManifest] = OrderedDict()
+        self.manifests_lock = threading.Lock()
+
+    def prepare_album(
+        self, album_name: str, image_links: list[tuple[str, str]]
+    ) -> tuple[AlbumManifest, list[tuple[str, Path]], list[Future]]:
+        """Skip complete files, link images known to the content store, return what to download.
+
+        Args:
+            album_name (str): Name of album folder.
+            image_links (list): List of tuples with image URLs and corresponding alt text for
+            filenames.
+
+        Returns:
+            tuple: The album manifest, a list of image URL and file path to download and the
+            post process futures of the linked images.
+        """
+        folder = Path(self.config.download.download_dir) / album_name
+        manifest = self.get_manifest(folder)
+
+        pending = []
+        processing = []
+        for url, alt in image_links:
+            file_path = get_image_path(folder, alt)
+
+            if manifest.is_complete(file_path, self.verify):
+                self.logger.debug(f"File already exists: '{file_path}'")
+                continue
+
+            if self.store is not None and self.store.link(url, file_path):
+                self.logger.info(f"Linked from store: '{file_path}'")
+                manifest.record(file_path)
+                if self.post_processor is not None:
+                    processing.append(self.post_processor.submit(file_path, manifest))
+                continue
+
+            pending.append((url, file_path))
+        return manifest, pending, processing
+
+    def retry_delay(self, url: str, error: Exception, attempt: int) -> float | None:
+        """Log a failed attempt, return seconds to wait before retrying or `None` to give up."""
+        host = urlparse(url).netloc
+        retryable = self.retry.is_retryable(error)
+        if retryable and self.breaker.record(host, False):
+            self.logger.warning(f"Too many errors from {host}, pausing downloads from it")
+
+        if not retryable or attempt >= self.retry.max_retries:
+            if isinstance(error, httpx.HTTPStatusError):
+                self.logger.error(f"HTTP error occurred: {error}")
+            else:
+                self.logger.error(f"An error occurred: {error}")
             return None
 
-    @staticmethod
-    def get_max_page(tree: html.HtmlElement) -> int:
-        """Parse pagination count"""
-        page_links = tree.xpath(
-            '//li[@class="page-item"]/a[@class="page-link" and string-length(text()) <= 2]/@href'
+        delay = self.retry.delay(attempt, error)
+        self.logger.warning(
+            f"Retrying in {delay:.1f}s ({attempt + 1}/{self.retry.max_retries}): {error}"
         )
-
-        if not page_links:
-            return 1
-
-        page_numbers = []
-        for link in page_links:
-            match = re.search(r"page=(\d+)", link)
-            if match:
-                page_number = int(match.group(1))
+        return delay
+
+    def get_manifest(self, folder: Path) -> AlbumManifest:
+        """Return the cached manifest of an album folder, creating the folder on first use."""
+        with self.manifests_lock:
+            manifest = self.manifests.get(folder)
+            if manifest is not None:
+                self.manifests.move_to_end(folder)
+                return manifest
+
+            folder.mkdir(parents=True, exist_ok=True)
+            manifest = AlbumManifest(folder)
+            self.manifests[folder] = manifest
+            if len(self.manifests) > self.MAX_CACHED_MANIFESTS:
+                self.manifests.popitem(last=False)
+            return manifest
+
+    def finish_image(
+        self, url: str, file_path: Path, manifest: AlbumManifest
+    ) -> tuple[int, Future | None]:
+        """Bookkeeping after an image is committed, return its size and post process future."""
+        size = file_path.stat().st_size
+        # hashing is only needed for deduplication, reading every image back costs too much
+        digest = self.store.add(url, file_path) if self.store is not None else None
+        manifest.record(file_path, size, url=url, digest=digest)
+        if self.post_processor is not None:  # CPU work runs in other processes
+            return size, self.post_processor.submit(file_path, manifest)
+        return size, None
+
+
+class ImageDownloader(BaseDownloader):
+    """Download images one by one in the calling thread."""
+
+    def download_album(
+        self, album_name: str, image_links: list[tuple[str, str]]
+    ) -> tuple[int, int]:
+        """
+        Download images from image links, save them to a folder named after the album, and skips
+        files that are already complete.
+
+        Args:
+            album_name (str): Name of album folder.
+            image_links (list): List of tuples with image URLs and corresponding alt text for
+            filenames.
+
+        Returns:
+            tuple: Total size of the downloaded images, the number of images that failed and the
+            futures of the images still being post processed.
+        """
+        manifest, pending, processing = self.prepare_album(album_name, image_links)
+
+        downloaded = failed = 0
+        for url, file_path in pending:
+            # httpx module will log download url
+            if self.download_image(url, file_path):
+                size, future = self.finish_image(url, file_path, manifest)
+                downloaded += size
+                if future is not None:
+                    processing.append(future)
             else:
-                page_number = 1
-            page_numbers.append(page_number)
-
-        return max(page_numbers)
-
-    @staticmethod
-    def add_page_num(url: str, page: int) -> str:
-        parsed_url = urlparse(url)  # 解析 URL
-        query_params = parse_qs(parsed_url.query)  # 解析查詢參數
-        query_params["page"] = [str(page)]  # 修改頁碼
-
-        new_query = urlencode(query_params, doseq=True)  # 組合成字串
-        new_url = parsed_url._replace(query=new_query)  # 替換頁碼
-
-        # Example
-        # url = "https://example.com/search?q=test&sort=asc", page = 3
-        # parsed_url: ParseResult(scheme='https', netloc='example.com', path='/search', params='', query='q=test&sort=asc', fragment='')
-        # query_params: {'q': ['test'], 'sort': ['asc'], 'page': ['3']}
-        # new_query: 'q=test&sort=asc&page=3'
-        # new_url: ParseResult(scheme='https', netloc='example.com', path='/search', params='', query='q=test&sort=asc&page=3', fragment='')
-        # urlunparse: 'https://example.com/search?q=test&sort=asc&page=3'
-        return urlunparse(new_url)
-
-    @staticmethod
-    def remove_page_num(url: str) -> str:
-        """remove ?page=d or &page=d from URL"""
-        # Parse the URL
-        parsed_url = urlparse(url)
-        query_params = parse_qs(parsed_url.query)
-
-        # Remove the 'page' parameter if it exists
-        if "page" in query_params:
-            del query_params["page"]
-
-        # Rebuild the query string without 'page'
-        new_query = urlencode(query_params, doseq=True)
-
-        # Rebuild the full URL
-        new_url = urlunparse(parsed_url._replace(query=new_query))
-        return new_url
-
-
-def download_album(
-    album_name: str,
-    image_links: str,
-    destination: str,
-    rate_limit: int,
-    logger: logging.Logger,
-):
-    """
-    Download images from image links, save them to a folder named after the album, and skips files
-    that already exist.
-
-    Args:
-        album_name (str): Name of album folder.
-        image_links (str): List of tuples with image URLs and corresponding alt text for filenames.
-        destination (str): Download parent directory of album folder.
-        rate_limit (int): Download rate limits.
-        logger (logging.Logger): Logger.
-    """
-    folder = destination / Path(album_name)
-    folder.mkdir(parents=True, exist_ok=True)
-
-    for url, alt in image_links:
-        filename = re.sub(r'[<>:"/\\|?*]', "", alt)  # Remove invalid characters
-        file_path = folder / f"{filename}.jpg"
-
-        if file_path.exists():
-            logger.info(f"File already exists: '{file_path}'")
-            continue
-
-        # requests module will log download url
-        if download_image(url, file_path, rate_limit, logger):
-            pass
-
-
-def download_image(url: str, save_path: Path, rate_limit: int, logger: logging.Logger) -> bool:
-    """
-    Error control subfunction for download files.
-
-    Return `True` for successful download, else `False`.
-    """
-    try:
-        download(url, save_path, rate_limit)
-        logger.info(f"Downloaded: '{save_path}'")
+                manifest.record_failed(file_path, url)
+                failed += 1
+        return downloaded, failed, processing
+
+    def download_image(self, url: str, save_path: Path) -> bool:
+        """
+        Error control subfunction for download files, retry temporary errors with backoff.
+
+        Return `True` for successful download, else `False`.
+        """
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            while (wait := self.breaker.reserve(host)) > 0:
+                time.sleep(wait)
+            try:
+                self.download(url, save_path)
+            except Exception as err:
+                delay = self.retry_delay(url, err, attempt)
+                if delay is None:
+                    return False
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record(host, True)
+            self.logger.info(f"Downloaded: '{save_path}'")
+            return True
+
+    def download(self, url: str, save_path: Path) -> None:
+        """
+        Download with speed limit function.
+
+        The speed limit is shared with all other downloads through `limiter`. Data is written to
+        `<name>.part` and renamed when complete, an interrupted download is resumed next time.
+        """
+        part = PartFile(save_path)
+        if not self.download_part(url, part):
+            # the server refused the range, the part file does not match its file anymore
+            self.logger.info(f"Cannot resume '{save_path}', downloading it again")
+            part.discard()
+            self.download_part(url, PartFile(save_path))
+
+    def download_part(self, url: str, part: PartFile) -> bool:
+        """Download into a part file and commit it, return `False` if its range is refused."""
+        client = self.transport.client
+        with client.stream("GET", url, headers=part.request_headers()) as response:
+            if part.is_complete(response):
+                part.commit(part.offset, self.verify)
+                return True
+            if response.status_code == 416 and part.offset:
+                return False
+            response.raise_for_status()  # 確認請求成功
+
+            offset = part.begin(response)
+            if offset:
+                self.logger.info(f"Resuming '{part.path}' from {offset} bytes")
+            with part.open(self.disk_writer, offset) as file:
+                for chunk in response.iter_bytes(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    self.limiter.acquire(len(chunk))
+        part.commit(file.size, self.verify)
         return True
-    except requests.exceptions.HTTPError as http_err:
-        logger.error(f"HTTP error occurred: {http_err}")
-        return False
-    except Exception as err:
-        logger.error(f"An error occurred: {err}")
-        return False
-
-
-def download(url: str, save_path: Path, speed_limit_kbps: int = 1536) -> None:
-    """
-    Download with speed limit function.
-
-    Default speed limit is 1536 KBps (1.5 MBps).
-    """
-
-    chunk_size = 1024
-    speed_limit_bps = speed_limit_kbps * 1024  # 轉換為 bytes per second
-
-    response = requests.get(url, stream=True, headers=HEADERS)
-    response.raise_for_status()  # 確認請求成功
 
-    with open(save_path, "wb") as file:
-        start_time = time.time()
-        downloaded = 0
 
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            file.write(chunk)
-            downloaded += len(chunk)
+INVALID_CHARS = re.compile(r'[<>:"/\\|?*]')
 
-            elapsed_time = time.time() - start_time
-            expected_time = downloaded / speed_limit_bps
 
-            if elapsed_time < expected_time:
-                time.sleep(expected_time - elapsed_time)
+def get_image_path(folder: Path, alt: str) -> Path:
+    """Build the image file path from its alt text."""
+    filename = INVALID_CHARS.sub("", alt)  # Remove invalid characters
+    return folder / f"{filename}.jpg"
@@ -1,107 +1,238 @@
 import logging
-import os
 import re
-import time
+import sys
 import threading
-from queue import Queue
-
-from lxml import html
-
-from .const import BASE_URL, XPATH_ALTS, XPATH_ALBUM, XPATH_ALBUM_LIST
+import time
+from collections import Counter
+from concurrent.futures import Future
+from functools import partial
+from dataclasses import dataclass
+from typing import Callable
+
+from .const import BASE_URL
+from .album_state import AlbumStateStore, get_album_state
 from .config import Config, ConfigManager, parse_arguments
 from .custom_logger import setup_logging
-from .utils import LinkParser, download_album
+from .link_parser import LinkParser
+from .page_cache import get_cached_bot
+from .scheduler import DownloadScheduler
 from .web_bot import get_bot
 
 
+@dataclass
+class ScrapeResult:
+    url: str
+    status: str = "pending"
+    albums: int = 0
+    images: int = 0
+    error: str = ""
+
+
 class ScrapeManager:
-    """Manage how to scrape the given URL"""
+    """Manage how to scrape the given URLs
+
+    All URLs share the web bot and one download service, the downloads of a URL continue while the
+    next one is scraped.
+    """
+
+    # albums requested directly are downloaded before the albums of a list page
+    ALBUM_PRIORITY = 1
+    ALBUM_LIST_PRIORITY = 0
 
     def __init__(
         self,
-        url: str,
+        urls: str | list[str],
         web_bot,
         dry_run: bool,
         config: Config,
         logger: logging.Logger,
+        incremental: bool = False,
     ):
-        self.url = url
-        self.path_parts, self.start_page = LinkParser.parse_input_url(url)
+        self.urls = [urls] if isinstance(urls, str) else urls
+        self.url = self.urls[0]
+        self.path_parts, self.start_page = LinkParser.parse_input_url(self.url)
+        self.results: list[ScrapeResult] = []
 
         self.web_bot = web_bot
         self.dry_run = dry_run
+        self.incremental = incremental
         self.config = config
         self.logger = logger
 
         # 初始化
-        self.download_service = DownloadService(config, logger)
-        self.link_scraper = LinkScraper(web_bot, dry_run, self.download_service, logger)
-        self.album_tracker = AlbumTracker(config.paths.download_log)
-
+        self.album_state = get_album_state(config)
+        # a dry run downloads nothing, so it needs no transport, disk writer or worker processes
+        self.download_service: DownloadService | None = None
         if not dry_run:
+            self.download_service = DownloadService(config, logger, album_state=self.album_state)
             self.download_service.start_workers()
+        self.link_scraper = LinkScraper(web_bot, dry_run, self.download_service, logger)
 
     def start_scraping(self):
-        album_list_name = {"actor", "company", "category", "country"}
         try:
-            if "album" in self.path_parts:
-                self.scrape_album(self.url)
-            elif any(part in album_list_name for part in self.path_parts):
-                self.scrape_album_list_page(self.url)
-            else:
-                raise ValueError(f"Unsupported URL type: {self.url}")
+            for url in self.urls:
+                result = ScrapeResult(url)
+                self.results.append(result)
+                try:
+                    self.scrape_url(url, result)
+                except Exception as e:
+                    if len(self.urls) == 1:
+                        raise
+                    result.status, result.error = "failed", str(e)
+                    self.logger.error(f"Failed to scrape {url}: {e}")
         finally:
-            if not self.dry_run:
-                self.download_service.wait_completion()
-            self.web_bot.close_driver()
-
-    def scrape_album_list_page(self, actor_url: str):
-        """Scrape all albums in album list page"""
-        album_links = self.link_scraper.scrape_link(actor_url, self.start_page, True)
+            self.close()
+            if len(self.urls) > 1:
+                self.log_summary()
+
+    def close(self):
+        """Wait for the downloads, then close the album state and the bot."""
+        if self.download_service is not None:
+            self.download_service.wait_completion()
+        self.album_state.close()
+        self.web_bot.close_driver()
+
+    def scrape_url(self, url: str, result: ScrapeResult):
+        album_list_name = {"actor", "company", "category", "country"}
+        self.url = url
+        self.path_parts, self.start_page = LinkParser.parse_input_url(url)
+        if "album" in self.path_parts:
+            images = self.scrape_album(url, self.ALBUM_PRIORITY)
+            if images is None:
+                result.status = "skipped"
+                return
+            result.albums, result.images = 1, images
+        elif any(part in album_list_name for part in self.path_parts):
+            result.albums, result.images = self.scrape_album_list_page(url)
+        else:
+            raise ValueError(f"Unsupported URL type: {url}")
+        result.status = "dry run" if self.dry_run else "done"
+
+    def scrape_album_list_page(self, actor_url: str) -> tuple[int, int]:
+        """Scrape all albums in album list page, return the number of albums and images
+
+        An incremental sync stops at a run of downloaded albums, the newest albums come first. All
+        pages are scraped on the first run and then every `full_sweep_days`, to catch albums
+        missed in between.
+        """
+        full_sweep = not self.incremental or self._full_sweep_due(actor_url)
+        should_stop = None
+        if not full_sweep:
+            should_stop = stop_at_known_albums(
+                self.is_known_album, self.config.download.incremental_stop
+            )
+        if self.incremental:
+            kind = "full sweep" if full_sweep else "incremental sync"
+            self.logger.info(f"Scraping {actor_url} ({kind})")
+        album_links = self.link_scraper.scrape_link(
+            actor_url, self.start_page, True, should_stop=should_stop
+        )
+        swept = full_sweep and self.link_scraper.reached_end
         valid_album_links = [album_url for album_url in album_links if isinstance(album_url, str)]
         self.logger.info(f"Found {len(valid_album_links)} albums")
 
+        images = 0
         for album_url in valid_album_links:
             if self.dry_run:
                 self.logger.info(f"[DRY RUN] Album URL: {album_url}")
             else:
-                self.scrape_album(album_url)
-
-    def scrape_album(self, album_url: str):
-        """Scrape a single album page"""
-        if self.album_tracker.is_downloaded(album_url):
+                images += self.scrape_album(album_url, self.ALBUM_LIST_PRIORITY) or 0
+        if swept and not self.dry_run and self.start_page == 1:
+            self.album_state.set_full_sweep(actor_url)
+        elif self.incremental and full_sweep and not swept:
+            self.logger.warning(f"Full sweep of {actor_url} stopped early, retrying next run")
+        return len(valid_album_links), images
+
+    def is_known_album(self, album_url: str) -> bool:
+        """Check if the album is downloaded or being downloaded by this run."""
+        service = self.download_service
+        downloading = service is not None and service.is_downloading(album_url)
+        return downloading or self.album_state.is_downloaded(album_url)
+
+    def _full_sweep_due(self, list_url: str) -> bool:
+        last_sweep = self.album_state.last_full_sweep(list_url)
+        interval = self.config.download.full_sweep_days * 86400
+        return last_sweep is None or (interval > 0 and time.time() - last_sweep > interval)
+
+    def scrape_album(self, album_url: str, priority: int = 0) -> int | None:
+        """Scrape a single album page, return the number of images or `None` if skipped"""
+        if self.album_state.is_downloaded(album_url):
             self.logger.info(f"Album {album_url} already downloaded, skipping.")
-            return
+            return None
+        if self.download_service is not None and self.download_service.is_downloading(album_url):
+            self.logger.info(f"Album {album_url} is being downloaded, skipping.")
+            return None
 
-        image_links = self.link_scraper.scrape_link(album_url, self.start_page, False)
+        image_links = self.link_scraper.scrape_link(album_url, self.start_page, False, priority)
         if image_links:
             album_name = re.sub(r"\s*\d+$", "", image_links[0][1])
             self.logger.info(f"Found {len(image_links)} images in album {album_name}")
 
-            if self.dry_run:
+            if self.download_service is None:
                 for link, alt in image_links:
                     self.logger.info(f"[DRY RUN] Image URL: {link}")
-            else:
-                self.album_tracker.log_downloaded(album_url)
+                self.album_state.set_status(album_url, "scraped", len(image_links))
+            else:  # complete once the queued images are downloaded
+                self.download_service.album_scraped(
+                    album_url, len(image_links), self.link_scraper.reached_end
+                )
+        return len(image_links)
+
+    def log_summary(self):
+        counts = Counter(result.status for result in self.results)
+        self.logger.info(
+            f"Processed {len(self.results)} URLs: "
+            + ", ".join(f"{count} {status}" for status, count in counts.items())
+        )
+        for result in self.results:
+            line = f"[{result.status}] {result.url}: {result.albums} albums, {result.images} images"
+            if result.error:
+                line += f" ({result.error})"
+            self.logger.info(line)
+
+    def write_summary(self, path: str):
+        """Write the status of every URL as tab separated lines"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("url\tstatus\talbums\timages\terror\n")
+            for r in self.results:
+                f.write(f"{r.url}\t{r.status}\t{r.albums}\t{r.images}\t{r.error}\n")
 
 
 class LinkScraper:
     """Scrape logic"""
 
-    def __init__(self, web_bot, dry_run: bool, download_service, logger: logging.Logger):
+    def __init__(
+        self,
+        web_bot,
+        dry_run: bool,
+        download_service: "DownloadService | None",
+        logger: logging.Logger,
+    ):
         self.web_bot = web_bot
         self.dry_run = dry_run
-        self.download_service: DownloadService = download_service
+        self.download_service = download_service
         self.logger = logger
+        self.reached_end = False  # whether the last `scrape_link` got to the last page
 
     def scrape_link(
-        self, url: str, start_page: int, is_album_list: bool
+        self,
+        url: str,
+        start_page: int,
+        is_album_list: bool,
+        priority: int = 0,
+        should_stop: Callable[[list[str]], bool] | None = None,
     ) -> list[str] | list[tuple[str, str]]:
         """Scrape all pages after the given URL (not URLs).
 
         Args:
             url (str): URL to scrape, can be a album list page or a album page.
             is_album_list (bool): Check if the page is a album list page.
+            priority (int): Download priority of the images found, higher is downloaded first.
+            should_stop (Callable): Called with the links of each page, no further pages are
+                scraped once it returns True.
+
+        A page that fails to load also ends the scrape, `reached_end` tells if every page up to
+        the last one was scraped.
 
         Returns:
             page_result (list): A list of URL if is_album_list=True. Otherwise, returns a list of
@@ -114,37 +245,57 @@ class LinkScraper:
         page = start_page
         consecutive_page = 0
         alt_ctr = 0
-        xpath_page_links = XPATH_ALBUM_LIST if is_album_list else XPATH_ALBUM
-
-        while True:
-            full_url = LinkParser.add_page_num(url, page)
-            html_content = self.web_bot.auto_page_scroll(full_url)
-            tree = LinkParser.parse_html(html_content, self.logger)
-            if tree is None:
-                break
-
-            self.logger.info(f"Fetching content from {full_url}")
-            page_links = tree.xpath(xpath_page_links)
-            if not page_links:
-                self.logger.info(
-                    f"No more {'albums' if is_album_list else 'images'} found on page {page}"
-                )
-                break
-
-            if is_album_list:
-                self._process_album_list_links(page_links, page_result, page)
-            else:
-                self._process_album_image_links(page_links, page_result, alt_ctr, tree, page)
+        self.reached_end = False
 
-            if page >= LinkParser.get_max_page(tree):
-                self.logger.info("Reached last page, stopping")
-                break
-
-            page += 1
-            consecutive_page += 1
-            if consecutive_page == 3:
-                consecutive_page = 0
-                time.sleep(15)
+        try:
+            while True:
+                full_url = LinkParser.add_page_num(url, page)
+                html_content = self.web_bot.get_page(full_url)
+                links = LinkParser.extract_links(html_content, self.logger)
+                if links is None:
+                    break
+
+                self.logger.info(f"Fetching content from {full_url}")
+                page_links = links.album_links if is_album_list else links.image_urls
+                if not page_links:
+                    self.logger.info(
+                        f"No more {'albums' if is_album_list else 'images'} found on page {page}"
+                    )
+                    self.reached_end = True
+                    break
+
+                # load the next pages in other browser tabs while this one is processed
+                max_page = links.max_page
+                next_pages = range(page + 1, min(max_page, page + self.web_bot.prefetch_count) + 1)
+                self.web_bot.prefetch_pages([LinkParser.add_page_num(url, p) for p in next_pages])
+
+                if is_album_list:
+                    self._process_album_list_links(page_links, page_result, page)
+                else:
+                    self._process_album_image_links(
+                        page_links, page_result, alt_ctr, links.alts, page, priority, url
+                    )
+
+                if should_stop is not None and should_stop(page_links):
+                    self.logger.info(f"Stopping at page {page}")
+                    break
+
+                if page >= max_page:
+                    self.logger.info("Reached last page, stopping")
+                    self.reached_end = True
+                    break
+
+                page += 1
+                # pages from the page cache put no load on the site
+                if not getattr(self.web_bot, "last_page_cached", False):
+                    consecutive_page += 1
+                # with several tabs the page loads are paced by the bot instead
+                pacing = self.web_bot.pacing
+                if consecutive_page >= pacing.page_batch_size and not self.web_bot.prefetch_count:
+                    consecutive_page = 0
+                    pacing.pause("page_batch")
+        finally:
+            self.web_bot.cancel_prefetch()
 
         return page_result
 
@@ -163,12 +314,12 @@ class LinkScraper:
         page_links: list[str],
         page_result: list[tuple[str, str]],
         alt_ctr: int,
-        tree: html.HtmlElement,
+        alts: list[str],
         page: int,
+        priority: int,
+        album_url: str,
     ):
         """Handle image links extraction and queueing for download"""
-        alts: list[str] = tree.xpath(XPATH_ALTS)
-
         if len(alts) < len(page_links):
             missing_alts = [str(i + alt_ctr) for i in range(len(page_links) - len(alts))]
             alts.extend(missing_alts)
@@ -177,10 +328,10 @@ class LinkScraper:
         page_result.extend(zip(page_links, alts))
 
         # Download file
-        if not self.dry_run:
+        if self.download_service is not None:
             album_name = self.extract_album_name(alts)
             image_links = list(zip(page_links, alts))
-            self.download_service.add_download_task(album_name, image_links)  # add task to queue
+            self.download_service.add_download_task(album_name, image_links, priority, album_url)
         self.logger.info(f"Found {len(page_links)} images on page {page}")
 
     @staticmethod
@@ -194,70 +345,231 @@ class LinkScraper:
         return album_name
 
 
-class AlbumTracker:
-    """Download log in units of albums"""
-
-    def __init__(self, download_log: str):
-        self.album_log_path = download_log
-
-    def is_downloaded(self, album_url: str) -> bool:
-        if os.path.exists(self.album_log_path):
-            with open(self.album_log_path, "r") as f:
-                downloaded_albums = f.read().splitlines()
-            return album_url in downloaded_albums
-        return False
-
-    def log_downloaded(self, album_url: str):
-        album_url = LinkParser.remove_page_num(album_url)
-        if not self.is_downloaded(album_url):
-            with open(self.album_log_path, "a") as f:
-                f.write(album_url + "\n")
+@dataclass
+class AlbumProgress:
+    url: str
+    pending: int = 0
+    failed: int = 0
+    images: int | None = None  # set once the album is scraped
+    truncated: bool = False  # the scrape stopped before the last page
 
 
 class DownloadService:
-    """Initialize multiple threads with a queue for downloading."""
+    """Initialize multiple threads with a scheduler for downloading.
+
+    Tasks are queued per image in a `DownloadScheduler`, so albums are served by priority and
+    policy instead of strictly in arrival order. With an album state store, an album is marked
+    complete after it is scraped and all its queued images are done.
+    """
 
-    def __init__(self, config: Config, logger: logging.Logger, num_workers: int = 1):
-        self.download_queue = Queue()
+    def __init__(
+        self,
+        config: Config,
+        logger: logging.Logger,
+        num_workers: int | None = None,
+        album_state: AlbumStateStore | None = None,
+    ):
+        # the download stack pulls in httpx and friends, import it only when downloading
+        from .async_download import AsyncDownloadEngine
+        from .dedup_store import get_content_store
+        from .file_writer import get_disk_writer
+        from .post_process import get_post_processor
+        from .rate_limiter import get_rate_limiter
+        from .transport import HttpTransport
+        from .utils import ImageDownloader
+
+        self.scheduler = DownloadScheduler(
+            config.download.schedule_policy,
+            max_images=config.download.queue_max_images,
+            max_bytes=config.download.queue_max_size * 1024 * 1024,
+            image_size=config.download.image_size_estimate * 1024,
+        )
         self.config = config
         self.logger = logger
-        self.num_workers = num_workers  # one worker is enough, too many workers would be blocked
+        self.num_workers = num_workers or config.download.workers
         self.worker_threads = []
+        self.transport = HttpTransport(config, logger)  # shared by all workers
+        self.limiter = get_rate_limiter(config)
+        self.disk_writer = get_disk_writer(config)
+        self.store = get_content_store(config, logger)
+        self.post_processor = get_post_processor(config, logger)
+        shared = (
+            config,
+            self.transport,
+            self.limiter,
+            self.disk_writer,
+            self.store,
+            self.post_processor,
+            logger,
+        )
+        self.engine = AsyncDownloadEngine(*shared) if config.download.engine == "async" else None
+        self.downloader = ImageDownloader(*shared)
+
+        # only hand the engine as many images as it runs, the rest wait in the scheduler
+        self.engine_slots = threading.Semaphore(config.download.max_concurrency)
+
+        self.album_state = album_state
+        self.albums: dict[str, AlbumProgress] = {}  # by album URL
+        self.albums_lock = threading.Lock()
 
     def start_workers(self):
         """Start up multiple worker threads to listen download needs"""
-        for _ in range(self.num_workers):
+        if self.engine is not None:
+            self.engine.start()
+        # a single thread is enough to feed the event loop
+        num_workers = 1 if self.engine is not None else self.num_workers
+        for _ in range(num_workers):
             worker = threading.Thread(target=self._download_worker, daemon=True)
             self.worker_threads.append(worker)
             worker.start()
 
     def _download_worker(self):
-        """Worker function to process downloads from the queue"""
-        dest = self.config.download.download_dir
-        rate = self.config.download.rate_limit
-        while True:  # run until receiving exit signal
-            album_name, page_image_links = self.download_queue.get()  # get job from queue
-            if album_name is None:
+        """Worker function to process downloads from the scheduler"""
+        while True:  # run until the scheduler is closed
+            if self.engine is not None:
+                self.engine_slots.acquire()
+            task = self.scheduler.get()
+            if task is None:
                 break  # exit signal received
-            download_album(album_name, page_image_links, dest, rate, self.logger)
-            self.download_queue.task_done()
+            album_name, image_links, album_url = task
+            if self.engine is not None:
+                # hand over to the event loop, the task is done when the image is downloaded
+                future = self.engine.submit(album_name, image_links)
+                future.add_done_callback(
+                    partial(self._engine_task_done, album_url=album_url, image_links=image_links)
+                )
+                continue
+            try:
+                result = self.downloader.download_album(album_name, image_links)
+            except Exception as e:
+                self.logger.error(f"Download task of {album_name} failed: {e}")
+                result = 0, len(image_links), []
+            self._task_done(album_url, len(image_links), *result)
+
+    def _engine_task_done(
+        self, future: Future, album_url: str | None, image_links: list[tuple[str, str]]
+    ):
+        self.engine_slots.release()
+        if future.exception():
+            self._task_done(album_url, len(image_links), 0, len(image_links), [])
+        else:
+            self._task_done(album_url, len(image_links), *future.result())
+
+    def _task_done(
+        self, album_url: str | None, images: int, size: int, failed: int, processing: list[Future]
+    ):
+        """Count the images of a task as done, images being post processed stay pending."""
+        self.scheduler.task_done(size)
+        if self.album_state is None or album_url is None:
+            return
+        with self.albums_lock:
+            progress = self.albums.get(album_url)
+            if progress is None:
+                return
+            progress.pending -= images - len(processing)
+            progress.failed += failed
+        for future in processing:
+            future.add_done_callback(partial(self._processed, progress))
+        self._finish_album(progress)
+
+    def _processed(self, progress: AlbumProgress, future: Future):
+        """An image is post processed, a rejected image counts as failed so it is retried."""
+        rejected = future.exception() is not None or future.result().error is not None
+        with self.albums_lock:
+            progress.pending -= 1
+            progress.failed += rejected
+        self._finish_album(progress)
+
+    def add_download_task(
+        self,
+        album_name: str,
+        image_links: list[tuple[str, str]],
+        priority: int = 0,
+        album_url: str | None = None,
+    ):
+        """Add task to the scheduler, tasks with a higher priority are downloaded first.
 
-    def add_download_task(self, album_name: str, image_links: list[tuple[str, str]]):
-        """Add task to queue"""
-        self.download_queue.put((album_name, image_links))
+        Blocks while the download queue is full, so the scraper waits for the downloads.
+        `album_url` tracks the download state of the album the images belong to.
+        """
+        if album_url is not None and self.album_state is not None:
+            with self.albums_lock:
+                progress = self.albums.get(album_url)
+                started = progress is None
+                if progress is None:
+                    progress = self.albums[album_url] = AlbumProgress(album_url)
+                progress.pending += len(image_links)
+            if started:
+                self.album_state.set_status(album_url, "downloading")
+        self.scheduler.put(album_name, image_links, priority, album_url)
+
+    def is_downloading(self, album_url: str) -> bool:
+        """Check if images of the album are queued or downloading."""
+        with self.albums_lock:
+            return album_url in self.albums
+
+    def album_scraped(self, album_url: str, images: int, reached_end: bool = True):
+        """All images of the album are queued, it is done when the queued images are.
+
+        An album whose scrape did not reach the last page is left partial.
+        """
+        if self.album_state is None:
+            return
+        with self.albums_lock:
+            progress = self.albums.setdefault(album_url, AlbumProgress(album_url))
+            progress.images = images
+            progress.truncated = not reached_end
+        self._finish_album(progress)
+
+    def _finish_album(self, progress: AlbumProgress):
+        with self.albums_lock:
+            if progress.images is None or progress.pending > 0:
+                return
+            if self.albums.pop(progress.url, None) is None:
+                return  # finished by another thread
+
+        assert self.album_state is not None
+        self.album_state.finish(progress.url, progress.images, progress.failed, progress.truncated)
+        if progress.truncated:
+            self.logger.warning(f"Album {progress.url}: not all pages were scraped")
+        elif progress.failed:
+            self.logger.warning(
+                f"Album {progress.url}: {progress.failed} of {progress.images} images failed"
+            )
+
+    def log_queue_stats(self):
+        stats = self.scheduler.get_stats()
+        if not stats.images_served:
+            return
+        self.logger.info(
+            f"Download queue: peak {stats.peak_depth} images, "
+            f"image wait avg {stats.image_wait_avg:.1f}s max {stats.image_wait_max:.1f}s, "
+            f"scraper blocked {stats.producer_blocked} times for {stats.producer_wait_total:.1f}s"
+        )
 
     def wait_completion(self):
         """Block until all tasks are done and stop all workers."""
-        self.download_queue.join()  # Block until all tasks are done.
+        self.scheduler.join()  # Block until all tasks are done.
 
         # Signal all workers to exit
-        for _ in range(self.num_workers):
-            self.download_queue.put((None, None))
+        self.scheduler.close()
 
         # Wait for all worker threads to finish
         for worker in self.worker_threads:
             worker.join()
 
+        if self.engine is not None:
+            self.engine.close()
+        if self.post_processor is not None:
+            self.post_processor.close()
+        self.disk_writer.close()
+        self.transport.close()
+        self.transport.log_stats()
+        self.log_queue_stats()
+        self.limiter.close()
+        if self.store is not None:
+            self.store.close()
+
 
 class ScrapeError(Exception):
     pass
@@ -271,12 +583,71 @@ class DownloadError(Exception):
     pass
 
 
+def stop_at_known_albums(
+    is_known: Callable[[str], bool], limit: int
+) -> Callable[[list[str]], bool]:
+    """Return a `should_stop` for album lists, True after `limit` known albums in a row.
+
+    `is_known` gets the album URL, runs of known albums continue across pages.
+    """
+    known = 0
+
+    def should_stop(album_links: list[str]) -> bool:
+        nonlocal known
+        reached = False
+        for album_link in album_links:
+            known = known + 1 if is_known(BASE_URL + album_link) else 0
+            reached = reached or known >= limit
+        return reached
+
+    return should_stop
+
+
+def read_input_urls(path: str) -> list[str]:
+    """Read URLs from a file or stdin ("-"), one per line.
+
+    Blank lines and lines starting with "#" are ignored, page numbers are removed and duplicates
+    are dropped while keeping the order.
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    urls: dict[str, None] = {}
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.setdefault(LinkParser.remove_page_num(line), None)
+    return list(urls)
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "browser":
+        from .browser_daemon import browser_main
+
+        return browser_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        from .watch import watch_main
+
+        return watch_main(sys.argv[2:])
+
     args, log_level = parse_arguments()
     config = ConfigManager().load()
     setup_logging(log_level, log_path=config.paths.system_log)
     logger = logging.getLogger(__name__)
 
-    web_bot = get_bot(args.bot_type, config, args.terminate, logger)
-    scraper = ScrapeManager(args.url, web_bot, args.dry_run, config, logger)
+    urls = read_input_urls(args.input) if args.input else [args.url]
+    if not urls:
+        logger.error("No URLs to scrape")
+        return 1
+
+    web_bot = None if args.offline else get_bot(args.bot_type, config, args.terminate, logger)
+    if config.download.page_cache or args.offline:
+        web_bot = get_cached_bot(web_bot, config, logger, args.offline)
+    scraper = ScrapeManager(urls, web_bot, args.dry_run, config, logger, args.incremental)
     scraper.start_scraping()
+    if args.summary:
+        scraper.write_summary(args.summary)
+    return 1 if any(result.status == "failed" for result in scraper.results) else 0
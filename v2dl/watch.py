@@ -0,0 +1,248 @@
+import argparse
+import logging
+import os
+import random
+import signal
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from .config import Config, ConfigManager
+from .custom_logger import setup_logging
+from .link_parser import LinkParser
+from .page_cache import get_cached_bot
+from .v2dl import ScrapeManager, ScrapeResult
+from .web_bot import get_bot
+
+
+@dataclass
+class Subscription:
+    url: str
+    interval: float
+    next_poll: float
+    last_poll: float | None
+    last_status: str | None
+
+
+class SubscriptionStore:
+    """Subscribed URLs and their schedule in SQLite, so the schedule survives restarts.
+
+    The daemon reads the table before every poll, subscriptions added or removed by another
+    `v2dl watch` command take effect while it runs.
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS subscriptions ("
+                "url TEXT PRIMARY KEY, interval REAL NOT NULL, next_poll REAL NOT NULL, "
+                "last_poll REAL, last_status TEXT)"
+            )
+
+    def close(self):
+        self.db.close()
+
+    def add(self, url: str, interval: float, next_poll: float) -> bool:
+        """Subscribe to a URL, an existing subscription only gets the new interval."""
+        url = LinkParser.remove_page_num(url)
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO subscriptions (url, interval, next_poll) VALUES (?, ?, ?)",
+                (url, interval, next_poll),
+            )
+            if cursor.rowcount == 0:
+                self.db.execute(
+                    "UPDATE subscriptions SET interval = ? WHERE url = ?", (interval, url)
+                )
+        return cursor.rowcount == 1
+
+    def remove(self, url: str) -> bool:
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "DELETE FROM subscriptions WHERE url = ?", (LinkParser.remove_page_num(url),)
+            )
+        return cursor.rowcount == 1
+
+    def all(self) -> list[Subscription]:
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM subscriptions ORDER BY next_poll").fetchall()
+        return [Subscription(*row) for row in rows]
+
+    def set_polled(self, url: str, status: str, poll_time: float, next_poll: float):
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE subscriptions SET last_poll = ?, last_status = ?, next_poll = ? "
+                "WHERE url = ?",
+                (poll_time, status, next_poll, url),
+            )
+
+
+class WatchScheduler:
+    """Decide when each subscription is polled.
+
+    A new subscription starts at a random point of its interval and every poll moves the next one
+    by the interval plus a random `jitter` fraction of it, so the polls spread over the day
+    instead of running in bursts. Polls are at least `spacing` seconds apart, subscriptions
+    overdue after a restart are polled one by one. A failed poll is tried again after a quarter
+    of the interval.
+    """
+
+    def __init__(self, store: SubscriptionStore, jitter: float, spacing: float):
+        self.store = store
+        self.jitter = jitter
+        self.spacing = spacing
+        self.last_poll = float("-inf")
+
+    def subscribe(self, url: str, interval: float, now: float) -> bool:
+        return self.store.add(url, interval, now + random.uniform(0, interval))
+
+    def next_due(self, now: float) -> tuple[Subscription | None, float]:
+        """Return the subscription to poll now, or `None` and the seconds to wait for one."""
+        subscriptions = self.store.all()
+        if not subscriptions:
+            return None, float("inf")
+        earliest = max(subscriptions[0].next_poll, self.last_poll + self.spacing)
+        if earliest > now:
+            return None, earliest - now
+        return subscriptions[0], 0.0
+
+    def finish(self, subscription: Subscription, status: str, now: float) -> float:
+        """Record a poll and return when the subscription is polled next."""
+        interval = subscription.interval / 4 if status == "failed" else subscription.interval
+        next_poll = now + interval * (1 + random.uniform(-self.jitter, self.jitter))
+        self.store.set_polled(subscription.url, status, now, next_poll)
+        self.last_poll = now
+        return next_poll
+
+
+class WatchDaemon:
+    """Poll the subscriptions forever with one bot and one download service.
+
+    Album lists are synced incrementally, see `ScrapeManager.scrape_album_list_page`. Downloads
+    of a poll continue while the daemon waits for the next one, the daemon browser is released
+    meanwhile.
+    """
+
+    MAX_IDLE = 3600  # wake up at least hourly to pick up new subscriptions
+
+    def __init__(self, scheduler: WatchScheduler, logger: logging.Logger):
+        self.scheduler = scheduler
+        self.logger = logger
+        self.stop_event = threading.Event()
+
+    def stop(self, *_):
+        self.logger.info("Stopping after the current poll")
+        self.stop_event.set()
+
+    def run(self, manager: ScrapeManager) -> int:
+        """Poll with the given scrape manager until stopped, return the number of polls."""
+        polls = 0
+        try:
+            while not self.stop_event.is_set():
+                subscription, wait = self.scheduler.next_due(time.time())
+                if subscription is None:
+                    if wait == float("inf"):
+                        self.logger.info("No subscriptions, add one with `v2dl watch add URL`")
+                    # let other v2dl runs, e.g. from cron, use the daemon browser until then
+                    manager.web_bot.detach_browser()
+                    self.stop_event.wait(min(wait, self.MAX_IDLE))
+                    continue
+
+                manager.web_bot.reattach_browser()
+                result = ScrapeResult(subscription.url)  # not kept, the daemon runs forever
+                try:
+                    manager.scrape_url(subscription.url, result)
+                except Exception as e:
+                    result.status, result.error = "failed", str(e)
+                    self.logger.error(f"Failed to poll {subscription.url}: {e}")
+                next_poll = self.scheduler.finish(subscription, result.status, time.time())
+                polls += 1
+                self.logger.info(
+                    f"Polled {subscription.url}: {result.status}, {result.albums} albums, "
+                    f"next poll at {time.strftime('%Y-%m-%d %H:%M', time.localtime(next_poll))}"
+                )
+        finally:
+            manager.close()
+        return polls
+
+
+def get_watch_scheduler(config: Config) -> WatchScheduler:
+    return WatchScheduler(
+        SubscriptionStore(config.paths.watch_state),
+        config.download.watch_jitter,
+        config.download.watch_spacing,
+    )
+
+
+def watch_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="v2dl watch", description="Download new albums of subscribed URLs periodically."
+    )
+    parser.add_argument("action", choices=["run", "add", "remove", "list"])
+    parser.add_argument("urls", nargs="*", help="URLs to add or remove")
+    parser.add_argument(
+        "--every", type=float, default=None, help="Hours between polls of the added URLs"
+    )
+    parser.add_argument(
+        "--bot",
+        dest="bot_type",
+        default="drission",
+        choices=["selenium", "drission"],
+        help="Type of bot to use (default: drission)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Dry run without downloading")
+    args = parser.parse_args(argv)
+    if args.action in ("add", "remove") and not args.urls:
+        parser.error(f"{args.action} needs at least one URL")
+
+    config = ConfigManager().load()
+    setup_logging(logging.INFO, log_path=config.paths.system_log)
+    logger = logging.getLogger(__name__)
+    scheduler = get_watch_scheduler(config)
+    store = scheduler.store
+
+    if args.action == "add":
+        interval = (args.every or config.download.watch_interval) * 3600
+        for url in args.urls:
+            new = scheduler.subscribe(url, interval, time.time())
+            print(f"{'Subscribed to' if new else 'Updated'} {url}")
+        return 0
+    if args.action == "remove":
+        missing = [url for url in args.urls if not store.remove(url)]
+        for url in missing:
+            print(f"Not subscribed: {url}")
+        return 1 if missing else 0
+    if args.action == "list":
+        for subscription in store.all():
+            next_poll = time.strftime("%Y-%m-%d %H:%M", time.localtime(subscription.next_poll))
+            print(
+                f"{subscription.url}\tevery {subscription.interval / 3600:g}h\t"
+                f"next {next_poll}\t{subscription.last_status or 'never polled'}"
+            )
+        return 0
+
+    subscriptions = store.all()
+    if not subscriptions:
+        logger.error("No subscriptions, add one with `v2dl watch add URL`")
+        return 1
+
+    web_bot = get_bot(args.bot_type, config, False, logger)
+    if config.download.page_cache:
+        web_bot = get_cached_bot(web_bot, config, logger)
+    urls = [subscription.url for subscription in subscriptions]
+    manager = ScrapeManager(urls, web_bot, args.dry_run, config, logger, incremental=True)
+
+    daemon = WatchDaemon(scheduler, logger)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    logger.info(f"Watching {len(subscriptions)} subscriptions")
+    try:
+        daemon.run(manager)
+    except KeyboardInterrupt:
+        logger.info("Interrupted")
+    store.close()
+    return 0
@@ -1,7 +1,16 @@
 # src/automation/__init__.py
-from .selenium_bot import SeleniumBot
-from .drission_bot import DrissionBot
 from .get import get_bot
 
 # only import __all__ when using from automation import *
 __all__ = ["SeleniumBot", "DrissionBot", "get_bot"]
+
+# the backends are heavy, import them on first access
+_LAZY_BOTS = {"SeleniumBot": ".selenium_bot", "DrissionBot": ".drission_bot"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_BOTS:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY_BOTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
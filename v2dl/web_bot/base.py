@@ -4,6 +4,10 @@ import time
 from abc import ABC, abstractmethod
 from typing import Any
 
+from .http_pages import HttpPageFetcher
+from ..browser_daemon import attach_browser
+from ..pacing import PacingScheduler, get_pacing
+
 
 class BaseBot(ABC):
     """Abstract base class for bots, defining shared behaviors."""
@@ -17,6 +21,22 @@ class BaseBot(ABC):
 
         self.new_profile = False
 
+        # attach to the browser of `v2dl browser start` if it is running
+        self.browser_address: str | None = None
+        self.browser_lock = None
+        attached = attach_browser(config, logger)
+        if attached is not None:
+            self.browser_address, self.browser_lock = attached
+
+        # all waits of the bot, page loads of every tab and the HTTP fast path report to it
+        self.pacing: PacingScheduler = get_pacing(config, logger)
+
+        self.http_pages: HttpPageFetcher | None = None
+        if config.download.http_fast_path:
+            self.http_pages = HttpPageFetcher(
+                config.download.http_page_interval, logger, pacing=self.pacing
+            )
+
     @abstractmethod
     def init_driver(self) -> Any:
         """Initialize the browser driver."""
@@ -27,12 +47,68 @@ class BaseBot(ABC):
         """Close the browser and handle cleanup."""
         pass
 
-    def auto_page_scroll(
-        self, url: str, max_retry: int = 3, page_sleep: int = 5, fast_scroll: bool = True
-    ) -> str:
+    def detach_browser(self):
+        """Let other runs use the daemon browser."""
+        if self.browser_lock is not None:
+            self.browser_lock.release()
+            self.browser_lock = None
+
+    def reattach_browser(self):
+        """Take the daemon browser back after `detach_browser`, waits while another run uses it."""
+        if self.browser_address is None or self.browser_lock is not None:
+            return
+        attached = attach_browser(self.config, self.logger)
+        if attached is None:
+            self.logger.error(f"Browser at {self.browser_address} is not running anymore")
+            return
+        self.browser_lock = attached[1]
+
+    def auto_page_scroll(self, url: str, max_retry: int = 3, fast_scroll: bool = True) -> str:
         """Request handling with retries. To be implemented in subclasses."""
         raise NotImplementedError("Subclasses must implement automated retry logic.")
 
+    @property
+    def prefetch_count(self) -> int:
+        """Number of pages that can load in the background while the current one is parsed."""
+        return 0
+
+    def prefetch_pages(self, urls: list[str]):
+        """Start loading pages in the background, sequential bots load pages in `get_page`."""
+        pass
+
+    def get_page(self, url: str) -> str:
+        """Return the HTML of a page, over HTTP if possible, else with the browser."""
+        html = self.fetch_over_http(url)
+        if html is None:
+            html = self.auto_page_scroll(url)
+            self.hand_over_cookies()
+        return html
+
+    def fetch_over_http(self, url: str) -> str | None:
+        """Fetch a page without the browser, return `None` if the browser is needed."""
+        if self.http_pages is None:
+            return None
+        return self.http_pages.fetch(url)
+
+    def hand_over_cookies(self):
+        """Give the cookies of the browser, e.g. after login or a challenge, to the HTTP session."""
+        if self.http_pages is None or self.http_pages.fallbacks >= HttpPageFetcher.MAX_FALLBACKS:
+            return
+        try:
+            cookies, user_agent = self.export_cookies()
+        except Exception as e:
+            self.logger.warning(f"Failed to export browser cookies: {e}")
+            return
+        self.http_pages.set_cookies(cookies, user_agent)
+
+    def export_cookies(self) -> tuple[list[dict], str]:
+        """Return the browser cookies as dicts with name, value, domain and path, and its UA."""
+        raise NotImplementedError("Subclasses must implement cookie export.")
+
+    def cancel_prefetch(self):
+        """Drop pages prefetched but never requested."""
+        pass
+
     def handle_login(self):
         """Login logic, implemented by subclasses."""
         raise NotImplementedError("Subclasses must implement login logic.")
@@ -55,10 +131,54 @@ class BaseBehavior:
 
 
 class BaseScroll:
-    def __init__(self, config, logger):
+    # Nodes holding the links on album and album list pages
+    CONTENT_SELECTOR = "div.album-photo, a.media-cover"
+
+    # Count the content nodes and the time since the DOM last changed, the observer is installed
+    # once per document
+    CONTENT_STATE_JS = """
+        if (!window.__v2dlObserver) {
+            window.__v2dlChanged = performance.now();
+            window.__v2dlObserver = new MutationObserver(() => {
+                window.__v2dlChanged = performance.now();
+            });
+            window.__v2dlObserver.observe(document, {childList: true, subtree: true});
+        }
+        return [
+            document.querySelectorAll(arguments[0]).length,
+            (performance.now() - window.__v2dlChanged) / 1000,
+            document.readyState,
+        ];
+    """
+
+    def __init__(self, config, logger, pacing: PacingScheduler):
         self.config = config
         self.logger = logger
+        self.pacing = pacing
         self.scroll_position = 0
         self.last_content_height = 0
         self.continuous_scroll_count = 0
         self.max_continuous_scrolls = random.randint(5, 10)
+
+    def run_js(self, script: str, *args) -> Any:
+        raise NotImplementedError("Subclasses must implement running scripts.")
+
+    def wait_for_content(self, poll_interval: float = 0.1) -> bool:
+        """Wait until the content is in the DOM instead of scrolling through the page.
+
+        The links are in the attributes of the nodes, so the page is done once the content nodes
+        are present and the DOM has not changed for `dom_quiet_time` seconds. Returns `False` after
+        `dom_wait_timeout` seconds.
+        """
+        quiet_time = self.config.download.dom_quiet_time
+        clock = self.pacing.clock  # virtual in tests and benchmarks
+        deadline = clock.now() + self.config.download.dom_wait_timeout
+        count = 0
+        while clock.now() < deadline:
+            count, idle, ready_state = self.run_js(self.CONTENT_STATE_JS, self.CONTENT_SELECTOR)
+            if count and ready_state != "loading" and idle >= quiet_time:
+                self.logger.debug(f"Found {count} content nodes without scrolling")
+                return True
+            clock.sleep(min(poll_interval, max(quiet_time - idle, 0.01)))
+        self.logger.warning(f"Page content not settled before timeout ({count} nodes)")
+        return False
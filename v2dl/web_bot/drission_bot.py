@@ -2,12 +2,16 @@ import os
 import sys
 import time
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
 
 from DrissionPage import ChromiumPage, ChromiumOptions
 from DrissionPage.common import By, wait_until
 from DrissionPage.errors import ElementNotFoundError, WaitTimeoutError
 
 from .base import BaseBot, BaseBehavior, BaseScroll
+from ..pacing import PacingScheduler
 
 
 class DrissionBot(BaseBot):
@@ -15,9 +19,20 @@ class DrissionBot(BaseBot):
         super().__init__(config, close_browser, logger)
         self.config = config
         self.init_driver()
-        self.cloudflare = DriCloudflareHandler(self.page, self.logger)
+
+        # extra tabs are opened on the first prefetch, page loads of all tabs share the pacing
+        self.tab_count = max(config.download.scrape_tabs, 1)
+        self.login_lock = threading.Lock()
+        self.tab_pool: Queue[DriTab] | None = None
+        self.executor: ThreadPoolExecutor | None = None
+        self.prefetched: dict[str, Future] = {}
 
     def init_driver(self):
+        if self.browser_address is not None:
+            self.page = ChromiumPage(addr_or_opts=self.browser_address)
+            self._setup_page()
+            return
+
         user_data_dir = self.config.chrome.profile_path
         if not os.path.exists(user_data_dir):
             os.makedirs(user_data_dir)
@@ -31,19 +46,107 @@ class DrissionBot(BaseBot):
         # co.use_system_user_path()
         co.set_user_data_path(user_data_dir)
         self.page = ChromiumPage(addr_or_opts=co)
+        self._setup_page()
+
+    def _setup_page(self):
         self.page.set.scroll.smooth(on_off=True)
         self.page.set.scroll.wait_complete(on_off=True)
 
-        self.scroll = DriScroll(self.page, self.config, self.logger)
+        self.tab = DriTab(self.page, self.config, self.logger, self.pacing)
+        self.scroll = self.tab.scroll
+        self.cloudflare = self.tab.cloudflare
         self.human = DriBehavior()
 
     def close_driver(self):
-        if self.close_browser:
+        self.cancel_prefetch()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self._close_extra_tabs()
+        if self.http_pages is not None:
+            self.http_pages.close()
+        self.pacing.log_stats()
+        if self.browser_address is not None:
+            self.detach_browser()  # the daemon browser keeps running
+        elif self.close_browser:
             self.page.quit()
 
-    def auto_page_scroll(
-        self, url: str, max_retry: int = 3, page_sleep: int = 5, fast_scroll: bool = False
-    ) -> str:
+    def _close_extra_tabs(self):
+        assert self.tab_pool is not None
+        while not self.tab_pool.empty():
+            tab = self.tab_pool.get()
+            if tab is not self.tab:
+                tab.page.close()
+
+    @property
+    def prefetch_count(self) -> int:
+        return self.tab_count - 1
+
+    def prefetch_pages(self, urls: list[str]):
+        """Load pages in a pool of tabs, each page is loaded by one tab in its own thread."""
+        if self.tab_count <= 1 or (self.http_pages is not None and self.http_pages.usable):
+            return  # pages over HTTP take milliseconds, no need to load them ahead
+        for url in urls:
+            if url not in self.prefetched:
+                self.prefetched[url] = self._get_executor().submit(self._load_in_pool, url)
+
+    def get_page(self, url: str) -> str:
+        html = self.fetch_over_http(url)
+        if html is not None:
+            return html
+
+        if self.tab_count <= 1:
+            html = self.auto_page_scroll(url)
+        else:
+            future = self.prefetched.pop(url, None)
+            if future is None:
+                future = self._get_executor().submit(self._load_in_pool, url)
+            html = future.result()
+        self.hand_over_cookies()
+        return html
+
+    def export_cookies(self) -> tuple[list[dict], str]:
+        return list(self.page.cookies(all_domains=False)), self.page.user_agent
+
+    def cancel_prefetch(self):
+        for future in self.prefetched.values():
+            future.cancel()
+        self.prefetched.clear()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.tab_pool = Queue()
+            self.tab_pool.put(self.tab)
+            for _ in range(self.tab_count - 1):
+                self.tab_pool.put(
+                    DriTab(self.page.new_tab(), self.config, self.logger, self.pacing)
+                )
+            self.executor = ThreadPoolExecutor(max_workers=self.tab_count)
+        return self.executor
+
+    def _load_in_pool(self, url: str) -> str:
+        assert self.tab_pool is not None
+        tab = self.tab_pool.get()
+        try:
+            return self.load_page(tab, url)
+        finally:
+            self.tab_pool.put(self._replace_if_broken(tab))
+
+    def _replace_if_broken(self, tab: "DriTab") -> "DriTab":
+        """Return a tab to the pool, a closed or crashed extra tab is replaced with a new one."""
+        if tab is self.tab or tab.page.states.is_alive:
+            return tab
+        self.logger.warning("A scraping tab is broken, replacing it")
+        try:
+            tab.page.close()
+        except Exception:
+            pass  # already gone
+        try:
+            return DriTab(self.page.new_tab(), self.config, self.logger, self.pacing)
+        except Exception as e:
+            self.logger.error(f"Failed to open a new tab: {e}")
+            return tab  # keep the pool size, its loads fail and are retried
+
+    def auto_page_scroll(self, url: str, max_retry: int = 3, fast_scroll: bool = False) -> str:
         """
         Scroll page automatically with retries and Cloudflare challenge handle.
 
@@ -55,36 +158,56 @@ class DrissionBot(BaseBot):
         Returns:
             str: Page HTML content or error message
         """
+        return self.load_page(self.tab, url, max_retry, fast_scroll)
+
+    def load_page(
+        self,
+        tab: "DriTab",
+        url: str,
+        max_retry: int = 3,
+        fast_scroll: bool = False,
+    ) -> str:
+        """`auto_page_scroll` in the given tab."""
         response: str = ""
+        page = tab.page
 
         # page_sleep_time: tuple[int, int] = (20, 40) if fast_scroll else (5, 15)
-        scroll_down = self.page.scroll.to_bottom if fast_scroll else self.scroll.scroll_to_bottom
+        wait_dom = self.config.download.page_wait == "dom"
+        if wait_dom:
+            scroll_down = tab.scroll.wait_for_content
+        else:
+            scroll_down = page.scroll.to_bottom if fast_scroll else tab.scroll.scroll_to_bottom
 
         for attempt in range(max_retry):
             try:
-                self.page.get(url)
+                self.pacing.wait_turn()
+                start = self.pacing.now()
+                page.get(url)
 
                 # handle page redirection fail
-                if not self.page.states.is_alive:
-                    page_alive = self.handle_redirection_fail(url, max_retry, page_sleep)
+                if not page.states.is_alive:
+                    page_alive = self.handle_redirection_fail(url, max_retry, tab)
                     if not page_alive:
                         self.logger.error("Reconnection fail. Please check your network status.")
                         break
 
                 # handle challenges
-                # self.page.wait.load_start()
-                self.page.wait.ele_displayed("xpath://div[@class='album-photo my-2']", timeout=5)
-                if self.cloudflare.handle_simple_block(attempt, max_retry):
+                # page.wait.load_start()
+                page.wait.ele_displayed("xpath://div[@class='album-photo my-2']", timeout=5)
+                if tab.cloudflare.handle_simple_block(attempt, max_retry):
+                    self.pacing.record(self.pacing.now() - start, error=True)
                     continue
+                self.pacing.record(self.pacing.now() - start)
 
                 # main business
-                self.handle_login()
+                self.handle_login(page)
                 scroll_down()
-                response = self.page.html
+                response = page.html
 
-                # Sleep to avoid Cloudflare blocking
-                self.logger.debug("捲動結束，暫停作業避免封鎖。")
-                DriBehavior.random_sleep(page_sleep, page_sleep + 5)
+                # Sleep to avoid Cloudflare blocking, without scrolling the page interval is enough
+                if not wait_dom:
+                    self.logger.debug("捲動結束，暫停作業避免封鎖。")
+                    self.pacing.pause("page")
                 break
 
             except Exception as e:
@@ -92,7 +215,7 @@ class DrissionBot(BaseBot):
                     f"Request failed - Attempt {attempt + 1}/{max_retry}. Error: {str(e)}",
                     exc_info=True,
                 )
-                self.human.random_sleep(page_sleep, page_sleep + 5)
+                self.pacing.pause("retry")
 
         if not response:
             error_msg = f"Failed to retrieve URL after {max_retry} attempts: '{url}'"
@@ -100,28 +223,40 @@ class DrissionBot(BaseBot):
             return error_msg
         return response
 
-    def handle_redirection_fail(self, url: str, max_retry: int, sleep_time: int) -> bool:
-        if self.page.url == url and self.page.states.is_alive:
+    def handle_redirection_fail(
+        self, url: str, max_retry: int, tab: "DriTab | None" = None
+    ) -> bool:
+        tab = tab or self.tab
+        page = tab.page
+        if page.url == url and page.states.is_alive:
             return True
         retry = 1
         while retry <= max_retry:
             self.logger.error(f"Connection failed - Attempt {retry + 1}/{max_retry}")
-            self.human.random_sleep(sleep_time, sleep_time + 5 * random.uniform(1, retry * 5))
+            self.pacing.record(0, error=True)  # an adaptive policy waits longer on every retry
+            self.pacing.pause("redirect")
 
-            if self.cloudflare.handle_simple_block(retry, max_retry):
+            if tab.cloudflare.handle_simple_block(retry, max_retry):
                 self.logger.critical("Failed to solve Cloudflare turnstile challenge")
                 continue
 
-            self.page.get(url)
+            self.pacing.wait_turn()
+            page.get(url)
             retry += 1
-            if self.page.url == url and self.page.states.is_alive:
+            if page.url == url and page.states.is_alive:
                 return True
 
-        return self.page.url == url and self.page.states.is_alive
+        return page.url == url and page.states.is_alive
 
-    def handle_login(self):
+    def handle_login(self, page: ChromiumPage | None = None):
+        # tabs share the login cookies, only one tab logs in at a time
+        page = page or self.page
+        with self.login_lock:
+            self._login(page)
+
+    def _login(self, page: ChromiumPage):
         success = False
-        if "用戶登錄" in self.page.html:
+        if "用戶登錄" in page.html:
             self.logger.info("Login page detected - Starting login process")
             try:
                 if self.email is None or self.password is None:
@@ -131,8 +266,8 @@ class DrissionBot(BaseBot):
                 # self.handle_cloudflare_recaptcha()
 
                 BaseBehavior.random_sleep(0.1, 0.3)
-                email_field = self.page("#email")
-                password_field = self.page("#password")
+                email_field = page("#email")
+                password_field = page("#password")
 
                 self.human_like_type(email_field, self.email)
                 BaseBehavior.random_sleep(0.01, 0.3)
@@ -140,22 +275,22 @@ class DrissionBot(BaseBot):
                 BaseBehavior.random_sleep(0.01, 0.5)
 
                 # Already checked by default
-                # remember_checkbox = self.page('#remember')
+                # remember_checkbox = page('#remember')
                 # remember_checkbox.click()
 
-                login_button = self.page(
+                login_button = page(
                     'x://button[contains(text(), "登錄") and @class="btn btn-primary btn-block"]'
                 )
                 login_button.click()
 
                 self.human.random_sleep(3, 5)
 
-                if "用戶登錄" not in self.page.html:
+                if "用戶登錄" not in page.html:
                     self.logger.info("Login successful")
                     success = True
                 else:
                     self.logger.error("Login failed - Checking error messages")
-                    self.check_login_errors()
+                    self.check_login_errors(page)
                     return
 
             except ElementNotFoundError as e:
@@ -172,8 +307,8 @@ class DrissionBot(BaseBot):
             self.logger.critical("Automated login failed. Please login yourself.")
             sys.exit("Automated login failed.")
 
-    def check_login_errors(self):
-        error_message = self.page.ele("@class=alert-danger")
+    def check_login_errors(self, page: ChromiumPage | None = None):
+        error_message = (page or self.page).ele("@class=alert-danger")
         if error_message:
             self.logger.error(f"Login error message: {error_message.text}")
         else:
@@ -195,6 +330,15 @@ class DrissionBot(BaseBot):
         # self.page.execute_script(f"window.scrollBy(0, {scroll_length});")
 
 
+class DriTab:
+    """A browser tab with its own scroll and Cloudflare helpers, used by one thread at a time."""
+
+    def __init__(self, page: ChromiumPage, config, logger, pacing: PacingScheduler):
+        self.page = page
+        self.scroll = DriScroll(page, config, logger, pacing)
+        self.cloudflare = DriCloudflareHandler(page, logger)
+
+
 class DriCloudflareHandler:
     """
     Handles Cloudflare protection detection and bypass attempts.
@@ -281,8 +425,8 @@ class DriBehavior(BaseBehavior):
 
 
 class DriScroll(BaseScroll):
-    def __init__(self, page: ChromiumPage, config, logger):
-        super().__init__(config, logger)
+    def __init__(self, page: ChromiumPage, config, logger, pacing: PacingScheduler):
+        super().__init__(config, logger, pacing)
         self.page = page
         self.page.set.scroll.smooth(on_off=True)
 
@@ -317,11 +461,8 @@ class DriScroll(BaseScroll):
 
             self.continuous_scroll_count += 1
             if self.continuous_scroll_count >= self.max_continuous_scrolls:
-                pause_time = random.uniform(3, 7)
-                self.logger.debug(
-                    f"連續捲動 {self.continuous_scroll_count} 次，暫停 {pause_time:.2f} 秒"
-                )
-                time.sleep(pause_time)
+                self.logger.debug(f"連續捲動 {self.continuous_scroll_count} 次，暫停")
+                self.pacing.pause("scroll_break")
                 self.continuous_scroll_count = 0
                 self.max_continuous_scrolls = random.randint(3, 7)
 
@@ -352,9 +493,7 @@ class DriScroll(BaseScroll):
             self.logger.debug(f"嘗試向上捲動 {scroll_length} 像素")
             self.page.scroll.up(pixel=scroll_length)
         elif action == "pause":
-            pause_time = random.uniform(1, 3)
-            self.logger.debug(f"暫停 {pause_time:.2f} 秒")
-            time.sleep(pause_time)
+            self.pacing.pause("scroll_idle")
         elif action == "jump":
             self.logger.debug("跳轉到頁面底部")
             self.page.scroll.to_bottom()
@@ -381,6 +520,9 @@ class DriScroll(BaseScroll):
         self.page.run_js(f"window.scrollTo(0, {target_position});")
         return self.get_scroll_position()
 
+    def run_js(self, script: str, *args):
+        return self.page.run_js(script, *args)
+
     def get_scroll_position(self):
         page_location = self.page.rect.page_location
         return page_location[1]
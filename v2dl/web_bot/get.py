@@ -1,14 +1,20 @@
+import importlib
 import time
-from .drission_bot import DrissionBot
-from .selenium_bot import SeleniumBot
+
+# only the selected backend is imported, each pulls in a whole browser automation library
+BOT_CLASSES = {
+    "selenium": (".selenium_bot", "SeleniumBot"),
+    "drission": (".drission_bot", "DrissionBot"),
+}
 
 
 def get_bot(bot_type: str, config, close_browser, logger):
-    bot_classes = {"selenium": SeleniumBot, "drission": DrissionBot}
-    if bot_type not in bot_classes:
+    if bot_type not in BOT_CLASSES:
         raise ValueError(f"Unsupported automator type: {bot_type}")
 
-    bot = bot_classes[bot_type](config, close_browser, logger)
+    module_name, class_name = BOT_CLASSES[bot_type]
+    bot_class = getattr(importlib.import_module(module_name, __package__), class_name)
+    bot = bot_class(config, close_browser, logger)
 
     if bot.new_profile:
         init_new_profile(bot)
@@ -23,10 +29,8 @@ def init_new_profile(bot):
         "https://www.wikipedia.org",
     ]
 
+    browser = bot.page if hasattr(bot, "page") else bot.driver
     for url in websites:
-        if isinstance(bot, DrissionBot):
-            bot.page.get(url)
-        elif isinstance(bot, SeleniumBot):
-            bot.driver.get(url)
+        browser.get(url)
 
         time.sleep(4)
@@ -0,0 +1,95 @@
+import httpx
+
+from ..const import CHALLENGE_MARKERS, CONTENT_MARKERS
+from ..pacing import Pacer, PacingScheduler
+
+
+class HttpPageFetcher:
+    """Fetch album and list pages over plain HTTP with the cookies and user agent of the browser.
+
+    The image URLs are already in the served HTML, so no rendering or scrolling is needed. A page
+    that is not plain content, e.g. a Cloudflare challenge or the login page, returns `None` and
+    the bot loads it with the browser instead. The fast path is turned off for the rest of the run
+    after `MAX_FALLBACKS` consecutive fallbacks. Load times and server errors are reported to the
+    pacing scheduler, if given.
+    """
+
+    MAX_FALLBACKS = 3
+
+    def __init__(
+        self,
+        interval: float,
+        logger,
+        timeout: float = 30,
+        pacing: PacingScheduler | None = None,
+    ):
+        self.logger = logger
+        self.pacing = pacing
+        self.pacer = Pacer(interval, pacing.clock if pacing is not None else None)
+        self.client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=timeout,
+            headers={
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+                "Accept-Encoding": "gzip, deflate",
+            },
+        )
+        self.has_cookies = False
+        self.fallbacks = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.has_cookies and self.fallbacks < self.MAX_FALLBACKS
+
+    def set_cookies(self, cookies: list[dict], user_agent: str):
+        """Replace the session cookies with the ones exported from the browser."""
+        self.client.cookies.clear()
+        for cookie in cookies:
+            self.client.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        if user_agent:
+            self.client.headers["User-Agent"] = user_agent
+        self.has_cookies = bool(cookies)
+
+    def fetch(self, url: str) -> str | None:
+        """Return the page HTML, or `None` if the browser has to load it."""
+        if not self.usable:
+            return None
+
+        self.pacer.wait()
+        start = self.pacer.clock.now()
+        try:
+            response = self.client.get(url)
+        except httpx.HTTPError as e:
+            return self._fallback(url, str(e))
+
+        if self.pacing is not None:
+            latency = self.pacer.clock.now() - start
+            self.pacing.record(latency, response.status_code == 429 or response.status_code >= 500)
+        if response.status_code != 200:
+            return self._fallback(url, f"HTTP {response.status_code}")
+        html = response.text
+        if any(marker in html for marker in CHALLENGE_MARKERS):
+            return self._fallback(url, "challenge or login page")
+        if not any(marker in html for marker in CONTENT_MARKERS):
+            return self._fallback(url, "no album content")
+
+        self.fallbacks = 0
+        self.logger.debug(f"Fetched over HTTP: {url}")
+        return html
+
+    def close(self):
+        self.client.close()
+
+    def _fallback(self, url: str, reason: str) -> None:
+        self.fallbacks += 1
+        self.logger.info(f"Loading {url} with the browser ({reason})")
+        if self.fallbacks == self.MAX_FALLBACKS:
+            self.logger.warning("HTTP fast path keeps failing, using the browser only")
+        return None
@@ -22,20 +22,26 @@ from subprocess import Popen
 
 from .base import BaseBot, BaseBehavior, BaseScroll
 from ..const import SELENIUM_AGENT
+from ..pacing import PacingScheduler
 
 
 class SeleniumBot(BaseBot):
     def __init__(self, config, close_browser, logger):
         super().__init__(config, close_browser, logger)
         self.init_driver()
-        self.scroller = SelScroll(self.driver, self.config, self.logger)
+        self.scroller = SelScroll(self.driver, self.config, self.logger, self.pacing)
         self.cloudflare = SelCloudflareHandler(self.driver, self.logger)
 
     def init_driver(self):
         self.driver: WebDriver
-        self.chrome_process: Popen
+        self.chrome_process: Popen | None = None
         options = Options()
 
+        if self.browser_address is not None:
+            options.add_experimental_option("debuggerAddress", self.browser_address)
+            self.driver = webdriver.Chrome(service=Service(), options=options)
+            return
+
         user_data_dir = self.config.chrome.profile_path
         if not os.path.exists(user_data_dir):
             os.makedirs(user_data_dir)
@@ -72,14 +78,19 @@ class SeleniumBot(BaseBot):
         # self.driver.set_window_size(1920, 1080)
 
     def close_driver(self):
-        pass
+        if self.http_pages is not None:
+            self.http_pages.close()
+        self.pacing.log_stats()
+        self.detach_browser()
         # if self.close_browser:
         #     self.driver.quit()
         #     self.chrome_process.terminate()
 
-    def auto_page_scroll(
-        self, url: str, max_retry: int = 3, page_sleep: int = 5, fast_scroll: bool = False
-    ) -> str:
+    def export_cookies(self) -> tuple[list[dict], str]:
+        user_agent = self.driver.execute_script("return navigator.userAgent")
+        return self.driver.get_cookies(), user_agent
+
+    def auto_page_scroll(self, url: str, max_retry: int = 3, fast_scroll: bool = False) -> str:
         """
         Scroll page automatically with retries and Cloudflare challenge handle.
 
@@ -88,7 +99,6 @@ class SeleniumBot(BaseBot):
         Args:
             url (str): Target URL
             max_retry (int): Maximum number of retry attempts. Defaults to 3
-            page_sleep (int): The sleep time after reaching page bottom
             fast_scroll (bool): Whether to use fast scroll. Might be blocked by Cloudflare
 
         Returns:
@@ -97,17 +107,21 @@ class SeleniumBot(BaseBot):
         response: str = ""
         for attempt in range(max_retry):
             try:
+                self.pacing.wait_turn()
+                start = self.pacing.now()
                 self.driver.get(url)
                 SelBehavior.random_sleep(0.1, 0.5)
 
-                if not self.handle_redirection_fail(url, max_retry, 5):
+                if not self.handle_redirection_fail(url, max_retry):
                     self.logger.error(
                         f"Unable to solve redirection fail. Attempt {attempt + 1}/{max_retry}"
                     )
                     continue
 
                 if self.cloudflare.handle_simple_block(attempt, max_retry):
+                    self.pacing.record(self.pacing.now() - start, error=True)
                     continue
+                self.pacing.record(self.pacing.now() - start)
 
                 WebDriverWait(self.driver, 5).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "div.album-photo.my-2"))
@@ -115,8 +129,11 @@ class SeleniumBot(BaseBot):
 
                 # 主業務
                 self.handle_login()
-                self.scroller.scroll_to_bottom()
-                SelBehavior.random_sleep(5, 15)
+                if self.config.download.page_wait == "dom":
+                    self.scroller.wait_for_content()
+                else:
+                    self.scroller.scroll_to_bottom()
+                    self.pacing.pause("page")
 
                 response = self.driver.page_source
                 break
@@ -130,8 +147,8 @@ class SeleniumBot(BaseBot):
                     f"WebDriver error occurred: {e}. Retrying... Attempt {attempt + 1}/{max_retry}"
                 )
 
-            self.logger.debug("捲動結束，暫停作業避免封鎖。")
-            SelBehavior.random_sleep(page_sleep, page_sleep + 5)
+            self.logger.debug("載入失敗，暫停作業避免封鎖。")
+            self.pacing.pause("retry")
 
         if not response:
             error_msg = f"Failed to retrieve URL after {max_retry} attempts: '{url}'"
@@ -139,18 +156,20 @@ class SeleniumBot(BaseBot):
             self.logger.error(error_msg)
         return response
 
-    def handle_redirection_fail(self, url: str, max_retry: int, sleep_time: int) -> bool:
+    def handle_redirection_fail(self, url: str, max_retry: int) -> bool:
         if self.driver.current_url == url:
             return True
         retry = 1
         while retry <= max_retry:
             self.logger.error(f"Connection failed - Attempt {retry + 1}/{max_retry}")
-            SelBehavior.random_sleep(sleep_time, sleep_time + 5 * random.uniform(1, retry * 5))
+            self.pacing.record(0, error=True)  # an adaptive policy waits longer on every retry
+            self.pacing.pause("redirect")
 
             if self.cloudflare.handle_simple_block(retry, max_retry):
                 self.logger.critical("Failed to solve Cloudflare turnstile challenge")
                 continue
 
+            self.pacing.wait_turn()
             self.driver.get(url)
             retry += 1
             if self.driver.current_url == url:
@@ -351,8 +370,8 @@ class SelBehavior(BaseBehavior):
 
 
 class SelScroll(BaseScroll):
-    def __init__(self, driver: WebDriver, config, logger):
-        super().__init__(config, logger)
+    def __init__(self, driver: WebDriver, config, logger, pacing: PacingScheduler):
+        super().__init__(config, logger, pacing)
         self.driver = driver
 
     def scroll_to_bottom(self):
@@ -387,11 +406,8 @@ class SelScroll(BaseScroll):
 
             self.continuous_scroll_count += 1
             if self.continuous_scroll_count >= self.max_continuous_scrolls:
-                pause_time = random.uniform(3, 7)
-                self.logger.debug(
-                    f"連續捲動 {self.continuous_scroll_count} 次，暫停 {pause_time:.2f} 秒"
-                )
-                time.sleep(pause_time)
+                self.logger.debug(f"連續捲動 {self.continuous_scroll_count} 次，暫停")
+                self.pacing.pause("scroll_break")
                 self.continuous_scroll_count = 0
                 self.max_continuous_scrolls = random.randint(3, 7)
 
@@ -428,9 +444,7 @@ class SelScroll(BaseScroll):
             actual_position = self.safe_scroll(target_position)
             self.logger.debug(f"實際捲動到 {actual_position} 像素")
         elif action == "pause":
-            pause_time = random.uniform(1, 3)
-            self.logger.debug(f"暫停 {pause_time:.2f} 秒")
-            time.sleep(pause_time)
+            self.pacing.pause("scroll_idle")
         elif action == "jump":
             jump_position = current_position + random.randint(100, 500)
             self.logger.debug(f"嘗試跳轉到位置 {jump_position}")
@@ -459,6 +473,9 @@ class SelScroll(BaseScroll):
         self.driver.execute_script(f"window.scrollTo(0, {target_position});")
         return self.get_scroll_position()
 
+    def run_js(self, script: str, *args):
+        return self.driver.execute_script(script, *args)
+
     def get_scroll_position(self):
         return self.driver.execute_script("return window.pageYOffset")
 